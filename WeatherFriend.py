@@ -1,27 +1,22 @@
 # main_dashboard.py — Weather Friend Dashboard
 
-import os, sys, threading, time
+import asyncio, os, sys, time
+STARTED = time.perf_counter()
 from datetime import datetime
 
 import customtkinter as ctk
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib import pyplot as plt
-from rich.console import Console
 
 # PATH FIX
 ROOT = os.path.dirname(os.path.abspath(__file__))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
-# App modules
-from irfan_23522613.weather_friend.weather_data import get_weather_data
-from irfan_23522613.weather_friend.visualisation import (
-    create_temperature_visualisation,
-    create_precipitation_visualisation,
-)
-from irfan_23522613.weather_friend.chatbot import talk_to_weather_friend
-
-console = Console()
+# App modules — the heavy ones (network stack, matplotlib, ollama) load on first use below
+from irfan_23522613.weather_friend import metrics
+from irfan_23522613.weather_friend.background import get_background_loop
+from irfan_23522613.weather_friend.prefetch import get_prefetcher
+from irfan_23522613.weather_friend import ui_dispatch
+from irfan_23522613.weather_friend.chat_view import ChatTranscript
 
 # GLOBAL SETTINGS
 ctk.set_appearance_mode("dark")
@@ -32,23 +27,52 @@ PADDING = 10
 FONT_TITLE = ("Segoe UI Semibold", 22)
 FONT_MD = ("Segoe UI", 14)
 FONT_SM = ("Segoe UI", 12)
+TYPING_FRAME_MS = 400          # "thinking…" dots animation step
+METRICS_REFRESH_MS = 1000      # stats overlay refresh period
+
+
+# LAZY MODULES
+def weather_data():
+    """Forecast fetching (requests, httpx, NumPy); loaded after the first paint."""
+    from irfan_23522613.weather_friend import weather_data
+    return weather_data
+
+
+def chatbot():
+    """The LLM chatbot; ollama is loaded on the first chat message."""
+    from irfan_23522613.weather_friend import chatbot
+    return chatbot
+
+
+_plotting = None
+
 
-plt.style.use("seaborn-v0_8-darkgrid")
-plt.rcParams.update({
-    "axes.facecolor": "#1b1f27",
-    "figure.facecolor": "#0d1016",
-    "axes.labelcolor": "white",
-    "xtick.color": "white",
-    "ytick.color": "white",
-    "text.color": "white"
-})
+def plotting():
+    """(FigureCanvasTkAgg, ForecastChart), importing and styling matplotlib on first Forecast use."""
+    global _plotting
+    if _plotting is None:
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from irfan_23522613.weather_friend.visualisation import ForecastChart, apply_dashboard_style
+
+        apply_dashboard_style()
+        _plotting = (FigureCanvasTkAgg, ForecastChart)
+    return _plotting
+
+
+def print_exception():
+    from rich.console import Console
+    Console().print_exception()
 
 
 # HELPERS
-def run_thread(fn, *args):
-    t = threading.Thread(target=fn, args=args, daemon=True)
-    t.start()
-    return t
+def run_async(coro, key=None):
+    """Run `coro` on the shared background loop; a new coro under the same key cancels the old one."""
+    return get_background_loop().submit(coro, key=key)
+
+
+def ui():
+    """The main-thread update queue; background code changes widgets only through it."""
+    return ui_dispatch.get_dispatcher()
 
 
 def icon_for(desc: str):
@@ -61,6 +85,7 @@ def icon_for(desc: str):
     return "☀️"
 
 
+@metrics.timed("ui.normalise", failed=metrics.is_error_dict)
 def normalise_forecast_dict(raw):
     """
     Accepts whatever get_weather_data returns and normalises to:
@@ -69,7 +94,8 @@ def normalise_forecast_dict(raw):
     if not isinstance(raw, dict):
         return {"error": "Unexpected data format."}
 
-    if "forecast" in raw and isinstance(raw["forecast"], list):
+    # a list of slot dicts, or the columnar Forecast (which has to_records)
+    if "forecast" in raw and (isinstance(raw["forecast"], list) or hasattr(raw["forecast"], "to_records")):
         return raw
 
 
@@ -103,6 +129,31 @@ def normalise_forecast_dict(raw):
     return raw
 
 
+class PinButton(ctk.CTkButton):
+    """📌 toggle that keeps the city typed in `entry` refreshed in the background."""
+
+    def __init__(self, master, entry):
+        super().__init__(master, text="📌", width=44, fg_color="#3a3f4b", command=self.toggle)
+        self.entry = entry
+        self.entry.bind("<KeyRelease>", lambda e: self._show_state(), add="+")
+
+    def toggle(self):
+        city = self.entry.get().strip()
+        if not city:
+            return
+        prefetcher = get_prefetcher()
+        if prefetcher.is_pinned(city):
+            prefetcher.unpin(city)
+        else:
+            prefetcher.pin(city)
+        self._show_state()
+
+    def _show_state(self):
+        city = self.entry.get().strip()
+        pinned = bool(city) and get_prefetcher().is_pinned(city)
+        self.configure(fg_color="#1f6aa5" if pinned else "#3a3f4b")
+
+
 # CURRENT WEATHER PAGE 
 class CurrentWeatherPage(ctk.CTkFrame):
     def __init__(self, master):
@@ -119,6 +170,7 @@ class CurrentWeatherPage(ctk.CTkFrame):
         self.city_entry.pack(side="left", fill="x", expand=True, padx=(0, 8))
         self.city_entry.bind("<Return>", lambda e: self.fetch())
         ctk.CTkButton(top, text="Fetch", width=120, command=self.fetch).pack(side="left")
+        PinButton(top, self.city_entry).pack(side="left", padx=(8, 0))
 
         self.card = ctk.CTkFrame(self, corner_radius=16, fg_color="#1a1e27")
         self.card.pack(fill="both", expand=True, padx=20, pady=10)
@@ -136,15 +188,15 @@ class CurrentWeatherPage(ctk.CTkFrame):
         self.time_label = ctk.CTkLabel(self.card, text="", font=FONT_SM, text_color="#a9b1bc")
         self.time_label.pack()
 
-    def _friendly_error(self, city):
-        self.icon.configure(text="🤷")
-        self.city_label.configure(text=city.title())
-        self.temp_label.configure(text="-- °C")
-        self.cond_label.configure(
-            text="Couldn't find that city. Please check the spelling and try again."
+    def _friendly_error(self, city, message=None):
+        ui().configure(self.icon, text="🤷")
+        ui().configure(self.city_label, text=city.title())
+        ui().configure(self.temp_label, text="-- °C")
+        ui().configure(
+            self.cond_label, text=message or "Couldn't find that city. Please check the spelling and try again."
         )
-        self.extra_label.configure(text="💧 — %   🌬️ — m/s")
-        self.time_label.configure(text="")
+        ui().configure(self.extra_label, text="💧 — %   🌬️ — m/s")
+        ui().configure(self.time_label, text="")
 
     def fetch(self):
         city = self.city_entry.get().strip()
@@ -152,30 +204,29 @@ class CurrentWeatherPage(ctk.CTkFrame):
             return
         self.cond_label.configure(text=f"Fetching weather for {city}…")
 
-        def work():
+        async def work():
             try:
-                data = get_weather_data(city, days=1)
+                get_prefetcher().touch(city)
+                data = await weather_data().get_weather_data_async(city, days=1)
                 if "forecast" not in data or not data["forecast"]:
-                    self._friendly_error(city)
+                    if data.get("error_type") == "CityNotFound":
+                        get_prefetcher().forget(city)
+                    self._friendly_error(city, data.get("error"))
                     return
 
                 first = data["forecast"][0]
                 desc = "Forecasted conditions"
-                self.icon.configure(text=icon_for(desc))
-                self.city_label.configure(text=data.get("city", city).title())
-                self.temp_label.configure(text=f"{first.get('temp','—')}°C")
-                self.cond_label.configure(text=desc)
-                self.extra_label.configure(
-                    text=f"💧 {first.get('humidity','—')}%   🌬️ — m/s"
-                )
-                self.time_label.configure(
-                    text=datetime.now().strftime("%a, %d %b %Y • %H:%M")
-                )
+                ui().configure(self.icon, text=icon_for(desc))
+                ui().configure(self.city_label, text=data.get("city", city).title())
+                ui().configure(self.temp_label, text=f"{first.get('temp','—')}°C")
+                ui().configure(self.cond_label, text=desc)
+                ui().configure(self.extra_label, text=f"💧 {first.get('humidity','—')}%   🌬️ — m/s")
+                ui().configure(self.time_label, text=datetime.now().strftime("%a, %d %b %Y • %H:%M"))
             except Exception:
-                console.print_exception()
+                print_exception()
                 self._friendly_error(city)
 
-        run_thread(work)
+        run_async(work(), key=(self, "fetch"))
 
 
 # FORECAST PAGE
@@ -202,6 +253,7 @@ class ForecastPage(ctk.CTkFrame):
             lambda e: self.days_label.configure(text=f"{int(self.days_slider.get())} days"),
         )
         ctk.CTkButton(top, text="Generate", width=120, command=self.fetch).pack(side="left", padx=(4, 0))
+        PinButton(top, self.city_entry).pack(side="left", padx=(8, 0))
 
         # Graph Toggle
         self.toggle = ctk.CTkSegmentedButton(self, values=["Temperature", "Humidity"], command=self.refresh_plot)
@@ -212,22 +264,39 @@ class ForecastPage(ctk.CTkFrame):
         self.graph_frame = ctk.CTkFrame(self, corner_radius=12, fg_color="#161a23")
         self.graph_frame.pack(fill="both", expand=True, padx=20, pady=10)
 
+        # One chart and canvas for the page's lifetime; toggles update them in place
+        self.chart = None
         self.canvas = None
+        self._msg_label = None
         self.cached_data = None
 
     def _show_msg(self, text):
-        for w in self.graph_frame.winfo_children():
-            w.destroy()
-        ctk.CTkLabel(self.graph_frame, text=text, font=FONT_MD).pack(padx=20, pady=20)
+        if self.canvas is not None:
+            self.canvas.get_tk_widget().pack_forget()
+        if self._msg_label is None:
+            self._msg_label = ctk.CTkLabel(self.graph_frame, text=text, font=FONT_MD)
+        self._msg_label.configure(text=text)
+        self._msg_label.pack(padx=20, pady=20)
+
+    def _show_canvas(self):
+        if self._msg_label is not None:
+            self._msg_label.pack_forget()
+        if self.chart is None:
+            FigureCanvasTkAgg, ForecastChart = plotting()
+            self.chart = ForecastChart()
+            self.canvas = FigureCanvasTkAgg(self.chart.fig, master=self.graph_frame)
+        widget = self.canvas.get_tk_widget()
+        if not widget.winfo_manager():
+            widget.pack(fill="both", expand=True, padx=10, pady=10)
+
+    def _show_forecast(self, raw):
+        self.cached_data = raw
+        self.refresh_plot()
 
     def refresh_plot(self, *_):
         if not self.cached_data:
             return
 
-        # clear frame
-        for w in self.graph_frame.winfo_children():
-            w.destroy()
-
         try:
             # the visualisation module expects the normalised dict
             data = normalise_forecast_dict(self.cached_data)
@@ -235,17 +304,12 @@ class ForecastPage(ctk.CTkFrame):
                 self._show_msg("No forecast data to display. Try fetching again.")
                 return
 
-            if self.toggle.get() == "Temperature":
-                fig = create_temperature_visualisation(data)  # returns a Matplotlib Figure
-            else:
-                fig = create_precipitation_visualisation(data)
-
-            self.canvas = FigureCanvasTkAgg(fig, master=self.graph_frame)
-            self.canvas.draw()
-            self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
+            self._show_canvas()
+            if self.chart.update(data, self.toggle.get()):
+                self.canvas.draw_idle()
 
         except Exception:
-            console.print_exception()
+            print_exception()
             self._show_msg("Could not render graph. Please try again.")
 
     def fetch(self):
@@ -256,20 +320,22 @@ class ForecastPage(ctk.CTkFrame):
 
         self._show_msg(f"Loading {days}-day forecast…")
 
-        def work():
+        async def work():
             try:
-                raw = get_weather_data(city, days)
+                get_prefetcher().touch(city)
+                raw = await weather_data().get_weather_data_async(city, days)
                 if isinstance(raw, dict) and raw.get("error"):
-                    self._show_msg("Couldn't find it. Please check spelling.")
+                    if raw.get("error_type") == "CityNotFound":
+                        get_prefetcher().forget(city)
+                    ui().post(self._show_msg, raw["error"], key=(self, "graph"))
                     return
 
-                self.cached_data = raw
-                self.refresh_plot()
+                ui().post(self._show_forecast, raw, key=(self, "graph"))
             except Exception:
-                console.print_exception()
-                self._show_msg("Couldn't fetch forecast. Check spelling or try again.")
+                print_exception()
+                ui().post(self._show_msg, "Couldn't fetch forecast. Check spelling or try again.", key=(self, "graph"))
 
-        run_thread(work)
+        run_async(work(), key=(self, "fetch"))
 
 
 # IMPROVED CHATBOT PAGE
@@ -278,11 +344,9 @@ class ChatPage(ctk.CTkFrame):
         super().__init__(master)
         ctk.CTkLabel(self, text="Weather Friend Chat 🤖", font=("Segoe UI Semibold", 22)).pack(pady=(10, 5))
 
-        # Chat display box
-        self.chat_frame = ctk.CTkScrollableFrame(self, corner_radius=10, fg_color="#1a1e27")
-        self.chat_frame.pack(fill="both", expand=True, padx=20, pady=10)
-        self.chat_frame._scrollbar.configure(width=12)
-        self.chat_frame._parent_canvas.configure(highlightthickness=0, borderwidth=0)
+        # Chat display box: only the bubbles in view exist as widgets
+        self.transcript = ChatTranscript(self, wraplength=480, font=("Segoe UI", 14))
+        self.transcript.pack(fill="both", expand=True, padx=20, pady=10)
 
         self.entry_row = ctk.CTkFrame(self, fg_color="transparent")
         self.entry_row.pack(fill="x", padx=20, pady=(0, 20))
@@ -292,86 +356,46 @@ class ChatPage(ctk.CTkFrame):
         self.entry.pack(side="left", fill="x", expand=True, padx=(0, 8))
         self.entry.bind("<Return>", lambda e: self.send())
         ctk.CTkButton(self.entry_row, text="Send", width=100, command=self.send).pack(side="left")
+        self.stop_button = ctk.CTkButton(self.entry_row, text="Stop", width=80, state="disabled",
+                                         fg_color="#3a3f4b", command=self.cancel_replies)
+        self.stop_button.pack(side="left", padx=(8, 0))
 
         # Internal state
-        self._animating = False
+        self.session_id = f"chat-page-{id(self)}"  # this page's own conversation memory
+        self._typing_timer = None
+        self._typing_dots = 0
         self._thinking_label = None
+        self._replies = set()  # futures of replies still being generated (main thread only)
 
         # Intro message
         self.add_message("Weather Friend", "🌤 Hey there! Ask me about any city’s weather today or in the next 5 days!")
 
     # UI Message Bubbles
     def add_message(self, sender, text):
-        # Colors and alignment
-        if sender == "You":
-            bubble_color = "#007AFF"   # iMessage blue
-            text_color = "white"
-            anchor = "e"
-            padx = (80, 20)
-        else:
-            bubble_color = "#2B2E35"   # dark gray bubble for bot
-            text_color = "white"
-            anchor = "w"
-            padx = (20, 80)
-
-        # Create message bubble
-        bubble = ctk.CTkFrame(
-            self.chat_frame,
-            fg_color=bubble_color,
-            corner_radius=22,   # iMessage-style rounded edges
-        )
-
-        lbl = ctk.CTkLabel(
-            bubble,
-            text=text,
-            wraplength=480,
-            justify="left",
-            font=("Segoe UI", 14),
-            text_color=text_color,
-        )
-        lbl.pack(padx=12, pady=6)
-
-        bubble.pack(anchor=anchor, padx=padx, pady=6)
+        """Append a bubble (scrolling along if the view was at the bottom); returns a handle to update its text."""
+        return self.transcript.add_message(sender, text)
 
-        # "Delivered" indicator for user messages
-        if sender == "You":
-            status = ctk.CTkLabel(
-                self.chat_frame,
-                text="Delivered",
-                text_color="#8E8E93",
-                font=("Segoe UI", 10)
-            )
-            status.pack(anchor="e", padx=(0, 28))
+    def _scroll_to_bottom(self):
+        self.transcript.scroll_to_bottom()
 
-        # Auto-scroll to bottom
-        try:
-            self.chat_frame._parent_canvas.yview_moveto(1.0)
-        except Exception:
-            pass
-
-
-    # Animation
+    # Animation (main thread; one short after() tick per frame)
     def start_typing_animation(self):
-        self._animating = True
-        self._thinking_label = ctk.CTkLabel(self.chat_frame, text="Weather Friend is thinking", font=("Segoe UI", 14))
-        self._thinking_label.pack(anchor="w", padx=10, pady=(5, 5))
-        try:
-            self.chat_frame._parent_canvas.yview_moveto(1.0)
-        except Exception:
-            pass
-
-        def animate():
-            dots = 0
-            while self._animating:
-                dots = (dots + 1) % 4
-                if self._thinking_label:
-                    self._thinking_label.configure(text=f"Weather Friend is thinking{'.'*dots}")
-                time.sleep(0.4)
-
-        run_thread(animate)
+        if self._thinking_label is None:
+            self._thinking_label = ctk.CTkLabel(self, text="Weather Friend is thinking", font=("Segoe UI", 14))
+            self._thinking_label.pack(anchor="w", padx=30, pady=(0, 5), before=self.entry_row)
+        self._scroll_to_bottom()
+        if self._typing_timer is None:
+            self._typing_timer = ui().every(TYPING_FRAME_MS, self._typing_tick)
+
+    def _typing_tick(self):
+        self._typing_dots = (self._typing_dots + 1) % 4
+        if self._thinking_label:
+            self._thinking_label.configure(text=f"Weather Friend is thinking{'.' * self._typing_dots}")
 
     def stop_typing_animation(self):
-        self._animating = False
+        if self._typing_timer is not None:
+            self._typing_timer.cancel()
+            self._typing_timer = None
         if self._thinking_label:
             self._thinking_label.destroy()
             self._thinking_label = None
@@ -384,42 +408,73 @@ class ChatPage(ctk.CTkFrame):
         self.entry.delete(0, "end")
         self.add_message("You", user_msg)
         self.start_typing_animation()
-        threading.Thread(target=self.respond, args=(user_msg,), daemon=True).start()
+        future = run_async(self.respond(user_msg))
+        self._replies.add(future)
+        ui().post(self._sync_stop_button, key=(self, "stop"))
+        future.add_done_callback(self._reply_finished)
 
-    def respond(self, user_msg):
-        try:
-            
-            try:
-                from irfan_23522613.weather_friend.utils import parse_weather_question, generate_weather_response
-                parsed = parse_weather_question(user_msg)
-            except Exception:
-                parsed = {}
+    def _reply_finished(self, future):
+        # runs on the background loop's thread; _replies is only touched on the main thread
+        ui().post(self._forget_reply, future)
 
-            reply = None
-            if isinstance(parsed, dict) and parsed.get("location"):
-                days = parsed.get("days") or parsed.get("forecast_days") or 1
-                raw = get_weather_data(parsed["location"], days=1)
-                if isinstance(raw, dict) and raw.get("error"):
-                    reply = "Couldn't find that location—check spelling and try again."
-                else:
-                    reply = generate_weather_response(parsed, normalise_forecast_dict(raw))
+    def _forget_reply(self, future):
+        self._replies.discard(future)
+        self._sync_stop_button()
 
-            # Fallback to LLM if not a weather question or parsing failed
-            if not reply:
-                reply = talk_to_weather_friend(user_msg)
+    def _sync_stop_button(self):
+        """Enable Stop while any reply is running; decided when applied, so a late update can't go stale."""
+        self.stop_button.configure(state="normal" if self._replies else "disabled")
 
-        except Exception as e:
-            console.print_exception()
-            reply = f"⚠️ {e}"
+    def cancel_replies(self):
+        """Stop every reply still being generated (closes the LLM stream)."""
+        for future in list(self._replies):
+            future.cancel()
 
+    def _replace_thinking(self, text):
         self.stop_typing_animation()
-        self.add_message("Weather Friend", reply)
+        return self.add_message("Weather Friend", text)
+
+    async def _stream_reply(self, user_msg):
+        """
+        Grow one bot bubble as LLM chunks arrive. Every chunk queues a configure;
+        the dispatcher merges them, so the bubble redraws at most once per frame.
+        """
+        text, label = "", None
+        try:
+            async for chunk in chatbot().stream_weather_friend_async(user_msg, session=self.session_id):
+                text += chunk
+                if label is None:
+                    label = await ui().call(self._replace_thinking, text)
+                else:
+                    ui().configure(label, text=text)
+                    ui().post(self._scroll_to_bottom, key=(self, "scroll"))
+        except asyncio.CancelledError:
+            text = (text + " …" if text else "⏹ Stopped.")
+            raise
+        finally:
+            if label is None:
+                ui().post(self._replace_thinking, text or "…")
+            else:
+                ui().configure(label, text=text)
+                ui().post(self._scroll_to_bottom, key=(self, "scroll"))
+
+    async def respond(self, user_msg):
+        # Forecast questions are answered locally and arrive as one chunk;
+        # only small talk reaches the LLM and streams in word by word
+        try:
+            await self._stream_reply(user_msg)
+            # keep the city being discussed fresh for follow-up questions
+            get_prefetcher().touch(chatbot().get_session(self.session_id).last_city, count=False)
+        except Exception as e:
+            print_exception()
+            ui().post(self.add_message, "Weather Friend", f"⚠️ {e}")
 
 
 # MAIN APP
 class WeatherApp(ctk.CTk):
     def __init__(self):
         super().__init__()
+        ui_dispatch.install(self)
         self.title("Weather Friend")
         self.geometry(f"{APP_W}x{APP_H}")
         self.minsize(850, 560)
@@ -436,6 +491,19 @@ class WeatherApp(ctk.CTk):
         ctk.CTkButton(side, text="Exit", fg_color="#a32020", hover_color="#8d1a1a",
                     command=self.destroy).pack(fill="x", padx=12, pady=(24, 12))
 
+        # Stats overlay (only with WEATHER_FRIEND_METRICS=1 or --metrics)
+        self._metrics_label = None
+        if metrics.enabled():
+            self._metrics_label = ctk.CTkLabel(side, text="", font=("Consolas", 10), justify="left", anchor="w")
+            self._metrics_label.pack(side="bottom", fill="x", padx=8, pady=8)
+            self.after(METRICS_REFRESH_MS, self._refresh_metrics)
+
+        # Background refresh pauses while minimised or idle
+        self.bind("<Unmap>", lambda e: e.widget is self and get_prefetcher().set_visible(False))
+        self.bind("<Map>", lambda e: e.widget is self and get_prefetcher().set_visible(True))
+        self.bind_all("<Any-KeyPress>", lambda e: get_prefetcher().note_activity(), add="+")
+        self.bind_all("<Any-ButtonPress>", lambda e: get_prefetcher().note_activity(), add="+")
+
         # Container
         self.container = ctk.CTkFrame(self)
         self.container.grid(row=0, column=1, sticky="nswe", padx=10, pady=10)
@@ -449,6 +517,38 @@ class WeatherApp(ctk.CTk):
             p.grid(row=0, column=0, sticky="nswe")
 
         self.show_current()
+        self.after_idle(self._on_first_paint)
+
+    def _on_first_paint(self):
+        if "--exit-after-paint" in sys.argv:
+            from irfan_23522613.weather_friend.startup import first_paint_lines
+            print(first_paint_lines(STARTED, sys.modules), flush=True)
+            self.after(0, self.destroy)
+            return
+        run_async(self._warm_up())
+
+    def _refresh_metrics(self):
+        lines = metrics.overlay_lines()
+        prefetch = get_prefetcher().stats()
+        if prefetch["lookups"]:
+            lines.append(f"{'prefetch fresh':<18} {prefetch['fresh_ratio']:>6.0%} of {prefetch['lookups']}")
+        self._metrics_label.configure(text="\n".join(lines) if lines else "no timings yet")
+        self.after(METRICS_REFRESH_MS, self._refresh_metrics)
+
+    async def _warm_up(self):
+        """Load the forecast stack off the UI thread so the first Fetch doesn't pay for it."""
+        try:
+            # Everything here is blocking (imports, SQLite, directories, file rewrites), so it
+            # runs in worker threads: fetches and chat replies on this loop aren't held up
+            wd = await asyncio.to_thread(weather_data)
+            # Serve last-known forecasts instantly after a restart
+            await asyncio.to_thread(wd.enable_store)
+            # Keep every forecast for the history chart; apply retention once per launch
+            archive = await asyncio.to_thread(wd.enable_archive)
+            await asyncio.to_thread(get_prefetcher().start)
+            await asyncio.to_thread(archive.compact)
+        except Exception:
+            print_exception()
 
     def show_current(self): self.page_current.tkraise()
     def show_forecast(self): self.page_forecast.tkraise()
@@ -456,10 +556,18 @@ class WeatherApp(ctk.CTk):
 
 
 if __name__ == "__main__":
+    if "--startup-report" in sys.argv:
+        from irfan_23522613.weather_friend.startup import main as startup_report
+        sys.exit(startup_report(os.path.abspath(__file__), sys.argv[1:]))
+
+    if "--metrics" in sys.argv:
+        metrics.enable()
+
     try:
         app = WeatherApp()
         app.protocol("WM_DELETE_WINDOW", app.quit)
         app.mainloop()
     finally:
+        get_prefetcher().stop()
         print("✅ Weather Friend closed safely.")
         sys.exit(0)
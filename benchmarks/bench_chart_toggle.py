@@ -0,0 +1,73 @@
+"""
+Temperature/Humidity toggle latency: rebuilding a figure per toggle (the old
+ForecastPage.refresh_plot) vs updating one ForecastChart in place.
+
+    python benchmarks/bench_chart_toggle.py --toggles 40
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# PATH FIX
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from irfan_23522613.weather_friend.forecast import Forecast
+from irfan_23522613.weather_friend.visualisation import (
+    ForecastChart,
+    create_precipitation_visualisation,
+    create_temperature_visualisation,
+)
+from stub_server import fake_forecast
+
+
+def rebuild_each_time(data, toggles):
+    samples = []
+    for i in range(toggles):
+        start = time.perf_counter()
+        if i % 2 == 0:
+            fig = create_temperature_visualisation(data)
+        else:
+            fig = create_precipitation_visualisation(data)
+        FigureCanvasAgg(fig).draw()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def update_in_place(data, toggles):
+    chart = ForecastChart()
+    canvas = FigureCanvasAgg(chart.fig)
+    samples = []
+    for i in range(toggles):
+        start = time.perf_counter()
+        chart.update(data, "Temperature" if i % 2 == 0 else "Humidity")
+        canvas.draw()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--toggles", type=int, default=40)
+    args = parser.parse_args()
+
+    data = {"city": "Perth", "forecast": Forecast.from_items(fake_forecast("Perth")["list"])}
+    print(f"{args.toggles} toggles, 40-slot forecast")
+    for name, run in (("rebuild figure", rebuild_each_time), ("update in place", update_in_place)):
+        before = len(plt.get_fignums())
+        samples = run(data, args.toggles)
+        after = len(plt.get_fignums())
+        print(f"{name:<16} median {statistics.median(samples) * 1000:6.1f} ms   "
+              f"p95 {sorted(samples)[int(len(samples) * 0.95) - 1] * 1000:6.1f} ms   "
+              f"open figures +{after - before}")
+        plt.close("all")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Time-to-first-token and total time for chat replies, blocking vs streamed,
+against the local stand-in Ollama server.
+
+    python benchmarks/bench_chat_stream.py --latency 0.3 --token-delay 0.03
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# PATH FIX
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from irfan_23522613.weather_friend import chatbot
+from irfan_23522613.weather_friend.memory import ConversationMemory
+from stub_server import start_stub_server
+
+# Both modes must reach the model: with the response cache on, the streamed runs
+# would be answered from replies the blocking runs just cached
+BLOCKING_SESSION = ConversationMemory(chatbot.SYSTEM_PROMPT, use_response_cache=False)
+STREAM_SESSION = ConversationMemory(chatbot.SYSTEM_PROMPT, use_response_cache=False)
+
+
+def blocking(message):
+    start = time.perf_counter()
+    chatbot.talk_to_weather_friend(message, session=BLOCKING_SESSION)
+    total = time.perf_counter() - start
+    return total, total  # nothing is visible until the whole reply arrives
+
+
+def streamed(message):
+    start = time.perf_counter()
+    first = None
+    for _ in chatbot.stream_weather_friend(message, session=STREAM_SESSION):
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.3, help="stub delay before the first token (s)")
+    parser.add_argument("--token-delay", type=float, default=0.03, help="stub delay between words (s)")
+    args = parser.parse_args()
+
+    server, base = start_stub_server(latency=args.latency, token_delay=args.token_delay)
+    chatbot.OLLAMA_HOST = base
+
+    print(f"{args.runs} runs, first-token delay {args.latency * 1000:.0f} ms, "
+          f"{args.token_delay * 1000:.0f} ms/word")
+    print(f"{'mode':<10} {'first text (ms)':>16} {'total (ms)':>11}")
+    for name, run in (("blocking", blocking), ("streamed", streamed)):
+        samples = [run(f"tell me something fun #{i}") for i in range(args.runs)]
+        ttft = statistics.median(s[0] for s in samples) * 1000
+        total = statistics.median(s[1] for s in samples) * 1000
+        print(f"{name:<10} {ttft:>16.0f} {total:>11.0f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Columnar Forecast vs the old list-of-dicts path: decode time, `days` slicing,
+per-chart data preparation, and memory held per cached forecast.
+
+    python benchmarks/bench_forecast.py --cities 500
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+# PATH FIX
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pandas as pd
+
+from irfan_23522613.weather_friend.forecast import Forecast
+from stub_server import fake_forecast
+
+
+def legacy_decode(data):
+    """The list-of-dicts decoding get_weather_data used before Forecast."""
+    forecast = []
+    for item in data.get("list", []):
+        main = item.get("main", {})
+        weather = (item.get("weather") or [{}])[0]
+        wind = item.get("wind", {})
+        forecast.append({
+            "time": item.get("dt_txt"),
+            "temp": main.get("temp"),
+            "humidity": main.get("humidity"),
+            "wind_speed": wind.get("speed", "—"),
+            "description": weather.get("description", "Unknown"),
+        })
+    return forecast
+
+
+def legacy_plot_prep(forecast):
+    """What each create_*_visualisation call used to do before plotting."""
+    df = pd.DataFrame(forecast)
+    df["time"] = pd.to_datetime(df["time"])
+    return df["time"], df["temp"]
+
+
+def columnar_plot_prep(forecast):
+    return forecast.time, forecast.temp
+
+
+def timed(fn, items, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e6  # µs per item
+
+
+def held_bytes(build, raws):
+    tracemalloc.start()
+    kept = [build(raw) for raw in raws]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current / len(raws)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cities", type=int, default=500)
+    args = parser.parse_args()
+
+    raws = [fake_forecast(f"city {i}") for i in range(args.cities)]
+    legacy = [legacy_decode(raw) for raw in raws]
+    columnar = [Forecast.from_items(raw["list"]) for raw in raws]
+
+    rows = [
+        ("decode response", timed(legacy_decode, raws),
+         timed(lambda raw: Forecast.from_items(raw["list"]), raws)),
+        ("slice to 2 days", timed(lambda f: [dict(s) for s in f[:16]], legacy),
+         timed(lambda f: f.head(16), columnar)),
+        ("chart data prep", timed(legacy_plot_prep, legacy[:100]),
+         timed(columnar_plot_prep, columnar)),
+    ]
+    print(f"{args.cities} forecasts x 40 slots")
+    print(f"{'step':<18} {'list-of-dicts':>14} {'columnar':>10} {'speed-up':>9}")
+    for name, old, new in rows:
+        print(f"{name:<18} {old:>11.1f} µs {new:>7.1f} µs {old / new:>8.1f}x")
+
+    old_mem = held_bytes(legacy_decode, raws)
+    new_mem = held_bytes(lambda raw: Forecast.from_items(raw["list"]), raws)
+    print(f"{'memory/forecast':<18} {old_mem / 1024:>11.1f} KB {new_mem / 1024:>7.1f} KB {old_mem / new_mem:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
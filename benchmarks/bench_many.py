@@ -0,0 +1,57 @@
+"""
+Throughput of get_weather_data_many against the local stub server.
+
+    python benchmarks/bench_many.py --cities 200 --latency 0.05
+
+Every run uses fresh city names so the forecast cache never answers.
+"""
+import argparse
+import os
+import sys
+import time
+
+# PATH FIX
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from irfan_23522613.weather_friend import transport, weather_data
+from irfan_23522613.weather_friend.scheduler import get_scheduler
+from stub_server import FORECAST_PATH, start_stub_server
+
+
+def run(n_cities, workers, tag):
+    cities = [f"site {tag} {i}" for i in range(n_cities)] + ["zz typo"]
+    errors = 0
+    start = time.perf_counter()
+    for city, data in weather_data.get_weather_data_many(cities, days=5, max_workers=workers):
+        errors += "error" in data
+    elapsed = time.perf_counter() - start
+    return len(cities) / elapsed, elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cities", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub response delay (s)")
+    parser.add_argument("--workers", default="1,2,4,8,16,32")
+    args = parser.parse_args()
+
+    server, base = start_stub_server(latency=args.latency)
+    weather_data.BASE_URL_FORECAST = base + FORECAST_PATH
+    levels = [int(w) for w in args.workers.split(",")]
+    transport.configure(pool_maxsize=max(levels))
+    get_scheduler().set_rate(0)   # measuring concurrency, not the free-plan quota
+
+    print(f"{args.cities} cities, stub latency {args.latency * 1000:.0f} ms")
+    print(f"{'workers':>8} {'cities/s':>10} {'seconds':>9} {'speed-up':>9}")
+    baseline = None
+    for workers in levels:
+        rate, elapsed, errors = run(args.cities, workers, tag=workers)
+        baseline = baseline or rate
+        print(f"{workers:>8} {rate:>10.1f} {elapsed:>9.2f} {rate / baseline:>8.1f}x  ({errors} error)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+parse_weather_question throughput and accuracy: the original regex-only
+parser vs the gazetteer-backed one, over a generated corpus of questions.
+
+    python benchmarks/bench_parse.py --questions 20000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+# PATH FIX
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from irfan_23522613.weather_friend.gazetteer import get_gazetteer
+from irfan_23522613.weather_friend.utils import parse_weather_question
+
+TEMPLATES = [
+    "what's the weather in {city}?",
+    "will it rain in {city} tomorrow",
+    "{city} forecast for the next 5 days",
+    "how hot is it in {city} now",
+    "weather for {city} next week",
+    "is it windy at {city} today",
+    "should I pack an umbrella for {city}",
+    "temperature {city} in three days",
+]
+NOT_WEATHER = [
+    "what is in the news",
+    "is it nice out",
+    "tell me a joke",
+    "what about at the beach",
+    "I am reading a book",
+    "how do you do",
+]
+
+
+def regex_parse(question: str):
+    """The parser as it was before the gazetteer: city is whatever follows in/for/at."""
+    question = question.lower()
+    city = None
+    city_match = re.search(r"(?:in|for|at)\s+([a-zA-Z\s]+?)(?:\s+(?:today|tomorrow|next|now))?$", question)
+    if city_match:
+        city = city_match.group(1).strip()
+    return {"location": city}
+
+
+def corpus(n, seed=1):
+    rng = random.Random(seed)
+    names = [place.name for place in get_gazetteer().places()]
+    out = []
+    for _ in range(n):
+        if rng.random() < 0.2:
+            out.append((rng.choice(NOT_WEATHER), None))
+        else:
+            city = rng.choice(names)
+            out.append((rng.choice(TEMPLATES).format(city=city), city))
+    return out
+
+
+def run(parse, questions):
+    start = time.perf_counter()
+    results = [parse(q)["location"] for q, _ in questions]
+    elapsed = time.perf_counter() - start
+    correct = sum(
+        (got is None and want is None) or (got is not None and want is not None and got.lower() == want.lower())
+        for got, (_, want) in zip(results, questions)
+    )
+    return elapsed, correct / len(questions)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=20000)
+    args = parser.parse_args()
+
+    get_gazetteer()  # load the index outside the timed loop
+    questions = corpus(args.questions)
+    print(f"{len(questions)} questions, {len(get_gazetteer())} gazetteer names")
+    print(f"{'parser':<10} {'µs/question':>12} {'accuracy':>9}")
+    for name, parse in (("regex", regex_parse), ("gazetteer", parse_weather_question)):
+        elapsed, accuracy = run(parse, questions)
+        print(f"{name:<10} {elapsed / len(questions) * 1e6:>12.1f} {accuracy:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
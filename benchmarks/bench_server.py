@@ -0,0 +1,118 @@
+"""
+Throughput of the headless API server under concurrent clients, against the
+local stub for OpenWeather and Ollama.
+
+    python benchmarks/bench_server.py --clients 32 --duration 10 --render-workers 4
+    python benchmarks/bench_server.py --mix chart --no-chart-cache   # every chart is drawn
+
+Each client is a thread with its own keep-alive connection issuing
+back-to-back requests; --mix picks the endpoints (forecast, chart, chat or
+all of them round-robin).
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+# PATH FIX
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+import requests
+
+from irfan_23522613.weather_friend import chatbot, server, weather_data
+from irfan_23522613.weather_friend.cache import TTLCache
+from irfan_23522613.weather_friend.scheduler import get_scheduler
+from stub_server import FORECAST_PATH, start_stub_server
+
+MIXES = {
+    "forecast": ("forecast",),
+    "chart": ("chart",),
+    "chat": ("chat",),
+    "all": ("forecast", "chart", "chat"),
+}
+
+
+def client(base, kinds, cities, deadline, seed, out):
+    rng = random.Random(seed)
+    session = requests.Session()
+    chat_session = f"bench-{seed}"
+    i = 0
+    while time.perf_counter() < deadline:
+        kind = kinds[i % len(kinds)]
+        i += 1
+        city = rng.choice(cities)
+        start = time.perf_counter()
+        if kind == "forecast":
+            r = session.get(f"{base}/forecast", params={"city": city, "days": rng.randint(1, 5)})
+        elif kind == "chart":
+            r = session.get(f"{base}/chart.png", params={
+                "city": city, "days": rng.randint(1, 5), "series": rng.choice(("temperature", "humidity")),
+            })
+        else:
+            r = session.post(f"{base}/chat", json={"message": f"will it rain in {city} tomorrow?",
+                                                   "session": chat_session})
+        out.append((kind, r.status_code == 200, time.perf_counter() - start))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--mix", choices=sorted(MIXES), default="all")
+    parser.add_argument("--cities", type=int, default=50, help="distinct cities requested")
+    parser.add_argument("--render-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--no-chart-cache", action="store_true", help="draw every chart request")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub OpenWeather/Ollama latency (s)")
+    args = parser.parse_args()
+
+    stub, stub_base = start_stub_server(latency=args.latency)
+    weather_data.BASE_URL_FORECAST = stub_base + FORECAST_PATH
+    chatbot.OLLAMA_HOST = stub_base
+    get_scheduler().set_rate(0)   # the stub has no quota
+    if args.no_chart_cache:
+        server.chart_cache = TTLCache(maxsize=1)
+
+    api = server.make_server(port=0, render_workers=args.render_workers)
+    threading.Thread(target=api.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{api.server_port}"
+    # start the render workers before timing
+    requests.get(f"{base}/chart.png", params={"city": "Perth"}).raise_for_status()
+
+    cities = [f"bench town {i}" for i in range(args.cities)]
+    results = []
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=client, args=(base, MIXES[args.mix], cities, deadline, seed, results))
+        for seed in range(args.clients)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    print(f"{args.clients} clients, {args.duration:g} s, mix={args.mix}, {args.render_workers} render workers, "
+          f"chart cache {'off' if args.no_chart_cache else 'on'}, stub latency {args.latency * 1000:.0f} ms")
+    print(f"{'endpoint':<9} {'requests':>8} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for kind in MIXES[args.mix] + (("all",) if len(MIXES[args.mix]) > 1 else ()):
+        picked = [r for r in results if kind in ("all", r[0])]
+        if not picked:
+            continue
+        ms = np.array([r[2] for r in picked]) * 1000
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        print(f"{kind:<9} {len(picked):>8} {sum(not r[1] for r in picked):>7} {len(picked) / wall:>8.1f} "
+              f"{p50:>8.1f} {p95:>8.1f} {p99:>8.1f}")
+
+    api.shutdown()
+    server.shutdown_render_pool()
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Load generator for get_weather_data and talk_to_weather_friend.
+
+Requests are started on a fixed schedule (--rate per second for --duration
+seconds) whether or not earlier ones have finished, and latency is measured
+from each request's scheduled start, so queueing delay shows up in the
+percentiles instead of silently lowering the request rate.
+
+    python benchmarks/load_test.py --rate 200 --duration 10 --latency 0.08 --jitter 0.04
+    python benchmarks/load_test.py --scenario mixed --chat-share 0.2 --error-rate 0.02
+    WEATHER_FRIEND_FORECAST_URL=http://127.0.0.1:8765/data/2.5/forecast \\
+        OLLAMA_HOST=http://127.0.0.1:8765 python benchmarks/load_test.py
+
+Without the environment variables (or --target) a stub server is started
+in-process with the --latency/--jitter/--error-rate/--slots options.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# PATH FIX
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from irfan_23522613.weather_friend import chatbot, weather_data
+from irfan_23522613.weather_friend.memory import ConversationMemory
+from irfan_23522613.weather_friend.scheduler import get_scheduler
+from stub_server import FORECAST_PATH, start_stub_server
+
+
+def weather_call(i, args):
+    # cold: every request names a new city; warm: cycle through --cities names
+    city = f"loadtest city {i % args.cities if args.cities else i}"
+    data = weather_data.get_weather_data(city, days=5)
+    return "error" not in data
+
+
+def chat_call(i, args):
+    # a fresh session without the response cache, so every call reaches the model
+    session = ConversationMemory(chatbot.SYSTEM_PROMPT, use_response_cache=False)
+    reply = chatbot.talk_to_weather_friend(f"tell me something fun about clouds, take {i}", session=session)
+    return not reply.startswith("⚠️")
+
+
+def run_load(args):
+    """Fire requests on schedule; returns [(kind, ok, latency_s)] and the wall time."""
+    rng = random.Random(args.seed)
+    total = int(args.rate * args.duration)
+    plan = []
+    for i in range(total):
+        if args.scenario == "chat" or (args.scenario == "mixed" and rng.random() < args.chat_share):
+            plan.append(("chat", chat_call))
+        else:
+            plan.append(("weather", weather_call))
+
+    results = []
+    results_lock = threading.Lock()
+
+    def job(i, kind, call, scheduled):
+        try:
+            ok = call(i, args)
+        except Exception:
+            ok = False
+        latency = time.perf_counter() - scheduled
+        with results_lock:
+            results.append((kind, ok, latency))
+
+    executor = ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="load")
+    start = time.perf_counter()
+    for i, (kind, call) in enumerate(plan):
+        scheduled = start + i / args.rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        executor.submit(job, i, kind, call, scheduled)
+    executor.shutdown(wait=True)
+    return results, time.perf_counter() - start
+
+
+def summarise(results, wall):
+    rows = {}
+    for kind in sorted({r[0] for r in results}) + ["all"]:
+        picked = [r for r in results if kind in ("all", r[0])]
+        latency_ms = np.array([r[2] for r in picked]) * 1000
+        p50, p95, p99 = np.percentile(latency_ms, [50, 95, 99])
+        rows[kind] = {
+            "requests": len(picked),
+            "errors": sum(not r[1] for r in picked),
+            "throughput_rps": len(picked) / wall,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+            "max_ms": float(latency_ms.max()),
+        }
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=("weather", "chat", "mixed"), default="weather")
+    parser.add_argument("--rate", type=float, default=100, help="requests started per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load")
+    parser.add_argument("--concurrency", type=int, default=64, help="worker threads (max requests in flight)")
+    parser.add_argument("--cities", type=int, default=0, help="distinct cities to cycle through (0 = all new)")
+    parser.add_argument("--chat-share", type=float, default=0.2, help="fraction of chat calls in --scenario mixed")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", metavar="PATH", help="also write the summary as JSON")
+    parser.add_argument("--target", help="base URL of an already running stub (default: start one in-process)")
+    stub = parser.add_argument_group("in-process stub")
+    stub.add_argument("--latency", type=float, default=0.05)
+    stub.add_argument("--jitter", type=float, default=0.0)
+    stub.add_argument("--token-delay", type=float, default=0.0)
+    stub.add_argument("--error-rate", type=float, default=0.0)
+    stub.add_argument("--error-status", type=int, default=500)
+    stub.add_argument("--slots", type=int, default=40)
+    parser.add_argument("--rpm", type=int, default=0,
+                        help="OpenWeather quota for the scheduler, requests/minute (default 0: unlimited)")
+    args = parser.parse_args()
+    get_scheduler().set_rate(args.rpm)
+
+    server = None
+    if args.target:
+        weather_data.BASE_URL_FORECAST = args.target.rstrip("/") + FORECAST_PATH
+        chatbot.OLLAMA_HOST = args.target.rstrip("/")
+    elif "WEATHER_FRIEND_FORECAST_URL" not in os.environ:
+        server, base = start_stub_server(
+            latency=args.latency, token_delay=args.token_delay, jitter=args.jitter,
+            error_rate=args.error_rate, error_status=args.error_status, slots=args.slots,
+        )
+        weather_data.BASE_URL_FORECAST = base + FORECAST_PATH
+        chatbot.OLLAMA_HOST = base
+
+    print(f"{args.scenario}: {args.rate:g} req/s for {args.duration:g} s, "
+          f"{args.concurrency} workers -> {weather_data.BASE_URL_FORECAST}")
+    results, wall = run_load(args)
+    rows = summarise(results, wall)
+
+    print(f"\n{'kind':<8} {'requests':>8} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for kind, row in rows.items():
+        print(f"{kind:<8} {row['requests']:>8} {row['errors']:>7} {row['throughput_rps']:>8.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}")
+    scheduler = get_scheduler().stats()
+    print(f"\nscheduler: {scheduler['retries']} retries, errors {scheduler['errors'] or 'none'}, "
+          f"max queue {scheduler['max_queue_depth']}, "
+          f"quota wait p95 {scheduler['interactive_wait_ms_p95']:.1f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "wall_s": wall, "summary": rows, "scheduler": scheduler}, f, indent=2)
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Local stand-in for the OpenWeather 5-day / 3-hour forecast endpoint and the
+Ollama chat endpoint.
+
+    python benchmarks/stub_server.py --port 8765 --latency 0.05 --token-delay 0.02
+    python benchmarks/stub_server.py --latency 0.08 --jitter 0.04 --error-rate 0.02 --slots 40
+
+Point the app at it with the environment variables
+WEATHER_FRIEND_FORECAST_URL=<base>/data/2.5/forecast and OLLAMA_HOST=<base>
+(or set weather_data.BASE_URL_FORECAST / chatbot.OLLAMA_HOST in-process).
+City names starting with "zz" return 404, like a misspelt city; lat/lon and
+id queries always succeed. Chat replies stream one word every --token-delay
+seconds when the request asks for "stream": true.
+
+Every response waits --latency plus up to --jitter seconds; --error-rate of
+requests fail with --error-status. --slots sets the forecast size (a `cnt`
+query parameter overrides it, as with the real API) and --reply-words the
+chat reply length.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FORECAST_PATH = "/data/2.5/forecast"
+CHAT_PATH = "/api/chat"
+CHAT_REPLY = "Clouds are just the sky's pillows having a lazy afternoon — bring a jacket and a smile, friend!"
+
+
+def fake_forecast(city: str, slots: int = 40) -> dict:
+    """A forecast response shaped like OpenWeather's, with deterministic values."""
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start -= timedelta(hours=start.hour % 3)
+    seed = sum(map(ord, city))
+    items = []
+    for i in range(slots):
+        t = start + timedelta(hours=3 * i)
+        items.append({
+            "dt": int(t.timestamp()),
+            "dt_txt": t.strftime("%Y-%m-%d %H:%M:%S"),
+            "main": {
+                "temp": round(12 + (seed % 15) + 6 * ((i % 8) in (3, 4, 5)) + 0.1 * i, 2),
+                "humidity": 40 + (seed + 7 * i) % 55,
+            },
+            "weather": [{"description": "light rain" if (seed + i) % 5 == 0 else "scattered clouds"}],
+            "wind": {"speed": round(1 + ((seed + 3 * i) % 90) / 10, 1)},
+            "pop": round(((seed + i) % 10) / 10, 1),
+        })
+    return {"cod": "200", "cnt": slots, "list": items, "city": {"name": city.title()}}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, like the real API
+    disable_nagle_algorithm = True
+    latency = 0.0
+    jitter = 0.0
+    token_delay = 0.0
+    error_rate = 0.0
+    error_status = 500
+    slots = 40
+    reply = CHAT_REPLY
+
+    def _delay(self):
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+
+    def _fail(self):
+        """Send an injected error response, at --error-rate; True when one was sent."""
+        if self.error_rate and random.random() < self.error_rate:
+            self._send(self.error_status, {"cod": str(self.error_status), "error": "injected failure"})
+            return True
+        return False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        self._delay()
+
+        if url.path != FORECAST_PATH:
+            return self._send(404, {"cod": "404", "message": "not found"})
+        city = (query.get("q") or [""])[0]
+        if "lat" in query and "lon" in query:
+            city = f"{query['lat'][0]},{query['lon'][0]}"
+        elif "id" in query:
+            city = f"city {query['id'][0]}"
+        if not city or city.lower().startswith("zz"):
+            return self._send(404, {"cod": "404", "message": "city not found"})
+        if self._fail():
+            return
+        slots = int((query.get("cnt") or [self.slots])[0])
+        self._send(200, fake_forecast(city, slots))
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if urlparse(self.path).path != CHAT_PATH:
+            return self._send(404, {"error": "not found"})
+        self._delay()
+        if self._fail():
+            return
+
+        words = self.reply.split(" ")
+        prompt_tokens = sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4
+        model = body.get("model", "stub")
+        if not body.get("stream"):
+            time.sleep(self.token_delay * len(words))
+            return self._send(200, self._chat_chunk(model, self.reply, True, prompt_tokens, len(words)))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, word in enumerate(words):
+            if i and self.token_delay:
+                time.sleep(self.token_delay)
+            self._write_chunk(self._chat_chunk(model, word if i == 0 else " " + word, False))
+        self._write_chunk(self._chat_chunk(model, "", True, prompt_tokens, len(words)))
+        self.wfile.write(b"0\r\n\r\n")
+
+    @staticmethod
+    def _chat_chunk(model, content, done, prompt_tokens=None, eval_count=None):
+        chunk = {
+            "model": model,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "message": {"role": "assistant", "content": content},
+            "done": done,
+        }
+        if done:
+            chunk.update(done_reason="stop", prompt_eval_count=prompt_tokens, eval_count=eval_count)
+        return chunk
+
+    def _write_chunk(self, body):
+        data = json.dumps(body).encode() + b"\n"
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def chat_reply(words: int = None) -> str:
+    """CHAT_REPLY repeated or cut to `words` words (unchanged when None)."""
+    if not words:
+        return CHAT_REPLY
+    base = CHAT_REPLY.split(" ")
+    return " ".join(base[i % len(base)] for i in range(words))
+
+
+def start_stub_server(host="127.0.0.1", port=0, latency=0.0, token_delay=0.0, jitter=0.0,
+                      error_rate=0.0, error_status=500, slots=40, reply_words=None):
+    """Start the stub in a daemon thread; returns (server, base_url)."""
+    handler = type("Handler", (StubHandler,), {
+        "latency": latency,
+        "jitter": jitter,
+        "token_delay": token_delay,
+        "error_rate": error_rate,
+        "error_status": error_status,
+        "slots": slots,
+        "reply": chat_reply(reply_words),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.request_queue_size = 256
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay, up to this many seconds")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between streamed chat words")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail (0-1)")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of injected failures")
+    parser.add_argument("--slots", type=int, default=40, help="3-hour slots per forecast response")
+    parser.add_argument("--reply-words", type=int, help="words per chat reply")
+    args = parser.parse_args()
+
+    server, base = start_stub_server(
+        args.host, args.port, args.latency, args.token_delay, args.jitter,
+        args.error_rate, args.error_status, args.slots, args.reply_words,
+    )
+    print(f"Stub OpenWeather listening on {base}{FORECAST_PATH}")
+    print(f"Stub Ollama chat listening on {base}{CHAT_PATH}")
+    print(f"  WEATHER_FRIEND_FORECAST_URL={base}{FORECAST_PATH} OLLAMA_HOST={base}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
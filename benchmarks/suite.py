@@ -0,0 +1,338 @@
+"""
+Offline benchmark suite for the paths users hit most: question parsing,
+forecast JSON decoding, normalise_forecast_dict, forecast analytics, the
+forecast archive and chart rendering.
+
+    python benchmarks/suite.py                          # run all, save results
+    python benchmarks/suite.py --filter chart --quick
+    python benchmarks/suite.py --compare benchmarks/results/<commit>.json
+
+Each run is saved as benchmarks/results/<commit>.json (suffixed -dirty when
+the tree has uncommitted changes). --compare prints the ratio against an
+earlier result file and exits with status 1 when any case got slower than
+--threshold, so it can gate a change. Compare results from the same machine.
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime, timezone
+
+# PATH FIX
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from irfan_23522613.weather_friend import analytics, weather_data
+from irfan_23522613.weather_friend.archive import DAY, ForecastArchive
+from irfan_23522613.weather_friend.forecast import Forecast
+from irfan_23522613.weather_friend.utils import parse_weather_question
+from irfan_23522613.weather_friend.visualisation import (
+    create_history_visualisation,
+    create_precipitation_visualisation,
+    create_temperature_visualisation,
+)
+from stub_server import fake_forecast
+from WeatherFriend import normalise_forecast_dict
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+CHART_SIZES = (8, 16, 40, 120)   # slots: 1 day, 2 days, the full 5 days, a 15-day stress case
+
+CASES = {}
+
+
+def case(name):
+    """Register `setup` under `name`; setup() returns the zero-argument callable to time."""
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+# --- parse_weather_question ---
+
+@case("parse/known_city")
+def _():
+    return lambda: parse_weather_question("will it rain in Perth tomorrow afternoon?")
+
+
+@case("parse/multi_word_alias")
+def _():
+    return lambda: parse_weather_question("what's the weather like for nyc over the next 5 days")
+
+
+@case("parse/unknown_town")
+def _():
+    return lambda: parse_weather_question("weather in smallville tomorrow")
+
+
+@case("parse/small_talk")
+def _():
+    return lambda: parse_weather_question("tell me something funny about clouds")
+
+
+# --- forecast decoding (what get_weather_data does with a 200 response) ---
+
+def _decode(body):
+    payload, _ = weather_data._interpret_response("Perth", 200, lambda: json.loads(body))
+    return weather_data._slice_forecast(payload, 5)
+
+
+@case("decode/forecast_40_slots")
+def _():
+    body = json.dumps(fake_forecast("Perth")).encode()
+    return lambda: _decode(body)
+
+
+@case("decode/slice_1_day")
+def _():
+    payload, _ = weather_data._interpret_response("Perth", 200, lambda: fake_forecast("Perth"))
+    return lambda: weather_data._slice_forecast(payload, 1)
+
+
+# --- normalise_forecast_dict, one case per input shape it accepts ---
+
+@case("normalise/get_weather_data")
+def _():
+    data = _decode(json.dumps(fake_forecast("Perth")))
+    return lambda: normalise_forecast_dict(data)
+
+
+@case("normalise/raw_openweather_list")
+def _():
+    raw = fake_forecast("Perth")
+    return lambda: normalise_forecast_dict(raw)
+
+
+@case("normalise/current_hourly")
+def _():
+    raw = fake_forecast("Perth")
+    hourly = {
+        "city": "Perth",
+        "current": {"temp": 21.0, "humidity": 60},
+        "hourly": [{"time": i["dt_txt"], "temp": i["main"]["temp"], "humidity": i["main"]["humidity"]}
+                   for i in raw["list"]],
+    }
+    return lambda: normalise_forecast_dict(hourly)
+
+
+# --- analytics: daily rollups, derived metrics, rain windows, trends ---
+
+@case("analytics/summarise_1_city")
+def _():
+    data = _decode(json.dumps(fake_forecast("Perth")))
+    return lambda: analytics.summarise_batch(analytics.ForecastBatch.from_payloads([data]))
+
+
+@case("analytics/summarise_cached")
+def _():
+    data = _decode(json.dumps(fake_forecast("Perth")))
+    analytics.summarise(data)
+    return lambda: analytics.summarise(data)
+
+
+@case("analytics/batch_200_cities")
+def _():
+    payloads = [_decode(json.dumps(fake_forecast(f"city {i}"))) for i in range(200)]
+    return lambda: analytics.summarise_batch(analytics.ForecastBatch.from_payloads(payloads))
+
+
+# --- archive: appending issues and multi-week queries over memory-mapped months ---
+
+ARCHIVE_DAYS = 60   # eight issues a day, 40 slots each: ~19k rows over three months
+
+
+def _issue(forecast, issued):
+    """`forecast` re-dated as if issued at `issued`."""
+    time = (issued + 10800 * np.arange(1, len(forecast) + 1)).astype("int64").astype("datetime64[s]")
+    return Forecast(time, forecast.temp, forecast.humidity, forecast.wind_speed, forecast.description, forecast.pop)
+
+
+_scratch = None
+
+
+def _scratch_dir():
+    """A temporary directory for the whole run, removed when the suite exits."""
+    global _scratch
+    if _scratch is None:
+        _scratch = tempfile.TemporaryDirectory(prefix="wf-archive-")
+        atexit.register(_scratch.cleanup)
+    return _scratch.name
+
+
+def _filled_archive():
+    forecast = _decode(json.dumps(fake_forecast("Perth")))["forecast"]
+    archive = ForecastArchive(tempfile.mkdtemp(dir=_scratch_dir()))
+    now = time.time() // 10800 * 10800
+    for issued in range(int(now - ARCHIVE_DAYS * DAY), int(now) + 1, 10800):
+        archive.append("perth", _issue(forecast, issued), issued)
+    return archive, now, forecast
+
+
+@case("archive/append_issue")
+def _():
+    archive, now, forecast = _filled_archive()
+    issues = iter(range(int(now) + 10800, 2**32, 10800))
+
+    def append():
+        issued = next(issues)
+        archive.append("perth", _issue(forecast, issued), issued)
+    return append
+
+
+@case("archive/history_21_days")
+def _():
+    archive, now, _ = _filled_archive()
+    return lambda: archive.history("perth", now - 21 * DAY, now + 5 * DAY)
+
+
+@case("archive/issued_last_day")
+def _():
+    archive, now, _ = _filled_archive()
+    return lambda: archive.query("perth", now - DAY, now, by="issued")
+
+
+@case("chart/history_21_days")
+def _():
+    archive, now, _ = _filled_archive()
+    history = archive.history("perth", now - 21 * DAY, now + 5 * DAY)
+
+    def render():
+        fig = create_history_visualisation(history, "Perth")
+        fig.canvas.draw()
+        plt.close(fig)
+    return render
+
+
+# --- charts: build and render to pixels, as the dashboard does ---
+
+def _chart_case(create, slots):
+    data = _decode(json.dumps(fake_forecast("Perth", slots=slots)))
+
+    def run():
+        fig = create(data)
+        fig.canvas.draw()
+        plt.close(fig)
+    return run
+
+
+for _slots in CHART_SIZES:
+    case(f"chart/temperature_{_slots}")(lambda slots=_slots: _chart_case(create_temperature_visualisation, slots))
+    case(f"chart/humidity_{_slots}")(lambda slots=_slots: _chart_case(create_precipitation_visualisation, slots))
+
+
+def measure(fn, repeat=5, min_time=0.2):
+    """Per-call seconds over `repeat` rounds, each long enough (>= min_time) to time reliably."""
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    rounds = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "min_us": min(rounds) * 1e6,
+        "median_us": statistics.median(rounds) * 1e6,
+        "stdev_us": statistics.stdev(rounds) * 1e6 if len(rounds) > 1 else 0.0,
+        "calls_per_round": number,
+    }
+
+
+def git_commit():
+    """Short HEAD hash, plus -dirty when the tree has uncommitted changes ("unknown" outside git)."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(names, repeat, min_time):
+    results = {}
+    for name in names:
+        results[name] = measure(CASES[name](), repeat=repeat, min_time=min_time)
+        print(f"{name:<34} {results[name]['median_us']:>12.1f} µs  (min {results[name]['min_us']:.1f})")
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    """Print current vs baseline medians; returns the names that regressed past `threshold`."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline.get('commit', baseline_path)}  (regression threshold {threshold:.2f}x)")
+    print(f"{'case':<34} {'before µs':>12} {'after µs':>12} {'ratio':>7}")
+    regressed = []
+    for name, now in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<34} {'—':>12} {now['median_us']:>12.1f}     new")
+            continue
+        ratio = now["median_us"] / before["median_us"]
+        flag = ""
+        if ratio > threshold:
+            regressed.append(name)
+            flag = "  ❌ slower"
+        elif ratio < 1 / threshold:
+            flag = "  ✅ faster"
+        print(f"{name:<34} {before['median_us']:>12.1f} {now['median_us']:>12.1f} {ratio:>6.2f}x{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="fewer, shorter rounds (noisier)")
+    parser.add_argument("--compare", metavar="RESULTS_JSON", help="earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    parser.add_argument("--output", help="where to save results (default: results/<commit>.json)")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    names = [name for name in CASES if args.filter in name]
+    if not names:
+        parser.error(f"no benchmark matches {args.filter!r}")
+    repeat, min_time = (3, 0.05) if args.quick else (5, 0.2)
+
+    commit = git_commit()
+    started = time.perf_counter()
+    results = run_suite(names, repeat, min_time)
+    print(f"\n{len(names)} cases in {time.perf_counter() - started:.1f} s at {commit}")
+
+    if not args.no_save:
+        path = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        record = {
+            "commit": commit,
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__,
+            "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)",
+            "results": results,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+        print(f"saved {os.path.relpath(path)}")
+
+    if args.compare:
+        regressed = compare(results, args.compare, args.threshold)
+        if regressed:
+            print(f"\n❌ {len(regressed)} regression(s): {', '.join(regressed)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
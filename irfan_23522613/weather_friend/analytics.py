@@ -0,0 +1,302 @@
+"""
+Forecast analytics computed on whole arrays: one city or hundreds at once.
+
+ForecastBatch stacks N forecasts into (N, slots) float32 arrays padded with
+NaN, and every function below works on the whole batch with NumPy: no
+per-slot Python loops. Days are local to each city (its UTC offset).
+
+    batch = ForecastBatch.from_payloads(get_weather_data(c, 5) for c in cities)
+    days = daily(batch)        # per-day min/max/mean temp, mean humidity, max rain chance
+    feel = derived(batch)      # feels-like, dew point, heat index per slot
+    wet = rain_windows(batch)  # runs of slots with a high chance of rain, per city
+    trend = trends(batch)      # 24 h rolling mean and °C/day slope
+
+summarise(payload) is the cached single-city entry point: results are kept
+per forecast version (city plus the forecast's contents), so asking again
+before the next OpenWeather update costs one dictionary lookup.
+"""
+import time
+
+import numpy as np
+
+from irfan_23522613.weather_friend import metrics
+from irfan_23522613.weather_friend.cache import TTLCache
+
+DAY = 86400
+SLOT_SECONDS = 3 * 3600
+RAIN_LIKELY = 0.5        # pop at or above this counts as "rain likely"
+ROLLING_SLOTS = 8        # 24 h of 3-hour slots
+CACHE_TTL = 3 * 60 * 60  # forecasts change on the 3-hour update anyway
+
+_summaries = TTLCache(maxsize=1024)
+
+
+class ForecastBatch:
+    """N forecasts as (N, S) arrays; `valid` marks real (non-padding) slots."""
+
+    __slots__ = ("names", "time", "temp", "humidity", "wind_speed", "pop", "tz", "valid")
+
+    def __init__(self, names, time, temp, humidity, wind_speed, pop, tz, valid):
+        self.names = names
+        self.time = time
+        self.temp = temp
+        self.humidity = humidity
+        self.wind_speed = wind_speed
+        self.pop = pop
+        self.tz = tz
+        self.valid = valid
+
+    @classmethod
+    def from_forecasts(cls, items):
+        """From (name, Forecast, utc_offset_seconds) triples."""
+        items = list(items)
+        n = len(items)
+        width = max((len(f) for _, f, _ in items), default=0)
+        time_ = np.zeros((n, width), dtype=np.int64)
+        columns = {name: np.full((n, width), np.nan, dtype=np.float32)
+                   for name in ("temp", "humidity", "wind_speed", "pop")}
+        valid = np.zeros((n, width), dtype=bool)
+        for row, (_, forecast, _) in enumerate(items):
+            k = len(forecast)
+            time_[row, :k] = forecast.time.astype(np.int64)
+            for name, column in columns.items():
+                column[row, :k] = getattr(forecast, name)
+            valid[row, :k] = True
+        tz = np.array([offset or 0 for _, _, offset in items], dtype=np.int64)
+        return cls([name for name, _, _ in items], time_, columns["temp"], columns["humidity"],
+                   columns["wind_speed"], columns["pop"], tz, valid)
+
+    @classmethod
+    def from_payloads(cls, payloads):
+        """From get_weather_data results ({"city", "timezone", "forecast"}); error payloads are skipped."""
+        return cls.from_forecasts(
+            (p["city"], p["forecast"], p.get("timezone", 0)) for p in payloads if "error" not in p
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+
+# --- derived metrics (element-wise; work on scalars too) ---
+
+def dew_point(temp_c, humidity):
+    """Dew point (°C) by the Magnus formula."""
+    temp_c = np.asarray(temp_c, dtype=np.float32)
+    rh = np.clip(np.asarray(humidity, dtype=np.float32), 1, 100)
+    gamma = np.log(rh / 100) + 17.625 * temp_c / (243.04 + temp_c)
+    return 243.04 * gamma / (17.625 - gamma)
+
+
+def heat_index(temp_c, humidity):
+    """NWS heat index (°C); equals the air temperature below about 27 °C."""
+    t = np.asarray(temp_c, dtype=np.float32) * 9 / 5 + 32
+    rh = np.asarray(humidity, dtype=np.float32)
+    simple = 0.5 * (t + 61 + (t - 68) * 1.2 + rh * 0.094)
+    full = (-42.379 + 2.04901523 * t + 10.14333127 * rh - 0.22475541 * t * rh
+            - 6.83783e-3 * t * t - 5.481717e-2 * rh * rh + 1.22874e-3 * t * t * rh
+            + 8.5282e-4 * t * rh * rh - 1.99e-6 * t * t * rh * rh)
+    dry = (rh < 13) & (t >= 80) & (t <= 112)
+    full = np.where(dry, full - (13 - rh) / 4 * np.sqrt(np.maximum(0, 17 - np.abs(t - 95)) / 17), full)
+    damp = (rh > 85) & (t >= 80) & (t <= 87)
+    full = np.where(damp, full + (rh - 85) / 10 * (87 - t) / 5, full)
+    hi = np.where((simple + t) / 2 >= 80, full, simple)
+    return np.where(t >= 80, (hi - 32) * 5 / 9, np.asarray(temp_c, dtype=np.float32))
+
+
+def wind_chill(temp_c, wind_speed):
+    """Wind chill (°C) for `wind_speed` in m/s; the air temperature where it doesn't apply."""
+    temp_c = np.asarray(temp_c, dtype=np.float32)
+    v = np.power(np.asarray(wind_speed, dtype=np.float32) * 3.6, 0.16)
+    chill = 13.12 + 0.6215 * temp_c - 11.37 * v + 0.3965 * temp_c * v
+    applies = (temp_c <= 10) & (np.asarray(wind_speed) * 3.6 > 4.8)
+    return np.where(applies, chill, temp_c)
+
+
+def feels_like(temp_c, humidity, wind_speed):
+    """Heat index when hot, wind chill when cold and windy, otherwise the air temperature."""
+    temp_c = np.asarray(temp_c, dtype=np.float32)
+    return np.where(temp_c >= 26.7, heat_index(temp_c, humidity), wind_chill(temp_c, wind_speed))
+
+
+def derived(batch: ForecastBatch):
+    """Per-slot feels_like, dew_point and heat_index arrays, shaped like batch.temp."""
+    with np.errstate(invalid="ignore"):
+        return {
+            "feels_like": feels_like(batch.temp, batch.humidity, batch.wind_speed),
+            "dew_point": dew_point(batch.temp, batch.humidity),
+            "heat_index": heat_index(batch.temp, batch.humidity),
+        }
+
+
+# --- daily rollups ---
+
+def _local_days(batch):
+    """(day index per slot relative to each city's first local day, first local day as epoch days)."""
+    local = (batch.time + batch.tz[:, None]) // DAY
+    first = local[:, :1] if local.shape[1] else np.zeros((len(batch), 1), dtype=np.int64)
+    return local - first, first[:, 0]
+
+
+def _masked_reduce(values, mask, how):
+    fill = {"min": np.inf, "max": -np.inf}[how]
+    values = np.broadcast_to(values, mask.shape)
+    out = getattr(np, how)(values, axis=-1, initial=fill, where=mask)
+    return np.where(np.isinf(out), np.nan, out).astype(np.float32)
+
+
+def daily(batch: ForecastBatch, days: int = 6):
+    """
+    Per-city, per-local-day rollups as (N, days) arrays: date (datetime64[D]),
+    temp_min/temp_max/temp_mean, humidity_mean, pop_max and slots (how many
+    3-hour slots the day has; NaN statistics where it has none).
+    """
+    day_idx, first = _local_days(batch)
+    # (N, days, S): which slots belong to each day
+    mask = (day_idx[:, None, :] == np.arange(days)[None, :, None]) & batch.valid[:, None, :]
+    temp = batch.temp[:, None, :]
+    counts = mask.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        temp_ok = mask & ~np.isnan(temp)
+        temp_mean = np.where(temp_ok, temp, 0).sum(axis=-1) / temp_ok.sum(axis=-1)
+        hum = batch.humidity[:, None, :]
+        hum_ok = mask & ~np.isnan(hum)
+        humidity_mean = np.where(hum_ok, hum, 0).sum(axis=-1) / hum_ok.sum(axis=-1)
+        pop = batch.pop[:, None, :]
+    return {
+        "date": (first[:, None] + np.arange(days)[None, :]).astype("datetime64[D]"),
+        "slots": counts,
+        "temp_min": _masked_reduce(temp, temp_ok, "min"),
+        "temp_max": _masked_reduce(temp, temp_ok, "max"),
+        "temp_mean": temp_mean.astype(np.float32),
+        "humidity_mean": humidity_mean.astype(np.float32),
+        "pop_max": _masked_reduce(pop, mask & ~np.isnan(pop), "max"),
+    }
+
+
+# --- rain windows ---
+
+def rain_windows(batch: ForecastBatch, threshold: float = RAIN_LIKELY):
+    """
+    Runs of consecutive slots with pop >= threshold, per city: a list of
+    {"start", "end", "pop_max"} with start/end as UTC epoch seconds (end is
+    the end of the last wet slot).
+    """
+    wet = (batch.pop >= threshold) & batch.valid
+    n, width = wet.shape
+    padded = np.zeros((n, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = wet
+    edges = np.diff(padded, axis=1)
+    start_rows, start_cols = np.nonzero(edges == 1)
+    _, end_cols = np.nonzero(edges == -1)       # same row order as the starts
+    # max pop of each run in one reduceat over [start, end) pairs of the flattened rows
+    flat_pop = np.concatenate([np.where(wet, batch.pop, 0), np.zeros((n, 1), np.float32)], axis=1).ravel()
+    bounds = np.empty(2 * len(start_rows), dtype=np.int64)
+    bounds[0::2] = start_rows * (width + 1) + start_cols
+    bounds[1::2] = start_rows * (width + 1) + end_cols
+    run_max = np.maximum.reduceat(flat_pop, bounds)[0::2] if len(bounds) else flat_pop[:0]
+    starts = batch.time[start_rows, start_cols]
+    ends = batch.time[start_rows, end_cols - 1] + SLOT_SECONDS
+    out = [[] for _ in range(n)]
+    for row, start, end, pop in zip(start_rows.tolist(), starts.tolist(), ends.tolist(), run_max.tolist()):
+        out[row].append({"start": start, "end": end, "pop_max": round(pop, 2)})
+    return out
+
+
+# --- trends ---
+
+def trends(batch: ForecastBatch, window: int = ROLLING_SLOTS):
+    """
+    rolling_mean: (N, S) mean temperature over the trailing `window` slots
+    (NaN until a full window); slope: (N,) least-squares °C per day over the forecast.
+    """
+    temp = np.where(batch.valid, batch.temp, np.nan).astype(np.float64)
+    ok = ~np.isnan(temp)
+    filled = np.where(ok, temp, 0)
+    csum = np.cumsum(filled, axis=1)
+    ccount = np.cumsum(ok, axis=1)
+    csum[:, window:] = csum[:, window:] - csum[:, :-window]
+    ccount[:, window:] = ccount[:, window:] - ccount[:, :-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rolling = np.where(ccount == window, csum / np.maximum(ccount, 1), np.nan)
+        x = np.where(ok, (batch.time - batch.time[:, :1]) / DAY, 0)
+        n = ok.sum(axis=1)
+        x_mean = x.sum(axis=1) / n
+        y_mean = filled.sum(axis=1) / n
+        dx = np.where(ok, x - x_mean[:, None], 0)
+        slope = (dx * (filled - y_mean[:, None])).sum(axis=1) / (dx * dx).sum(axis=1)
+    return {"rolling_mean": rolling.astype(np.float32), "slope": slope.astype(np.float32)}
+
+
+# --- per-city summaries ---
+
+def _lists(array, digits):
+    """Rounded nested lists with None for NaN (one conversion for the whole batch)."""
+    return [[None if v != v else v for v in row] for row in np.round(array.astype(np.float64), digits).tolist()]
+
+
+@metrics.timed("analytics.batch")
+def summarise_batch(batch: ForecastBatch):
+    """Plain-dict summary per city: days, rain windows, trend and the first slot's derived values."""
+    days, feel = daily(batch), derived(batch)
+    wet, trend = rain_windows(batch), trends(batch)
+    dates = days["date"].astype(str).tolist()
+    has = (days["slots"] > 0).tolist()
+    columns = {
+        "temp_min": _lists(days["temp_min"], 1),
+        "temp_max": _lists(days["temp_max"], 1),
+        "temp_mean": _lists(days["temp_mean"], 1),
+        "humidity_mean": _lists(days["humidity_mean"], 0),
+        "pop_max": _lists(days["pop_max"], 2),
+    }
+    first = feel["feels_like"][:, :1] if batch.temp.shape[1] else np.full((len(batch), 1), np.nan)
+    feels_now = _lists(first, 1)
+    dew_now = _lists(feel["dew_point"][:, :1] if batch.temp.shape[1] else first, 1)
+    slope = _lists(trend["slope"][:, None], 2)
+    out = []
+    for i, name in enumerate(batch.names):
+        day_rows = [
+            {"date": dates[i][d], **{key: col[i][d] for key, col in columns.items()}}
+            for d in range(len(dates[i])) if has[i][d]
+        ]
+        out.append({
+            "city": name,
+            "days": day_rows,
+            "rain_windows": wet[i],
+            "trend_per_day": slope[i][0],
+            "now": {"feels_like": feels_now[i][0], "dew_point": dew_now[i][0]},
+        })
+    return out
+
+
+def forecast_version(name: str, forecast) -> tuple:
+    """Cache key that changes whenever the forecast's contents do."""
+    if not len(forecast):
+        return (name, 0)
+    return (name, int(forecast.time[0].astype(np.int64)), len(forecast),
+            hash(forecast.temp.tobytes()), hash(forecast.pop.tobytes()))
+
+
+def summarise(payload: dict):
+    """summarise_batch for one get_weather_data payload, cached per forecast version."""
+    key = forecast_version(payload["city"], payload["forecast"])
+    summary = _summaries.get(key)
+    if summary is None:
+        batch = ForecastBatch.from_forecasts([(payload["city"], payload["forecast"], payload.get("timezone", 0))])
+        summary = summarise_batch(batch)[0]
+        _summaries.set(key, summary, time.time() + CACHE_TTL)
+    return summary
+
+
+def summarise_many(payloads):
+    """Summaries for many payloads: cached ones are reused, the rest are computed as one batch."""
+    payloads = [p for p in payloads if "error" not in p]
+    keys = [forecast_version(p["city"], p["forecast"]) for p in payloads]
+    results = [_summaries.get(k) for k in keys]
+    todo = [i for i, r in enumerate(results) if r is None]
+    if todo:
+        fresh = summarise_batch(ForecastBatch.from_payloads(payloads[i] for i in todo))
+        expires_at = time.time() + CACHE_TTL
+        for i, summary in zip(todo, fresh):
+            results[i] = summary
+            _summaries.set(keys[i], summary, expires_at)
+    return results
@@ -0,0 +1,255 @@
+"""
+Local answers to forecast questions ("will it rain tomorrow in Perth?",
+"warmest day this week?", "when does the wind drop?").
+
+classify() picks an intent with a few keyword rules; answer() works out the
+days / part of day the question is about and reads the answer straight off
+the Forecast columns, so no LLM call is needed.
+"""
+import re
+import time
+
+import numpy as np
+
+INTENTS = (
+    ("wind_drop", re.compile(r"\bwind\w*\b.*\b(drop|die|calm|ease|easing|settle|stop|down)\b|\bwhen\b.*\bcalm")),
+    ("rain", re.compile(r"\b(rain\w*|umbrella|wet|showers?|drizzle|storm\w*|thunder\w*|precipitation|snow\w*)\b")),
+    ("warmest", re.compile(r"\b(warmest|hottest|highest|maximum)\b")),
+    ("coldest", re.compile(r"\b(coldest|coolest|chilliest|lowest|minimum)\b")),
+    ("wind", re.compile(r"\b(wind\w*|breez\w*|gust\w*)\b")),
+    ("humidity", re.compile(r"\b(humid\w*|muggy|sticky)\b")),
+    ("temperature", re.compile(r"\b(temp\w*|hot|cold|warm|chilly|degrees|freezing)\b")),
+)
+
+# Without a city, a message only counts as a question about the last city when it
+# says something unmistakably about the weather or reads as a follow-up; "hot",
+# "cold" and "wet" alone are as likely to be small talk ("I'm cold", "hot dog!")
+_WEATHER_CUE = re.compile(
+    r"\b(forecast\w*|weather|temp\w*|degrees|rain\w*|umbrella|showers?|drizzle|storm\w*|thunder\w*|"
+    r"snow\w*|precipitation|wind\w*|breez\w*|gust\w*|humid\w*|warmest|hottest|coldest|coolest|chilliest|"
+    r"today|tonight|tomorrow|weekend|week|monday|tuesday|wednesday|thursday|friday|saturday|sunday|"
+    r"morning|afternoon|evening)\b"
+)
+_FOLLOW_UP = re.compile(r"^\W*(and|what about|how about|and what about|same for|what's it like|then)\b")
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+PARTS_OF_DAY = {
+    "morning": (6, 12),
+    "afternoon": (12, 18),
+    "evening": (18, 24),
+    "tonight": (18, 24),
+    "night": (18, 24),
+}
+RAIN_WORDS = ("rain", "drizzle", "shower", "thunder", "snow")
+CALM_WIND = 4.0   # m/s: below this counts as "the wind has dropped"
+
+# Questions that range over the whole forecast unless a day is named
+WHOLE_FORECAST_INTENTS = {"warmest", "coldest", "wind_drop"}
+
+_NUMBER_OF_DAYS = re.compile(r"\b(\d|two|three|four|five)\s+days\b")
+_NUMBER_WORDS = {"two": 2, "three": 3, "four": 4, "five": 5}
+
+
+def classify(message: str):
+    """The forecast intent of `message` ("rain", "warmest", ...), or None."""
+    text = message.lower()
+    for intent, pattern in INTENTS:
+        if pattern.search(text):
+            return intent
+    return None
+
+
+def is_follow_up(message: str) -> bool:
+    """True when a city-less message is plainly about the weather, so the last city asked about applies."""
+    text = message.lower()
+    return bool(_WEATHER_CUE.search(text) or _FOLLOW_UP.search(text))
+
+
+def _hour_label(hour: int) -> str:
+    if hour == 0:
+        return "midnight"
+    if hour == 12:
+        return "noon"
+    return f"{hour % 12 or 12} {'am' if hour < 12 else 'pm'}"
+
+
+def _day_label(offset: int, weekday: int, on: str = "on ") -> str:
+    if offset == 0:
+        return "today"
+    if offset == 1:
+        return "tomorrow"
+    return f"{on}{WEEKDAYS[weekday].title()}"
+
+
+class _Slots:
+    """The forecast's local-time calendar: day offset from today, weekday and hour per slot."""
+
+    def __init__(self, forecast, tz_offset: int, now: float):
+        shift = np.timedelta64(int(tz_offset), "s")
+        local = forecast.time + shift
+        dates = local.astype("datetime64[D]")
+        self.today = (np.datetime64(int(now), "s") + shift).astype("datetime64[D]")
+        self.offset = (dates - self.today).astype(int)
+        self.hour = ((local - dates).astype(int) // 3600).astype(int)
+        # 1970-01-01 was a Thursday
+        self.weekday = (dates.astype(int) + 3) % 7
+        self.single_day = False   # set once the question's window is known
+
+    def when(self, i: int) -> str:
+        """'tomorrow around 3 pm', or just 'around 3 pm' when the question named one day."""
+        hour = f"around {_hour_label(self.hour[i])}"
+        if self.single_day:
+            return hour
+        return f"{_day_label(self.offset[i], self.weekday[i])} {hour}"
+
+    def day(self, i: int) -> str:
+        return _day_label(self.offset[i], self.weekday[i])
+
+
+def _window(text: str, intent: str, slots: _Slots):
+    """(mask over slots, label, single_day) for the period the question asks about."""
+    today_weekday = int((slots.today.astype(int) + 3) % 7)
+    offsets, label = None, None
+    if "tomorrow" in text:
+        offsets, label = [1], "tomorrow"
+    elif "weekend" in text:
+        offsets = [(5 - today_weekday) % 7, (6 - today_weekday) % 7]
+        label = "this weekend"
+    else:
+        for weekday, name in enumerate(WEEKDAYS):
+            if re.search(rf"\b{name}\b", text):
+                offsets, label = [(weekday - today_weekday) % 7], f"on {name.title()}"
+                break
+    if offsets is None:
+        number = _NUMBER_OF_DAYS.search(text)
+        if number:
+            n = _NUMBER_WORDS.get(number.group(1)) or int(number.group(1))
+            offsets, label = list(range(n)), f"over the next {n} days"
+        elif re.search(r"\b(week|days)\b", text):
+            offsets, label = list(range(7)), "this week"
+        elif re.search(r"\b(today|tonight)\b", text):
+            offsets, label = [0], "today"
+
+    if offsets is None:
+        if intent in WHOLE_FORECAST_INTENTS:
+            mask, label = np.ones(len(slots.offset), dtype=bool), "over the next few days"
+        else:
+            mask = np.zeros(len(slots.offset), dtype=bool)
+            mask[:8] = True   # next 24 hours
+            label = "in the next 24 hours"
+    else:
+        mask = np.isin(slots.offset, offsets)
+
+    for part, (start, end) in PARTS_OF_DAY.items():
+        if re.search(rf"\b{part}\b", text):
+            mask &= (slots.hour >= start) & (slots.hour < end)
+            if part == "tonight":
+                label = "tonight"
+            elif len(offsets or ()) == 1:
+                label = f"{label} {part}"        # "tomorrow morning", "Friday evening"
+            else:
+                label = f"{part}s {label}"       # "mornings this week"
+            break
+    return mask, label, offsets is not None and len(offsets) == 1
+
+
+def _rain(city, forecast, idx, slots, label):
+    pop = forecast.pop[idx]
+    if np.isnan(pop).all():
+        # no probabilities (e.g. an old stored forecast): go by the descriptions
+        wet = [i for i in idx if any(w in forecast.description[i] for w in RAIN_WORDS)]
+        if wet:
+            return f"🌧 Rain is forecast in {city} {label} — {forecast.description[wet[0]]} {slots.when(wet[0])}."
+        return f"☀️ No rain forecast in {city} {label}."
+    best = idx[int(np.nanargmax(pop))]
+    chance = round(float(forecast.pop[best]) * 100)
+    if chance >= 50:
+        return f"🌧 Yes — {chance}% chance of rain in {city} {label}, most likely {slots.when(best)}. Pack an umbrella!"
+    if chance >= 20:
+        return f"🌦 Maybe — up to a {chance}% chance of rain in {city} {label}, highest {slots.when(best)}."
+    return f"☀️ Looks dry in {city} {label} — rain chance stays at or below {chance}%."
+
+
+def _extreme(city, forecast, idx, slots, label, warmest: bool):
+    temps = forecast.temp[idx]
+    pick = np.nanargmax if warmest else np.nanargmin
+    best = idx[int(pick(temps))]
+    temp = round(float(forecast.temp[best]), 1)
+    word, emoji, reach = ("Warmest", "🔥", "reaching") if warmest else ("Coldest", "🥶", "down to")
+    if slots.single_day:
+        return f"{emoji} {word} {label} in {city}: {temp}°C {slots.when(best)}."
+    return (f"{emoji} {word} {label} in {city}: {slots.day(best)}, {reach} {temp}°C "
+            f"around {_hour_label(slots.hour[best])}.")
+
+
+def _wind_drop(city, forecast, idx, slots, label):
+    wind = forecast.wind_speed[idx]
+    now = float(wind[0])
+    if now < CALM_WIND:
+        return f"🍃 It's already fairly calm in {city} — {now:.1f} m/s right now."
+    target = max(CALM_WIND, now * 0.6)
+    calm = np.flatnonzero(wind <= target)
+    if len(calm):
+        i = idx[calm[0]]
+        return (f"💨 The wind in {city} should ease to {forecast.wind_speed[i]:.1f} m/s {slots.when(i)} "
+                f"(from {now:.1f} m/s now).")
+    low = idx[int(np.nanargmin(wind))]
+    return (f"💨 It stays breezy in {city} {label} — the lightest is "
+            f"{forecast.wind_speed[low]:.1f} m/s {slots.when(low)}.")
+
+
+def _wind(city, forecast, idx, slots, label):
+    best = idx[int(np.nanargmax(forecast.wind_speed[idx]))]
+    avg = float(np.nanmean(forecast.wind_speed[idx]))
+    return (f"💨 Wind in {city} {label}: around {avg:.1f} m/s, strongest "
+            f"{forecast.wind_speed[best]:.1f} m/s {slots.when(best)}.")
+
+
+def _humidity(city, forecast, idx, slots, label):
+    humidity = forecast.humidity[idx]
+    best = idx[int(np.nanargmax(humidity))]
+    return (f"💧 Humidity in {city} {label}: {np.nanmin(humidity):.0f}–{np.nanmax(humidity):.0f}%, "
+            f"muggiest {slots.when(best)}.")
+
+
+def _temperature(city, forecast, idx, slots, label):
+    temps = forecast.temp[idx]
+    best = idx[int(np.nanargmax(temps))]
+    low, high = round(float(np.nanmin(temps))), round(float(np.nanmax(temps)))
+    span = f"{low}°C" if low == high else f"{low}–{high}°C"
+    return (f"🌡 {city} {label}: {span}, warmest {slots.when(best)}. "
+            f"Looks {'great' if high > 20 else 'chilly'} out there!")
+
+
+ANSWERS = {
+    "rain": _rain,
+    "warmest": lambda *args: _extreme(*args, warmest=True),
+    "coldest": lambda *args: _extreme(*args, warmest=False),
+    "wind_drop": _wind_drop,
+    "wind": _wind,
+    "humidity": _humidity,
+    "temperature": _temperature,
+}
+
+
+def answer(message: str, data: dict, intent: str = None, now: float = None):
+    """
+    Reply to a forecast question from `data` (get_weather_data output, ideally
+    with all 5 days), or None when the intent isn't one answered locally.
+    """
+    intent = intent or classify(message)
+    if intent not in ANSWERS:
+        return None
+    forecast = data.get("forecast")
+    city = str(data.get("city", "that place")).title()
+    if not forecast:
+        return None
+
+    slots = _Slots(forecast, data.get("timezone", 0), time.time() if now is None else now)
+    mask, label, slots.single_day = _window(message.lower(), intent, slots)
+    idx = np.flatnonzero(mask)
+    if len(idx) == 0:
+        last = len(forecast) - 1
+        until = f"{_day_label(slots.offset[last], slots.weekday[last], on='')} {_hour_label(slots.hour[last])}"
+        return f"🤔 My forecast for {city} doesn't cover {label.removeprefix('on ')} yet — it only runs until {until}."
+    return ANSWERS[intent](city, forecast, idx, slots, label)
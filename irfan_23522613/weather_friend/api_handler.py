@@ -1,18 +1,36 @@
 import requests
 from rich.console import Console
+from irfan_23522613.weather_friend.scheduler import INTERACTIVE, WeatherAPIError, get_scheduler
+from irfan_23522613.weather_friend.transport import get_transport
 
 console = Console()
 
-def fetch_json(url, params=None, headers=None, timeout=10):
-    """Generic GET request wrapper with error handling."""
+def fetch_json(url, params=None, headers=None, timeout=10, priority=INTERACTIVE, raise_errors=False):
+    """
+    GET `url` through the OpenWeather quota scheduler and return the decoded JSON.
+    Failures are printed and give None, or raise the scheduler's WeatherAPIError
+    subclass (CityNotFound, RateLimited, ServerError, ...) when `raise_errors` is set.
+    """
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=timeout)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.Timeout:
-        console.print("[yellow]⏳ Request timed out. Try again.[/yellow]")
-    except requests.exceptions.HTTPError as e:
-        console.print(f"[red]HTTP Error: {e}[/red]")
-    except Exception as e:
+        response = get_scheduler().call(
+            lambda: get_transport().get(url, params=params, headers=headers, timeout=timeout), priority
+        )
+    except WeatherAPIError as e:
+        if raise_errors:
+            raise
+        console.print(f"[red]{type(e).__name__}: {e}[/red]")
+        return None
+    except requests.exceptions.RequestException as e:
+        # not a network failure the scheduler retries: a bad URL, a broken body, ...
+        if raise_errors:
+            raise WeatherAPIError(f"request failed: {e}") from e
         console.print(f"[red]Error fetching data: {e}[/red]")
+        return None
+
+    try:
+        return response.json()
+    except ValueError as e:
+        if raise_errors:
+            raise
+        console.print(f"[red]Error decoding response: {e}[/red]")
     return None
@@ -0,0 +1,327 @@
+"""
+Append-only archive of every forecast fetched, for trends and forecast drift.
+
+Layout: one directory per city and one per calendar month (UTC) of issue
+time, holding one raw little-endian file per column:
+
+    <root>/<city>/<YYYY-MM>/issued.u4 valid.u4 temp.f4 humidity.f2 wind_speed.f4 pop.f2
+
+A row is one 3-hour slot of one forecast issue (20 bytes). Appending writes
+a few hundred bytes to the end of each file; queries np.memmap the columns
+of only the months that can overlap the requested range and copy out just
+the matching rows. Rows are appended in issue order, so issue-time ranges
+are a binary search on issued.u4.
+
+compact() applies retention: issues older than `keep_full_days` are thinned
+to the first issue of each UTC day, and months older than `keep_days` are
+deleted. history() gives a Forecast (latest issue for each slot) that the
+visualisation functions plot directly.
+
+    python -m irfan_23522613.weather_friend.archive stats
+    python -m irfan_23522613.weather_friend.archive chart Perth --days 21 --out perth.png
+    python -m irfan_23522613.weather_friend.archive compact
+"""
+import argparse
+import os
+import re
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from irfan_23522613.weather_friend.forecast import Forecast
+
+COLUMNS = {
+    "issued": np.dtype("<u4"),      # epoch seconds of the forecast issue (3-hour update it belongs to)
+    "valid": np.dtype("<u4"),       # epoch seconds of the slot
+    "temp": np.dtype("<f4"),
+    "humidity": np.dtype("<f2"),
+    "wind_speed": np.dtype("<f4"),
+    "pop": np.dtype("<f2"),
+}
+DAY = 86400
+MAX_LEAD = 6 * DAY               # a forecast never reaches further ahead than this
+KEEP_FULL_DAYS = 30
+KEEP_DAYS = 365
+
+
+def _slug(city_key: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", city_key.lower()).strip("-") or "unknown"
+
+
+def _month(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m")
+
+
+def _months_between(start: float, end: float):
+    """'YYYY-MM' names of every month overlapping [start, end]."""
+    first = datetime.fromtimestamp(max(start, 0), timezone.utc)
+    last = datetime.fromtimestamp(max(end, 0), timezone.utc)
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        yield f"{year:04d}-{month:02d}"
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _month_end(name: str) -> float:
+    year, month = map(int, name.split("-"))
+    year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return datetime(year, month, 1, tzinfo=timezone.utc).timestamp()
+
+
+class _Month:
+    """The column files of one city/month; read through np.memmap."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def _file(self, column):
+        return os.path.join(self.path, f"{column}.{COLUMNS[column].str[1:]}")
+
+    def __len__(self):
+        # columns can differ after a crash mid-append; the shortest one wins
+        sizes = []
+        for column, dtype in COLUMNS.items():
+            try:
+                sizes.append(os.path.getsize(self._file(column)) // dtype.itemsize)
+            except OSError:
+                return 0
+        return min(sizes)
+
+    def column(self, name, n=None):
+        n = len(self) if n is None else n
+        if n == 0:
+            return np.empty(0, COLUMNS[name])
+        return np.memmap(self._file(name), dtype=COLUMNS[name], mode="r", shape=(n,))
+
+    def last_issued(self):
+        n = len(self)
+        return int(self.column("issued", n)[-1]) if n else None
+
+    def append(self, rows: dict):
+        os.makedirs(self.path, exist_ok=True)
+        n = len(self)
+        for column, dtype in COLUMNS.items():
+            with open(self._file(column), "r+b" if os.path.exists(self._file(column)) else "wb") as f:
+                f.seek(n * dtype.itemsize)   # drop any partial tail left by a crash
+                f.truncate()
+                f.write(np.ascontiguousarray(rows[column], dtype=dtype).tobytes())
+
+    def rewrite(self, keep):
+        """Keep only the rows where `keep` is true (written to a sibling dir, then swapped in)."""
+        n = len(keep)
+        tmp, old = self.path + ".tmp", self.path + ".old"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for column in COLUMNS:
+            np.asarray(self.column(column, n)[keep]).tofile(os.path.join(tmp, os.path.basename(self._file(column))))
+        os.replace(self.path, old)
+        os.replace(tmp, self.path)
+        shutil.rmtree(old, ignore_errors=True)
+
+
+class ForecastArchive:
+    """Columnar per-city/per-month archive of forecast issues."""
+
+    def __init__(self, root: str, keep_full_days: int = KEEP_FULL_DAYS, keep_days: int = KEEP_DAYS):
+        self.root = root
+        self.keep_full_days = keep_full_days
+        self.keep_days = keep_days
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _month(self, city_key, month):
+        return _Month(os.path.join(self.root, _slug(city_key), month))
+
+    def cities(self):
+        return sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+
+    def months(self, city_key):
+        folder = os.path.join(self.root, _slug(city_key))
+        if not os.path.isdir(folder):
+            return []
+        return sorted(m for m in os.listdir(folder) if re.fullmatch(r"\d{4}-\d{2}", m))
+
+    # --- writing ---
+
+    def append(self, city_key: str, forecast: Forecast, issued: float) -> int:
+        """
+        Archive one forecast issue; returns the rows written (0 when this issue,
+        or a later one, is already archived, e.g. a refetch within the same update).
+        """
+        if not len(forecast):
+            return 0
+        issued = int(issued)
+        month = self._month(city_key, _month(issued))
+        with self._lock:
+            last = month.last_issued()
+            if last is None:
+                last = self._last_issued_before(city_key, issued)
+            if last is not None and issued <= last:
+                return 0
+            n = len(forecast)
+            month.append({
+                "issued": np.full(n, issued),
+                "valid": forecast.time.astype(np.int64),
+                "temp": forecast.temp,
+                "humidity": forecast.humidity,
+                "wind_speed": forecast.wind_speed,
+                "pop": forecast.pop,
+            })
+        return n
+
+    def _last_issued_before(self, city_key, issued):
+        """The newest archived issue in earlier months (the first append of a month)."""
+        for name in reversed(self.months(city_key)):
+            if name < _month(issued):
+                return self._month(city_key, name).last_issued()
+        return None
+
+    # --- reading ---
+
+    def query(self, city_key: str, start: float = None, end: float = None, by: str = "valid"):
+        """
+        Rows with `by` ("valid" or "issued") in [start, end), as a dict of
+        column -> array (copies, ordered by issue then slot). Only the months
+        that can hold such rows are opened.
+        """
+        if by not in ("valid", "issued"):
+            raise ValueError("by must be 'valid' or 'issued'")
+        start = 0 if start is None else start
+        end = time.time() + MAX_LEAD if end is None else end
+        first = start - MAX_LEAD if by == "valid" else start   # issues before `start` still cover it
+        wanted = set(_months_between(first, end))
+        parts = {column: [] for column in COLUMNS}
+        for name in self.months(city_key):
+            if name not in wanted:
+                continue
+            month = self._month(city_key, name)
+            n = len(month)
+            if not n:
+                continue
+            if by == "issued":
+                issued = month.column("issued", n)
+                lo, hi = np.searchsorted(issued, [start, end])
+                rows = slice(int(lo), int(hi))
+            else:
+                valid = month.column("valid", n)
+                rows = np.nonzero((valid >= start) & (valid < end))[0]
+            for column in COLUMNS:
+                parts[column].append(np.array(month.column(column, n)[rows]))
+        return {column: np.concatenate(chunks) if chunks else np.empty(0, COLUMNS[column])
+                for column, chunks in parts.items()}
+
+    def history(self, city_key: str, start: float, end: float) -> Forecast:
+        """
+        The best-known weather for every slot in [start, end): the latest issue
+        covering each slot, as a Forecast ready for the chart functions.
+        """
+        rows = self.query(city_key, start, end, by="valid")
+        if not len(rows["valid"]):
+            return Forecast.from_records([])
+        order = np.lexsort((rows["issued"], rows["valid"]))
+        valid = rows["valid"][order]
+        last_of_slot = np.append(valid[1:] != valid[:-1], True)
+        pick = order[last_of_slot]
+        columns = [
+            rows["valid"][pick].astype(np.int64).astype("datetime64[s]"),
+            rows["temp"][pick].astype(np.float32),
+            rows["humidity"][pick].astype(np.float32),
+            rows["wind_speed"][pick].astype(np.float32),
+            np.full(len(pick), "", dtype=object),
+            rows["pop"][pick].astype(np.float32),
+        ]
+        for column in columns:
+            column.flags.writeable = False
+        return Forecast(*columns)
+
+    def drift(self, city_key: str, valid_time: float):
+        """How the forecast for one slot changed: (issued, lead hours, temp, pop) arrays, oldest issue first."""
+        rows = self.query(city_key, valid_time, valid_time + 1, by="valid")
+        lead = (rows["valid"].astype(np.int64) - rows["issued"].astype(np.int64)) / 3600
+        return {"issued": rows["issued"], "lead_hours": lead, "temp": rows["temp"], "pop": rows["pop"]}
+
+    # --- retention ---
+
+    def compact(self, now: float = None):
+        """Thin issues older than keep_full_days to one per UTC day and delete months older than keep_days."""
+        now = time.time() if now is None else now
+        thin_before = now - self.keep_full_days * DAY
+        drop_before = now - self.keep_days * DAY
+        out = {"months_deleted": 0, "rows_dropped": 0}
+        with self._lock:
+            for city in self.cities():
+                for name in self.months(city):
+                    month = self._month(city, name)
+                    if _month_end(name) <= drop_before:
+                        shutil.rmtree(month.path, ignore_errors=True)
+                        out["months_deleted"] += 1
+                        continue
+                    n = len(month)
+                    issued = np.asarray(month.column("issued", n)).astype(np.int64)
+                    if not n or issued[0] >= thin_before:
+                        continue
+                    issues = np.unique(issued)
+                    days = issues // DAY
+                    daily_issue = issues[np.append(True, days[1:] != days[:-1])]
+                    keep = (issued >= thin_before) | np.isin(issued, daily_issue)
+                    if not keep.all():
+                        out["rows_dropped"] += int((~keep).sum())
+                        month.rewrite(keep)
+        return out
+
+    def stats(self):
+        cities = self.cities()
+        rows = months = size = 0
+        for city in cities:
+            for name in self.months(city):
+                month = self._month(city, name)
+                months += 1
+                rows += len(month)
+                size += sum(os.path.getsize(os.path.join(month.path, f)) for f in os.listdir(month.path))
+        return {"cities": len(cities), "months": months, "rows": rows, "bytes": size}
+
+
+def default_path():
+    return os.getenv("WEATHER_FRIEND_ARCHIVE") or os.path.join(os.path.expanduser("~"), ".weather_friend", "archive")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m irfan_23522613.weather_friend.archive",
+        description="Inspect, chart and compact the forecast archive.",
+    )
+    parser.add_argument("--path", default=default_path())
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats")
+    sub.add_parser("compact")
+    chart = sub.add_parser("chart", help="temperature chart of the archived weather for a city")
+    chart.add_argument("city")
+    chart.add_argument("--days", type=int, default=21)
+    chart.add_argument("--out", default="history.png")
+    args = parser.parse_args(argv)
+
+    archive = ForecastArchive(args.path)
+    if args.command == "stats":
+        print(archive.stats())
+    elif args.command == "compact":
+        print(archive.compact())
+    else:
+        from irfan_23522613.weather_friend.visualisation import create_history_visualisation
+        from irfan_23522613.weather_friend.weather_data import normalise_city
+
+        end = time.time()
+        history = archive.history(normalise_city(args.city), end - args.days * DAY, end)
+        if not len(history):
+            print(f"❌ nothing archived for {args.city} in the last {args.days} days")
+            return 1
+        fig = create_history_visualisation(history, args.city.title())
+        fig.savefig(args.out, facecolor=fig.get_facecolor())
+        print(f"✅ {len(history)} slots -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+
+class BackgroundLoop:
+    """
+    One asyncio event loop on one daemon thread that the Tk pages hand work to.
+
+    submit(coro, key=...) cancels whatever task was last submitted under the
+    same key, so a newer Fetch/Generate click supersedes the older one instead
+    of piling up another blocking thread.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._tasks = {}  # key -> task; only touched on the loop thread
+        self._thread = threading.Thread(target=self._run_forever, name="weather-loop", daemon=True)
+        self._thread.start()
+
+    def _run_forever(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro, key=None):
+        """Schedule `coro` on the loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(self._run(coro, key), self.loop)
+
+    async def _run(self, coro, key):
+        if key is None:
+            return await coro
+
+        previous = self._tasks.get(key)
+        if previous is not None:
+            previous.cancel()
+        task = asyncio.current_task()
+        self._tasks[key] = task
+        try:
+            return await coro
+        finally:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+
+    def cancel(self, key):
+        """Cancel the task running under `key`, if any."""
+        def _cancel():
+            task = self._tasks.get(key)
+            if task is not None:
+                task.cancel()
+        self.loop.call_soon_threadsafe(_cancel)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+_background = None
+_background_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundLoop:
+    """The shared background loop, started on first use."""
+    global _background
+    if _background is None:
+        with _background_lock:
+            if _background is None:
+                _background = BackgroundLoop()
+    return _background
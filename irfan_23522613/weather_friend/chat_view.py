@@ -0,0 +1,306 @@
+"""
+Virtualised chat transcript: only the bubbles on screen are real widgets.
+
+ChatTranscript keeps every message in a TranscriptModel (sender codes, texts
+and row heights, with a Fenwick tree of heights for O(log n) "where is row
+i" / "which row is at y"). It draws onto a plain Tk canvas whose scroll
+region is the whole transcript, and binds a small pool of bubble widgets to
+whichever rows are visible, re-using them as the view scrolls. Appending,
+updating a streaming reply and scrolling cost the same with 10 messages or
+10,000.
+
+Row heights start as an estimate from the font's word wrap and are replaced
+by the real widget height once a bubble has been laid out.
+"""
+import tkinter as tk
+import tkinter.font as tkfont
+from array import array
+
+import customtkinter as ctk
+
+USER, BOT = 0, 1
+SENDER_NAMES = {USER: "You"}   # any other name is the bot
+
+BG = "#1a1e27"
+STYLES = {
+    # bubble colour, anchor, margin to the near edge, margin to the far edge
+    USER: ("#007AFF", "ne", 20, 80),
+    BOT: ("#2B2E35", "nw", 20, 80),
+}
+ROW_PAD = 6           # vertical gap above and below each bubble
+LABEL_PAD = (12, 6)   # text padding inside a bubble (x, y)
+DELIVERED_H = 18      # the "Delivered" line under the user's messages
+OVERSCAN = 2          # rows kept live above and below the viewport
+
+
+class TranscriptModel:
+    """Append-only message list with row heights and O(log n) offset lookups."""
+
+    def __init__(self):
+        self.senders = bytearray()
+        self.texts = []
+        self.heights = array("l")
+        self._tree = array("q", [0])   # Fenwick tree of heights, 1-based
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _prefix(self, i):
+        """Sum of the first `i` heights."""
+        total, tree = 0, self._tree
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def append(self, sender: int, text: str, height: int) -> int:
+        self.senders.append(sender)
+        self.texts.append(text)
+        self.heights.append(height)
+        i = len(self.texts)   # 1-based slot of the new row
+        low = i - (i & -i)
+        self._tree.append(height + self._prefix(i - 1) - self._prefix(low))
+        return i - 1
+
+    def set_height(self, index: int, height: int) -> int:
+        """Change a row's height; returns the difference."""
+        delta = height - self.heights[index]
+        if delta:
+            self.heights[index] = height
+            i = index + 1
+            while i < len(self._tree):
+                self._tree[i] += delta
+                i += i & -i
+        return delta
+
+    def top(self, index: int) -> int:
+        """y of the top of row `index`."""
+        return self._prefix(index)
+
+    @property
+    def total(self) -> int:
+        return self._prefix(len(self.texts))
+
+    def index_at(self, y: float) -> int:
+        """Row containing y (clamped to the last row)."""
+        n = len(self.texts)
+        pos, step = 0, 1 << max(n.bit_length() - 1, 0)
+        while step:
+            nxt = pos + step
+            if nxt <= n and self._tree[nxt] <= y:
+                pos = nxt
+                y -= self._tree[nxt]
+            step >>= 1
+        return min(pos, max(n - 1, 0))
+
+
+class MessageRef:
+    """Handle for one message; configure(text=...) updates it (what add_message used to return a label for)."""
+
+    def __init__(self, view, index):
+        self.view = view
+        self.index = index
+
+    def configure(self, text=None, **_):
+        if text is not None:
+            self.view.set_text(self.index, text)
+
+    def cget(self, option):
+        if option == "text":
+            return self.view.model.texts[self.index]
+        raise ValueError(option)
+
+
+class _Bubble:
+    """One pooled row: a coloured bubble with its label, plus the optional "Delivered" line."""
+
+    def __init__(self, view):
+        self.row = ctk.CTkFrame(view.canvas, fg_color="transparent")
+        self.bubble = ctk.CTkFrame(self.row, corner_radius=22)
+        self.label = ctk.CTkLabel(self.bubble, text="", wraplength=view.wraplength, justify="left",
+                                  font=view.font_spec, text_color="white")
+        self.label.pack(padx=LABEL_PAD[0], pady=LABEL_PAD[1])
+        self.bubble.pack()
+        self.status = ctk.CTkLabel(self.row, text="Delivered", text_color="#8E8E93", font=("Segoe UI", 10))
+        self.item = view.canvas.create_window(0, 0, window=self.row, anchor="nw", state="hidden")
+        self.index = None
+        self.sender = None
+        for widget in (self.row, self.bubble, self.label, self.status):
+            view.bind_wheel(widget)
+
+    def show(self, sender, text):
+        if sender != self.sender:
+            colour, anchor, _, _ = STYLES[sender]
+            self.bubble.configure(fg_color=colour)
+            self.bubble.pack_configure(anchor="e" if sender == USER else "w")
+            if sender == USER:
+                self.status.pack(anchor="e", padx=(0, 8))
+            else:
+                self.status.pack_forget()
+            self.sender = sender
+        if self.label.cget("text") != text:
+            self.label.configure(text=text)
+
+
+class ChatTranscript(ctk.CTkFrame):
+    """Scrollable chat history that keeps only visible bubbles as widgets."""
+
+    def __init__(self, master, wraplength=480, font=("Segoe UI", 14), **kwargs):
+        super().__init__(master, fg_color=BG, corner_radius=10, **kwargs)
+        self.wraplength = wraplength
+        self.font_spec = font
+        self._font = tkfont.Font(family=font[0], size=font[1])
+        self.model = TranscriptModel()
+        self.canvas = tk.Canvas(self, bg=BG, highlightthickness=0, borderwidth=0, yscrollincrement=1)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.canvas.yview, width=12)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True, padx=(10, 0), pady=10)
+        self._live = {}   # row index -> _Bubble
+        self._pool = []   # unbound _Bubbles
+        self._render_pending = False
+        self._measure_pending = False
+        self.canvas.bind("<Configure>", self._on_resize)
+        self.bind_wheel(self.canvas)
+
+    # --- public API ---
+
+    def add_message(self, sender: str, text: str) -> MessageRef:
+        """Append a message and keep the view pinned to the bottom if it was there."""
+        at_bottom = self._at_bottom()
+        code = USER if sender == SENDER_NAMES[USER] else BOT
+        index = self.model.append(code, text, self._estimate(code, text))
+        self._update_scrollregion()
+        if at_bottom:
+            self.scroll_to_bottom()
+        self._schedule_render()
+        return MessageRef(self, index)
+
+    def set_text(self, index: int, text: str):
+        """Replace a message's text (a streaming reply growing)."""
+        self.model.texts[index] = text
+        bubble = self._live.get(index)
+        if bubble is None:
+            self._resize_row(index, self._estimate(self.model.senders[index], text))
+        else:
+            # on screen: the real height is measured once Tk has laid it out
+            bubble.show(self.model.senders[index], text)
+            self._schedule_measure()
+
+    def scroll_to_bottom(self):
+        self.canvas.yview_moveto(1.0)
+        self._schedule_render()
+
+    def bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel, add="+")
+        widget.bind("<Button-4>", lambda e: self._scroll_units(-1), add="+")
+        widget.bind("<Button-5>", lambda e: self._scroll_units(1), add="+")
+
+    def __len__(self):
+        return len(self.model)
+
+    # --- layout ---
+
+    def _estimate(self, sender, text):
+        """Row height from a greedy word wrap with the bubble's font."""
+        measure, space, width = self._font.measure, self._font.measure(" "), self.wraplength
+        lines = 0
+        for paragraph in text.split("\n"):
+            lines += 1
+            used = 0
+            for word in paragraph.split(" "):
+                w = measure(word)
+                if used and used + space + w > width:
+                    lines += 1
+                    used = w
+                else:
+                    used += (space if used else 0) + w
+        height = lines * self._font.metrics("linespace") + 2 * LABEL_PAD[1] + 2 * ROW_PAD
+        return height + (DELIVERED_H if sender == USER else 0)
+
+    def _resize_row(self, index, height):
+        if self.model.set_height(index, height):
+            at_bottom = self._at_bottom()
+            self._update_scrollregion()
+            self._place_live()
+            if at_bottom:
+                self.canvas.yview_moveto(1.0)
+            self._schedule_render()
+
+    def _update_scrollregion(self):
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), max(self.model.total, 1)))
+
+    def _at_bottom(self):
+        return self.canvas.yview()[1] >= 0.999
+
+    def _place(self, index, bubble):
+        _, anchor, near, _ = STYLES[self.model.senders[index]]
+        width = self.canvas.winfo_width()
+        x = width - near if anchor == "ne" else near
+        self.canvas.coords(bubble.item, x, self.model.top(index) + ROW_PAD)
+        self.canvas.itemconfigure(bubble.item, anchor=anchor, state="normal")
+
+    def _place_live(self):
+        for index, bubble in self._live.items():
+            self._place(index, bubble)
+
+    # --- virtualisation ---
+
+    def _on_resize(self, _event):
+        self._update_scrollregion()
+        self._schedule_render()
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._schedule_render()
+
+    def _on_wheel(self, event):
+        self._scroll_units(-1 if event.delta > 0 else 1)
+
+    def _scroll_units(self, direction):
+        self.canvas.yview_scroll(direction * 60, "units")
+
+    def _schedule_render(self):
+        if not self._render_pending:
+            self._render_pending = True
+            self.after_idle(self._render)
+
+    def _visible_range(self):
+        if not len(self.model):
+            return range(0)
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first = max(0, self.model.index_at(top) - OVERSCAN)
+        last = min(len(self.model) - 1, self.model.index_at(bottom) + OVERSCAN)
+        return range(first, last + 1)
+
+    def _render(self):
+        """Bind pooled bubbles to the rows in view and park the rest."""
+        self._render_pending = False
+        wanted = self._visible_range()
+        for index in [i for i in self._live if i not in wanted]:
+            bubble = self._live.pop(index)
+            self.canvas.itemconfigure(bubble.item, state="hidden")
+            self._pool.append(bubble)
+        for index in wanted:
+            bubble = self._live.get(index)
+            if bubble is None:
+                bubble = self._pool.pop() if self._pool else _Bubble(self)
+                bubble.index = index
+                self._live[index] = bubble
+            bubble.show(self.model.senders[index], self.model.texts[index])
+            self._place(index, bubble)
+        self._schedule_measure()
+
+    def _schedule_measure(self):
+        if not self._measure_pending:
+            self._measure_pending = True
+            self.after_idle(self._measure)
+
+    def _measure(self):
+        """Swap estimated heights for the laid-out bubbles' real ones."""
+        self._measure_pending = False
+        for index, bubble in list(self._live.items()):
+            actual = bubble.row.winfo_reqheight() + 2 * ROW_PAD
+            if actual > 2 * ROW_PAD + 1:
+                self._resize_row(index, actual)
@@ -1,55 +1,356 @@
 import os
-from ollama import Client
+import re
+import threading
+import time
 from dotenv import load_dotenv
+from irfan_23522613.weather_friend import metrics
+from irfan_23522613.weather_friend.answers import answer, classify, is_follow_up
+from irfan_23522613.weather_friend.cache import TTLCache
+from irfan_23522613.weather_friend.memory import ConversationMemory
 from irfan_23522613.weather_friend.utils import parse_weather_question, generate_weather_response
-from irfan_23522613.weather_friend.weather_data import get_weather_data
+from irfan_23522613.weather_friend.weather_data import get_weather_data, get_weather_data_async
 
 load_dotenv()
 
 OLLAMA_API_KEY = os.getenv("OLLAMA_API_KEY")
 
-client = Client(
-    host="https://ollama.com",
-    headers={'Authorization': f'Bearer {OLLAMA_API_KEY}'}
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "https://ollama.com")
+MODEL = "gpt-oss:120b"
+
+# ollama is only imported when the first message actually needs the LLM
+client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+
+def _get_client():
+    """Synchronous ollama Client, created on first use."""
+    global client
+    with _client_lock:
+        if client is None:
+            from ollama import Client
+            client = Client(
+                host=OLLAMA_HOST,
+                headers={'Authorization': f'Bearer {OLLAMA_API_KEY}'}
+            )
+    return client
+
+
+def _get_async_client():
+    """AsyncClient for the background event loop, created on first use."""
+    global _async_client
+    with _client_lock:
+        if _async_client is None:
+            from ollama import AsyncClient
+            _async_client = AsyncClient(
+                host=OLLAMA_HOST,
+                headers={'Authorization': f'Bearer {OLLAMA_API_KEY}'}
+            )
+    return _async_client
+
+
+SYSTEM_PROMPT = (
+    "You are Weather Friend — a short, funny, and friendly weather chatbot. "
+    "You can use real weather data if available. Keep replies under 25 words. "
+    "If the live data is missing, make a witty and plausible weather remark."
 )
 
-conversation_history = [
-    {
-        "role": "system",
-        "content": (
-            "You are Weather Friend — a short, funny, and friendly weather chatbot. "
-            "You can use real weather data if available. Keep replies under 25 words. "
-            "If the live data is missing, make a witty and plausible weather remark."
-        )
-    }
-]
+# One ConversationMemory per chat session, so concurrent chats never share history
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(session_id="default") -> ConversationMemory:
+    """The conversation memory for `session_id`, created on first use."""
+    with _sessions_lock:
+        session = _sessions.get(session_id)
+        if session is None:
+            session = _sessions[session_id] = ConversationMemory(SYSTEM_PROMPT)
+        return session
+
+
+def end_session(session_id):
+    with _sessions_lock:
+        _sessions.pop(session_id, None)
+
+
+def _resolve_session(session):
+    return session if isinstance(session, ConversationMemory) else get_session(session or "default")
+
+
+SMALL_TALK_MAX_WORDS = 12   # longer messages are too context-dependent to reuse answers
+RESPONSE_TTL = 60 * 60
+
+# LLM answers to short small talk ("hi", "thanks", "is it nice out?"), keyed on the
+# normalised message, the model and persona that produced them, and a digest of the
+# conversation so far (so "why?" after one joke isn't answered with another chat's reply)
+response_cache = TTLCache(maxsize=256)
+_seconds_saved = 0.0
+_savings_lock = threading.Lock()
+
+
+def _response_key(message: str, memory):
+    words = re.findall(r"[a-z0-9']+", message.lower())
+    if not words or len(words) > SMALL_TALK_MAX_WORDS:
+        return None
+    return (MODEL, SYSTEM_PROMPT, memory.context_digest(), " ".join(words))
+
+
+def _cached_reply(memory, message):
+    """
+    (reply, key): a cached answer (already added to `memory`) or None, plus the
+    cache key to store a fresh answer under (None when it shouldn't be cached).
+    """
+    global _seconds_saved
+    if not memory.use_response_cache:
+        return None, None
+    key = _response_key(message, memory)
+    if key is None:
+        return None, None
+    hit = response_cache.get(key)
+    if hit is None:
+        return None, key
+
+    reply, latency = hit
+    with _savings_lock:
+        _seconds_saved += latency
+    memory.add("user", message)
+    memory.add("assistant", reply)
+    return reply, key
+
+
+def _cache_reply(key, reply, started):
+    if key is not None and reply:
+        response_cache.set(key, (reply, time.perf_counter() - started), time.time() + RESPONSE_TTL)
+
+
+def response_cache_stats():
+    """Hit/miss counters of the LLM response cache plus model time saved by hits."""
+    stats = response_cache.stats()
+    with _savings_lock:
+        stats["seconds_saved"] = round(_seconds_saved, 3)
+    return stats
+
+
+def _remember_exchange(session, messages, message, reply, response):
+    session.record_usage(messages, response or {})
+    session.add("user", message)
+    session.add("assistant", reply)
+    return reply
+
+
+FORECAST_DAYS = 5   # local answers look at the whole forecast, then narrow it down
+
+# How each message was answered, for answer_stats()
+_routes = {"local": 0, "cached": 0, "llm": 0}
+_local_seconds = 0.0
+_routes_lock = threading.Lock()
+
+
+def _count(route, started=None):
+    global _local_seconds
+    with _routes_lock:
+        _routes[route] += 1
+        if started is not None:
+            _local_seconds += time.perf_counter() - started
+
+
+def answer_stats():
+    """Share of messages answered locally from forecast data vs the response cache vs the LLM."""
+    with _routes_lock:
+        stats = dict(_routes)
+        local_seconds = _local_seconds
+    total = sum(stats.values())
+    stats["messages"] = total
+    stats["local_share"] = round(stats["local"] / total, 3) if total else 0.0
+    stats["local_avg_ms"] = round(local_seconds / stats["local"] * 1000, 2) if stats["local"] else 0.0
+    return stats
+
+
+def _plan_weather_reply(message: str, memory):
+    """(city, intent, parsed) when the message can be answered from forecast data, else None."""
+    parsed = parse_weather_question(message)
+    intent = classify(message)
+    # a follow-up like "and when does the wind drop?" reuses the last city asked about,
+    # but small talk that happens to say "cold" or "hot" doesn't
+    city = parsed.get("location") or (memory.last_city if intent and is_follow_up(message) else None)
+    if not city:
+        return None
+    return city, intent, parsed
+
+
+def _compose_weather_reply(message, memory, plan, weather_data, started):
+    city, intent, parsed = plan
+    reply = None
+    if weather_data and "error" not in weather_data:
+        memory.last_city = city
+        reply = answer(message, weather_data, intent) if intent else None
+    if reply is None:
+        reply = generate_weather_response(parsed, weather_data)
+    _count("local", started)
+    return reply
 
 
-def talk_to_weather_friend(message: str):
-    """Hybrid chatbot — uses weather API if possible, else witty fallback."""
+@metrics.timed("chat.local")
+def _weather_reply(message: str, memory):
+    """A reply built from forecast data, without the LLM, or None for small talk."""
+    started = time.perf_counter()
+    # --- Step 1: parse message for city, intent and day ---
+    plan = _plan_weather_reply(message, memory)
+    if plan is None:
+        return None
+
+    # --- Step 2: answer from real weather data ---
+    try:
+        weather_data = get_weather_data(plan[0], FORECAST_DAYS)
+        return _compose_weather_reply(message, memory, plan, weather_data, started)
+    except Exception as e:
+        print(f"[Weather API error] {e}")
+    return None
+
+
+@metrics.timed("chat.local")
+async def _weather_reply_async(message: str, memory):
+    started = time.perf_counter()
+    plan = _plan_weather_reply(message, memory)
+    if plan is None:
+        return None
+
     try:
-        # --- Step 1: parse message for city and day ---
-        parsed = parse_weather_question(message)
-        city = parsed.get("location")
-        days = parsed.get("days", 1)
-
-        # --- Step 2: Try getting real weather data ---
-        if city:
-            try:
-                weather_data = get_weather_data(city, days)
-                if weather_data:
-                    reply = generate_weather_response(parsed, weather_data)
-                    if reply:
-                        return reply
-            except Exception as e:
-                print(f"[Weather API error] {e}")
+        weather_data = await get_weather_data_async(plan[0], FORECAST_DAYS)
+        return _compose_weather_reply(message, memory, plan, weather_data, started)
+    except Exception as e:
+        print(f"[Weather API error] {e}")
+    return None
+
+
+class _LlmTurn:
+    """
+    A message the LLM has to answer: the prompt to send, then the bookkeeping
+    once the reply is in (response cache, memory, prompt-size usage).
+    """
+
+    def __init__(self, memory, message, key):
+        self.memory = memory
+        self.message = message
+        self.key = key
+        self.started = time.perf_counter()
+        self.messages = memory.messages(pending=message)
+        self._parts = []
+        self._final = None
+
+    def finish(self, reply, response):
+        _cache_reply(self.key, reply, self.started)
+        return _remember_exchange(self.memory, self.messages, self.message, reply, response)
+
+    def chunk(self, chunk):
+        """Take one streamed chunk; returns its text ("" for none)."""
+        text = chunk["message"]["content"]
+        if text:
+            if not self._parts:
+                metrics.observe("chat.llm_first_token", time.perf_counter() - self.started)
+            self._parts.append(text)
+        if chunk.get("done"):
+            self._final = chunk
+        return text
+
+    def finish_stream(self):
+        metrics.observe("chat.llm", time.perf_counter() - self.started)
+        return self.finish("".join(self._parts).strip(), self._final)
+
+
+def _route(message, memory, local_reply):
+    """
+    (reply, None) when the message is answered without the LLM (forecast data or
+    the response cache), else (None, _LlmTurn) for the caller to send.
+    """
+    if local_reply:
+        return local_reply, None
+    cached, key = _cached_reply(memory, message)
+    if cached:
+        _count("cached")
+        return cached, None
+    _count("llm")
+    return None, _LlmTurn(memory, message, key)
+
+
+@metrics.timed("chat.reply")
+def talk_to_weather_friend(message: str, session=None):
+    """
+    Hybrid chatbot — uses weather API if possible, else witty fallback.
+    `session` is a session id or ConversationMemory; omitted means the "default" session.
+    """
+    try:
+        memory = _resolve_session(session)
+        reply, turn = _route(message, memory, _weather_reply(message, memory))
+        if turn is None:
+            return reply
 
         # --- Step 3: Otherwise, fallback to Ollama witty chat ---
-        conversation_history.append({"role": "user", "content": message})
-        response = client.chat("gpt-oss:120b", messages=conversation_history)
-        reply = response["message"]["content"].strip()
-        conversation_history.append({"role": "assistant", "content": reply})
-        return reply
+        with metrics.span("chat.llm"):
+            response = _get_client().chat(MODEL, messages=turn.messages)
+        return turn.finish(response["message"]["content"].strip(), response)
 
     except Exception as e:
         return f"⚠️ Error talking to Weather Friend: {e}"
+
+
+@metrics.timed("chat.reply")
+async def talk_to_weather_friend_async(message: str, session=None):
+    """Asyncio version of talk_to_weather_friend; cancelling it abandons the LLM call."""
+    try:
+        memory = _resolve_session(session)
+        reply, turn = _route(message, memory, await _weather_reply_async(message, memory))
+        if turn is None:
+            return reply
+
+        with metrics.span("chat.llm"):
+            response = await _get_async_client().chat(MODEL, messages=turn.messages)
+        return turn.finish(response["message"]["content"].strip(), response)
+
+    except Exception as e:
+        return f"⚠️ Error talking to Weather Friend: {e}"
+
+
+def stream_weather_friend(message: str, session=None):
+    """
+    Like talk_to_weather_friend, but yields the reply in pieces as the model
+    produces them. Weather answers arrive as a single piece.
+    """
+    try:
+        memory = _resolve_session(session)
+        reply, turn = _route(message, memory, _weather_reply(message, memory))
+        if turn is None:
+            yield reply
+            return
+
+        for chunk in _get_client().chat(MODEL, messages=turn.messages, stream=True):
+            text = turn.chunk(chunk)
+            if text:
+                yield text
+        turn.finish_stream()
+
+    except Exception as e:
+        yield f"⚠️ Error talking to Weather Friend: {e}"
+
+
+async def stream_weather_friend_async(message: str, session=None):
+    """
+    Async generator version of stream_weather_friend. Cancelling the consuming
+    task closes the HTTP stream; an interrupted reply isn't added to memory.
+    """
+    try:
+        memory = _resolve_session(session)
+        reply, turn = _route(message, memory, await _weather_reply_async(message, memory))
+        if turn is None:
+            yield reply
+            return
+
+        async for chunk in await _get_async_client().chat(MODEL, messages=turn.messages, stream=True):
+            text = turn.chunk(chunk)
+            if text:
+                yield text
+        turn.finish_stream()
+
+    except Exception as e:
+        yield f"⚠️ Error talking to Weather Friend: {e}"
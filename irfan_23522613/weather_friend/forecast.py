@@ -0,0 +1,130 @@
+import math
+from collections.abc import Sequence
+
+import numpy as np
+
+NUMERIC_COLUMNS = ("temp", "humidity", "wind_speed", "pop")
+
+
+def _num(value):
+    """Float from an OpenWeather field; missing or placeholder values become NaN."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class Forecast(Sequence):
+    """
+    Forecast slots stored as columns instead of a list of dicts.
+
+    `time` is datetime64[s] (UTC) and temp/humidity/wind_speed/pop are float32,
+    all decoded once when the forecast is fetched. Slicing returns a view
+    over the same arrays, so cutting a 5-day forecast down to `days` costs
+    nothing. Indexing still yields the old slot dicts, built on demand:
+    {"time": "YYYY-MM-DD HH:MM:SS", "temp", "humidity", "wind_speed", "description", "pop"}.
+    `pop` is OpenWeather's probability of precipitation (0-1), NaN when unknown.
+    """
+
+    __slots__ = ("time", "temp", "humidity", "wind_speed", "description", "pop")
+
+    def __init__(self, time, temp, humidity, wind_speed, description, pop):
+        self.time = time
+        self.temp = temp
+        self.humidity = humidity
+        self.wind_speed = wind_speed
+        self.description = description
+        self.pop = pop
+
+    @classmethod
+    def from_items(cls, items):
+        """Decode OpenWeather's raw `list` of 3-hour items."""
+        times, temps, humidity, wind, desc, pop = [], [], [], [], [], []
+        for item in items:
+            main = item.get("main", {})
+            weather = (item.get("weather") or [{}])[0]
+            times.append(item["dt"] if "dt" in item else item.get("dt_txt"))
+            temps.append(_num(main.get("temp")))
+            humidity.append(_num(main.get("humidity")))
+            wind.append(_num((item.get("wind") or {}).get("speed")))
+            desc.append(weather.get("description", "Unknown"))
+            pop.append(_num(item.get("pop")))
+        return cls._build(times, temps, humidity, wind, desc, pop)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from the list-of-dicts shape (old get_weather_data output or stored JSON)."""
+        records = list(records)
+        return cls._build(
+            [r.get("time") or r.get("dt_txt") for r in records],
+            [_num(r.get("temp")) for r in records],
+            [_num(r.get("humidity")) for r in records],
+            [_num(r.get("wind_speed")) for r in records],
+            [r.get("description", "Unknown") for r in records],
+            [_num(r.get("pop")) for r in records],
+        )
+
+    @classmethod
+    def _build(cls, times, temps, humidity, wind, desc, pop):
+        if times and isinstance(times[0], (int, float)):
+            time = np.array(times, dtype="int64").astype("datetime64[s]")
+        else:
+            time = np.array(times, dtype="datetime64[s]")
+        columns = (
+            time,
+            np.array(temps, dtype=np.float32),
+            np.array(humidity, dtype=np.float32),
+            np.array(wind, dtype=np.float32),
+            np.array(desc, dtype=object),
+            np.array(pop, dtype=np.float32),
+        )
+        for column in columns:
+            column.flags.writeable = False  # views are shared with the cache
+        return cls(*columns)
+
+    def head(self, n: int) -> "Forecast":
+        """First `n` slots as a view (no copy)."""
+        return self[:n]
+
+    def __len__(self):
+        return len(self.time)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Forecast(*(getattr(self, name)[index] for name in self.__slots__))
+        return self._record(index)
+
+    def _record(self, i):
+        def plain(column):
+            value = float(column[i])
+            if math.isnan(value):
+                return None
+            return int(value) if value.is_integer() else round(value, 2)
+
+        wind = plain(self.wind_speed)
+        return {
+            "time": str(self.time[i]).replace("T", " "),
+            "temp": plain(self.temp),
+            "humidity": plain(self.humidity),
+            "wind_speed": "—" if wind is None else wind,
+            "description": self.description[i],
+            "pop": plain(self.pop),
+        }
+
+    def to_records(self):
+        """The full list-of-dicts view."""
+        return [self._record(i) for i in range(len(self))]
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.__slots__)
+
+    def __eq__(self, other):
+        if isinstance(other, Forecast):
+            return self.to_records() == other.to_records()
+        if isinstance(other, list):
+            return self.to_records() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Forecast({len(self)} slots)"
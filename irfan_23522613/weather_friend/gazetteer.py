@@ -0,0 +1,162 @@
+import csv
+import json
+import os
+import re
+import threading
+from typing import NamedTuple, Optional
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_CITIES = os.path.join(DATA_DIR, "cities.csv")
+
+# A place whose name is also an everyday word ("nice", "reading") only counts
+# when one of these comes right before it: "is it nice out" vs "weather in nice"
+PREPOSITIONS = {"in", "for", "at", "to", "near", "around", "from"}
+
+_TOKEN = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+_END = None  # trie key marking "a place name ends here"
+
+
+def tokenize(text: str):
+    """Lower-case word tokens, so 'St. Louis!' and 'st louis' match the same entry."""
+    return _TOKEN.findall(text.lower())
+
+
+class Place(NamedTuple):
+    name: str
+    country: str
+    lat: float
+    lon: float
+    id: Optional[int] = None
+    common_word: bool = False
+
+    def query_params(self):
+        """OpenWeather query for this place: by city ID when known, else by coordinates."""
+        if self.id is not None:
+            return {"id": self.id}
+        return {"lat": self.lat, "lon": self.lon}
+
+
+class Gazetteer:
+    """
+    Offline index of city names and aliases.
+
+    Names are stored in a token trie, so find() scans a message once and
+    returns the longest known place name, without any network request.
+    """
+
+    def __init__(self, entries):
+        """`entries` is an iterable of (Place, [alias, ...])."""
+        self._trie = {}
+        self._by_name = {}
+        self.max_tokens = 0
+        for place, aliases in entries:
+            for name in [place.name, *aliases]:
+                tokens = tuple(tokenize(name))
+                if not tokens or tokens in self._by_name:
+                    continue  # first (most important) entry wins
+                self._by_name[tokens] = place
+                node = self._trie
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node[_END] = place
+                self.max_tokens = max(self.max_tokens, len(tokens))
+
+    @classmethod
+    def from_csv(cls, path=DEFAULT_CITIES):
+        """Load `name,country,lat,lon,aliases,common_word` rows (aliases separated by '|')."""
+        entries = []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                place = Place(
+                    name=row["name"],
+                    country=row["country"],
+                    lat=float(row["lat"]),
+                    lon=float(row["lon"]),
+                    id=int(row["id"]) if row.get("id") else None,
+                    common_word=bool(row.get("common_word")),
+                )
+                aliases = [a for a in (row.get("aliases") or "").split("|") if a]
+                entries.append((place, aliases))
+        return cls(entries)
+
+    @classmethod
+    def from_openweather_json(cls, path):
+        """
+        Load OpenWeather's bulk city.list.json (gives city IDs for every entry).
+        When several cities share a name, the first one listed wins.
+        """
+        with open(path, encoding="utf-8") as f:
+            cities = json.load(f)
+        return cls(
+            (Place(c["name"], c.get("country", ""), c["coord"]["lat"], c["coord"]["lon"], c["id"]), [])
+            for c in cities
+        )
+
+    def __len__(self):
+        return len(self._by_name)
+
+    def places(self):
+        """Each distinct place once, in load order (aliases are not repeated)."""
+        return list(dict.fromkeys(self._by_name.values()))
+
+    def lookup(self, name: str):
+        """The place with exactly this name or alias, or None."""
+        return self._by_name.get(tuple(tokenize(name)))
+
+    def find_all(self, text: str):
+        """Every longest place-name match in `text` as (start, end, place) token spans."""
+        return self._scan(text)[0]
+
+    def _scan(self, text: str):
+        tokens = tokenize(text)
+        matches = []
+        i = 0
+        while i < len(tokens):
+            node, best = self._trie, None
+            for j in range(i, min(len(tokens), i + self.max_tokens)):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if _END in node:
+                    best = (i, j + 1, node[_END])
+            if best is not None:
+                matches.append(best)
+                i = best[1]
+            else:
+                i += 1
+        return matches, tokens
+
+    def find(self, text: str):
+        """
+        The place a message is asking about, or None.
+        Prefers a name right after "in/for/at…"; everyday-word names need one.
+        """
+        matches, tokens = self._scan(text)
+        fallback = None
+        for start, _, place in matches:
+            after_preposition = start > 0 and tokens[start - 1] in PREPOSITIONS
+            if after_preposition:
+                return place
+            if fallback is None and not place.common_word:
+                fallback = place
+        return fallback
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """The bundled gazetteer (data/cities.csv), loaded on first use."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = Gazetteer.from_csv(DEFAULT_CITIES)
+    return _default
+
+
+def set_gazetteer(gazetteer: Gazetteer):
+    """Swap in a larger index, e.g. Gazetteer.from_openweather_json('city.list.json')."""
+    global _default
+    _default = gazetteer
@@ -0,0 +1,111 @@
+import hashlib
+import threading
+from collections import deque
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) used to keep prompts in budget."""
+    return len(text) // 4 + 1
+
+
+class ConversationMemory:
+    """
+    One chat session's history, kept under a token budget.
+
+    The system prompt is always sent first. Recent turns are kept verbatim
+    while they fit in `token_budget`; older turns are folded into a short
+    running summary (at most `summary_budget` tokens) so the prompt sent to
+    the model stays roughly the same size however long the chat runs.
+    """
+
+    def __init__(self, system_prompt: str, token_budget: int = 1200, summary_budget: int = 200,
+                 use_response_cache: bool = True):
+        self.system_prompt = system_prompt
+        self.use_response_cache = use_response_cache  # may reuse cached small-talk answers
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self._turns = deque()          # (role, content, tokens)
+        self._turn_tokens = 0
+        self._summary = deque()        # one short line per compacted turn
+        self._summary_tokens = 0
+        self._summarised = 0           # turns folded into the summary so far (lines may since have dropped)
+        self._lock = threading.Lock()
+        self.usage = deque(maxlen=200)  # per LLM call: estimated and reported prompt tokens
+        self.last_city = None           # city of the last forecast answer, for follow-ups
+
+    def add(self, role: str, content: str):
+        """Append a turn, compacting the oldest ones if the window is over budget."""
+        with self._lock:
+            tokens = estimate_tokens(content)
+            self._turns.append((role, content, tokens))
+            self._turn_tokens += tokens
+            self._compact()
+
+    def _compact(self):
+        fixed = estimate_tokens(self.system_prompt) + self.summary_budget
+        while self._turns and len(self._turns) > 1 and fixed + self._turn_tokens > self.token_budget:
+            role, content, tokens = self._turns.popleft()
+            self._turn_tokens -= tokens
+            line = f"{'User' if role == 'user' else 'You'}: {content[:80]}"
+            self._summary.append(line)
+            self._summarised += 1
+            self._summary_tokens += estimate_tokens(line)
+            while self._summary_tokens > self.summary_budget and self._summary:
+                self._summary_tokens -= estimate_tokens(self._summary.popleft())
+
+    def messages(self, pending: str = None):
+        """Messages to send: pinned system prompt (+ summary), recent turns, then `pending`."""
+        with self._lock:
+            system = self.system_prompt
+            if self._summary:
+                system += "\nEarlier in this chat:\n" + "\n".join(self._summary)
+            out = [{"role": "system", "content": system}]
+            out += [{"role": role, "content": content} for role, content, _ in self._turns]
+        if pending is not None:
+            out.append({"role": "user", "content": pending})
+        return out
+
+    def context_digest(self) -> str:
+        """
+        Short hash of what a reply depends on besides the new message: the summary
+        and the last assistant turn. "" for a session with no history yet.
+        """
+        with self._lock:
+            last_reply = next((content for role, content, _ in reversed(self._turns) if role == "assistant"), None)
+            if not self._summary and last_reply is None:
+                return ""
+            h = hashlib.blake2b(digest_size=12)
+            for line in self._summary:
+                h.update(line.encode("utf-8") + b"\n")
+            h.update(b"\0" + (last_reply or "").encode("utf-8"))
+            return h.hexdigest()
+
+    def record_usage(self, messages, response):
+        """Remember the prompt size of one LLM call (the server's count when it reports one)."""
+        estimated = sum(estimate_tokens(m["content"]) for m in messages)
+        reported = getattr(response, "prompt_eval_count", None)
+        if reported is None and isinstance(response, dict):
+            reported = response.get("prompt_eval_count")
+        entry = {"estimated_tokens": estimated, "prompt_tokens": reported or estimated}
+        with self._lock:
+            self.usage.append(entry)
+        return entry
+
+    def stats(self):
+        with self._lock:
+            prompts = [u["prompt_tokens"] for u in self.usage]
+            return {
+                "turns": len(self._turns),
+                "summarised_turns": self._summarised,
+                "window_tokens": self._turn_tokens,
+                "calls": len(prompts),
+                "last_prompt_tokens": prompts[-1] if prompts else 0,
+                "max_prompt_tokens": max(prompts, default=0),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._turns.clear()
+            self._summary.clear()
+            self._turn_tokens = self._summary_tokens = self._summarised = 0
+            self.last_city = None
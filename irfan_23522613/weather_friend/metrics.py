@@ -0,0 +1,248 @@
+"""
+Timing spans and counters for the hot paths (fetch, decode, parse, charts, chat).
+
+Off by default; turn on with WEATHER_FRIEND_METRICS=1 (or metrics.enable()).
+While off, @timed functions cost one flag check and span() returns a shared
+no-op context, so the hooks can stay in place permanently.
+
+    WEATHER_FRIEND_METRICS=1 WEATHER_FRIEND_METRICS_DUMP=metrics.prom python WeatherFriend.py
+
+dump() writes JSON, or Prometheus text format when the path ends in .prom/.txt;
+WEATHER_FRIEND_METRICS_DUMP does the same automatically at exit.
+"""
+import atexit
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+# Histogram upper bounds in seconds (Prometheus `le` labels)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_enabled = os.getenv("WEATHER_FRIEND_METRICS", "") not in ("", "0")
+_lock = threading.Lock()
+_spans = {}      # name -> _Span
+_counters = {}   # name -> int
+
+
+class _Span:
+    __slots__ = ("count", "errors", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = self.errors = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)   # last one is +Inf
+
+    def add(self, seconds, failed):
+        self.count += 1
+        self.errors += failed
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def quantile(self, q):
+        """Approximate quantile (seconds) from the histogram: the bucket bound it falls in."""
+        target, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS + (self.max,), self.buckets):
+            seen += n
+            if seen >= target and n:
+                return min(bound, self.max)
+        return self.max
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(on: bool = True):
+    global _enabled
+    _enabled = on
+
+
+def observe(name: str, seconds: float, failed: bool = False):
+    """Record one timing under `name` (no-op while metrics are off)."""
+    if not _enabled:
+        return
+    with _lock:
+        span = _spans.get(name)
+        if span is None:
+            span = _spans[name] = _Span()
+        span.add(seconds, failed)
+
+
+def incr(name: str, n: int = 1):
+    """Add `n` to the counter `name` (no-op while metrics are off)."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.started, exc_type is not None)
+        return False
+
+
+def span(name: str):
+    """`with span("weather.fetch"):` times the block; an exception counts as an error."""
+    return _ActiveSpan(name) if _enabled else _NULL_SPAN
+
+
+def timed(name: str, failed=None):
+    """
+    Decorator recording each call's duration under `name`. Exceptions count as
+    errors, and so does a result for which `failed(result)` is true (for
+    functions that return {"error": ...} instead of raising). Works on plain
+    and async functions.
+    """
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await fn(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    result = await fn(*args, **kwargs)
+                except BaseException:
+                    observe(name, time.perf_counter() - started, True)
+                    raise
+                observe(name, time.perf_counter() - started, bool(failed and failed(result)))
+                return result
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                observe(name, time.perf_counter() - started, True)
+                raise
+            observe(name, time.perf_counter() - started, bool(failed and failed(result)))
+            return result
+        return wrapper
+    return decorate
+
+
+def is_error_dict(result) -> bool:
+    """`failed=` check for functions that report problems as {"error": ...}."""
+    return isinstance(result, dict) and "error" in result
+
+
+def snapshot():
+    """Every span (count, errors, mean/min/max/p50/p95 in ms, buckets) and counter."""
+    with _lock:
+        spans = {
+            name: {
+                "count": s.count,
+                "errors": s.errors,
+                "total_ms": s.total * 1000,
+                "mean_ms": s.total / s.count * 1000,
+                "min_ms": s.min * 1000,
+                "max_ms": s.max * 1000,
+                "p50_ms": s.quantile(0.5) * 1000,
+                "p95_ms": s.quantile(0.95) * 1000,
+                "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], s.buckets)),
+            }
+            for name, s in sorted(_spans.items())
+        }
+        counters = dict(sorted(_counters.items()))
+    return {"enabled": _enabled, "spans": spans, "counters": counters}
+
+
+def to_json() -> str:
+    return json.dumps(snapshot(), indent=2)
+
+
+def _metric_name(name):
+    return "weather_friend_" + "".join(c if c.isalnum() else "_" for c in name)
+
+
+def to_prometheus() -> str:
+    """Prometheus text exposition: one histogram per span plus error totals and counters."""
+    with _lock:
+        spans = sorted((name, s.count, s.errors, s.total, list(s.buckets)) for name, s in _spans.items())
+        counters = sorted(_counters.items())
+
+    lines = [
+        "# HELP weather_friend_span_seconds Time spent in instrumented calls.",
+        "# TYPE weather_friend_span_seconds histogram",
+    ]
+    for name, count, _, total, buckets in spans:
+        cumulative = 0
+        for bound, n in zip([str(b) for b in BUCKETS] + ["+Inf"], buckets):
+            cumulative += n
+            lines.append(f'weather_friend_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'weather_friend_span_seconds_sum{{span="{name}"}} {total:.6f}')
+        lines.append(f'weather_friend_span_seconds_count{{span="{name}"}} {count}')
+    lines += [
+        "# HELP weather_friend_span_errors_total Instrumented calls that raised or returned an error.",
+        "# TYPE weather_friend_span_errors_total counter",
+    ]
+    lines += [f'weather_friend_span_errors_total{{span="{name}"}} {errors}' for name, _, errors, _, _ in spans]
+    for name, value in counters:
+        metric = _metric_name(name) + "_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+def dump(path: str):
+    """Write the current metrics to `path` (.prom/.txt: Prometheus text, otherwise JSON)."""
+    text = to_prometheus() if path.endswith((".prom", ".txt")) else to_json()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def overlay_lines(limit: int = 6):
+    """Short 'name  p50/p95 ms  (count)' lines for the dashboard's stats overlay, slowest first."""
+    spans = snapshot()["spans"]
+    ranked = sorted(spans.items(), key=lambda item: -item[1]["p95_ms"])[:limit]
+    return [
+        f"{name:<18} {s['p50_ms']:>6.1f}/{s['p95_ms']:<6.1f}ms ×{s['count']}" + (f" ⚠{s['errors']}" if s["errors"] else "")
+        for name, s in ranked
+    ]
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+_dump_path = os.getenv("WEATHER_FRIEND_METRICS_DUMP")
+if _dump_path:
+    atexit.register(dump, _dump_path)
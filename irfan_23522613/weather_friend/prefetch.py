@@ -0,0 +1,278 @@
+"""
+Background refresh of the cities the dashboard keeps coming back to.
+
+Pages call touch(city) on every lookup; the last MAX_RECENT cities plus any
+pinned ones are "tracked". A daemon thread sleeps until the next tracked
+forecast expires (OpenWeather's 3-hour update boundary) and re-fetches it at
+BACKGROUND priority, so the next lookup for that city is a memory hit.
+
+Refreshes are capped at `budget` requests per hour (pinned cities first,
+then the most recently used) and stop while the window is minimised or
+nobody has touched the app for IDLE_AFTER seconds. stats() reports how often
+a lookup found a fresh forecast already waiting.
+
+    WEATHER_FRIEND_PREFETCH_BUDGET=30   # refreshes per hour (0 turns prefetching off)
+    WEATHER_FRIEND_PINS=~/.weather_friend/pinned.json
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from irfan_23522613.weather_friend import metrics
+
+MAX_RECENT = 8
+IDLE_AFTER = 15 * 60     # seconds without input before refreshing pauses
+SETTLE = 60              # wait this long past an update boundary for OpenWeather to publish
+RETRY_FAILED = 10 * 60   # back off a city whose refresh failed (other than "not found")
+BUDGET_WINDOW = 60 * 60
+
+
+def _default_pins_path():
+    return os.getenv("WEATHER_FRIEND_PINS") or os.path.join(os.path.expanduser("~"), ".weather_friend", "pinned.json")
+
+
+class Prefetcher:
+    """Keeps recently used and pinned cities' forecasts fresh in weather_data's cache."""
+
+    def __init__(self, budget: int = None, pins_path: str = None, max_recent: int = MAX_RECENT,
+                 idle_after: float = IDLE_AFTER, clock=time.time):
+        if budget is None:
+            budget = int(os.getenv("WEATHER_FRIEND_PREFETCH_BUDGET", "30"))
+        self.budget = budget
+        self.max_recent = max_recent
+        self.idle_after = idle_after
+        self.pins_path = pins_path or _default_pins_path()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._stopped = False
+        self._recent = OrderedDict()   # key -> city as typed, most recent last
+        self._pinned = {}              # key -> city
+        self._unresolved = []          # saved pins not yet keyed (normalise_city imports the forecast stack)
+        self._retry_at = {}            # key -> don't refresh before this time
+        self._spent = deque()          # times of refreshes in the last BUDGET_WINDOW
+        self._visible = True
+        self._last_activity = clock()
+        self._counts = {"lookups": 0, "fresh_hits": 0, "refreshes": 0, "failed": 0, "over_budget": 0}
+        self._load_pins()
+
+    # --- what to track ---
+
+    @staticmethod
+    def _key(city):
+        from irfan_23522613.weather_friend.weather_data import normalise_city
+        return normalise_city(city)
+
+    def touch(self, city: str, count: bool = True):
+        """
+        Note a lookup of `city` and start tracking it. With `count`, also record
+        whether its forecast was already fresh in memory (for stats()).
+        """
+        city = (city or "").strip()
+        if not city:
+            return
+        from irfan_23522613.weather_friend.weather_data import forecast_cache
+        key = self._key(city)
+        expires_at = forecast_cache.expires_at(key)
+        fresh = expires_at is not None and expires_at > self._clock()
+        with self._lock:
+            self._recent[key] = city
+            self._recent.move_to_end(key)
+            while len(self._recent) > self.max_recent:
+                self._recent.popitem(last=False)
+            if count:
+                self._counts["lookups"] += 1
+                self._counts["fresh_hits"] += fresh
+        if count:
+            metrics.incr("prefetch.fresh_hit" if fresh else "prefetch.stale_lookup")
+        self.note_activity()
+
+    def _resolve_pins(self):
+        """Key the pins loaded from disk; deferred so constructing a Prefetcher on the UI thread stays cheap."""
+        with self._lock:
+            cities, self._unresolved = self._unresolved, []
+        if cities:
+            keyed = {self._key(c): c for c in cities}
+            with self._lock:
+                for key, city in keyed.items():
+                    self._pinned.setdefault(key, city)
+
+    def forget(self, city: str):
+        """Stop tracking a city that turned out not to exist (pinned cities stay)."""
+        with self._lock:
+            self._recent.pop(self._key(city), None)
+
+    def pin(self, city: str):
+        """Always keep `city` fresh (remembered across restarts)."""
+        self._resolve_pins()
+        key = self._key(city)
+        with self._lock:
+            self._pinned[key] = city.strip()
+        self._save_pins()
+        self._wake.set()
+
+    def unpin(self, city: str):
+        self._resolve_pins()
+        with self._lock:
+            self._pinned.pop(self._key(city), None)
+        self._save_pins()
+
+    def is_pinned(self, city: str) -> bool:
+        self._resolve_pins()
+        return self._key(city) in self._pinned
+
+    def pinned(self):
+        with self._lock:
+            return list(self._pinned.values()) + list(self._unresolved)
+
+    def tracked(self):
+        """(key, city) pairs in refresh order: pinned first, then most recently used."""
+        self._resolve_pins()
+        with self._lock:
+            out = list(self._pinned.items())
+            out += [(k, c) for k, c in reversed(self._recent.items()) if k not in self._pinned]
+        return out
+
+    def _load_pins(self):
+        try:
+            with open(self.pins_path, encoding="utf-8") as f:
+                cities = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._unresolved = [c.strip() for c in cities if isinstance(c, str) and c.strip()]
+
+    def _save_pins(self):
+        try:
+            os.makedirs(os.path.dirname(self.pins_path) or ".", exist_ok=True)
+            with open(self.pins_path, "w", encoding="utf-8") as f:
+                json.dump(self.pinned(), f, indent=2)
+        except OSError as e:
+            print(f"[Prefetch] couldn't save pinned cities: {e}")
+
+    # --- pausing ---
+
+    def note_activity(self):
+        """Call on user input; wakes the refresher if it was idle."""
+        was_idle = self._idle()
+        self._last_activity = self._clock()
+        if was_idle:
+            self._wake.set()
+
+    def set_visible(self, visible: bool):
+        """The window was minimised (False) or restored (True)."""
+        self._visible = visible
+        if visible:
+            self.note_activity()
+            self._wake.set()
+
+    def _idle(self):
+        return self._clock() - self._last_activity > self.idle_after
+
+    @property
+    def paused(self) -> bool:
+        return not self._visible or self._idle() or self.budget <= 0
+
+    # --- refreshing ---
+
+    def _budget_left(self, now):
+        while self._spent and now - self._spent[0] > BUDGET_WINDOW:
+            self._spent.popleft()
+        return self.budget - len(self._spent)
+
+    def due(self, now=None):
+        """
+        (cities to refresh now, seconds until the next one is due). A forecast
+        is due once its cached copy has expired, SETTLE seconds after the boundary.
+        """
+        from irfan_23522613.weather_friend.weather_data import forecast_cache, next_update_boundary
+        now = self._clock() if now is None else now
+        due, next_at = [], next_update_boundary(now) + SETTLE
+        for key, city in self.tracked():
+            expires_at = forecast_cache.expires_at(key)
+            ready_at = max(self._retry_at.get(key, 0), expires_at + SETTLE if expires_at else 0)
+            if ready_at <= now:
+                due.append((key, city))
+            else:
+                next_at = min(next_at, ready_at)
+        return due, max(0.0, next_at - now)
+
+    def run_once(self):
+        """Refresh whatever is due within the budget; returns seconds until the next run."""
+        from irfan_23522613.weather_friend.weather_data import refresh_forecast
+        if self.paused:
+            return None
+        due, wait = self.due()
+        for i, (key, city) in enumerate(due):
+            if self.paused:
+                return None
+            now = self._clock()
+            with self._lock:
+                if self._budget_left(now) <= 0:
+                    self._counts["over_budget"] += len(due) - i
+                    # the oldest refresh leaves the window first
+                    return max(1.0, BUDGET_WINDOW - (now - self._spent[0]))
+                self._spent.append(now)
+            with metrics.span("prefetch.refresh"):
+                result = refresh_forecast(city)
+            with self._lock:
+                self._counts["refreshes"] += 1
+                if "error" not in result:
+                    self._retry_at.pop(key, None)
+                    continue
+                self._counts["failed"] += 1
+                if result.get("error_type") == "CityNotFound":
+                    self._recent.pop(key, None)   # a typo; stop tracking it
+                else:
+                    self._retry_at[key] = now + RETRY_FAILED
+        return self.due()[1] if due else wait
+
+    def _loop(self):
+        while not self._stopped:
+            try:
+                wait = self.run_once()
+            except Exception as e:
+                print(f"[Prefetch error] {e}")
+                wait = RETRY_FAILED
+            self._wake.wait(wait)   # None: paused until note_activity/set_visible/pin
+            self._wake.clear()
+
+    def start(self):
+        self._resolve_pins()
+        if self._thread is None and self.budget > 0:
+            self._stopped = False
+            self._thread = threading.Thread(target=self._loop, name="prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+        self._thread = None
+
+    def stats(self):
+        """Lookups, how many found a fresh forecast waiting, refreshes and budget left."""
+        with self._lock:
+            out = dict(self._counts)
+            out["fresh_ratio"] = out["fresh_hits"] / out["lookups"] if out["lookups"] else 0.0
+            out["tracked"] = (len(self._pinned) + len(self._unresolved)
+                              + sum(1 for k in self._recent if k not in self._pinned))
+            out["pinned"] = len(self._pinned) + len(self._unresolved)
+            out["budget_left"] = self._budget_left(self._clock())
+        out["paused"] = self.paused
+        return out
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> Prefetcher:
+    """The dashboard's shared Prefetcher (not started until start() is called)."""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher()
+    return _prefetcher
@@ -0,0 +1,205 @@
+"""
+Chart PNG/SVG rendering in worker processes, one chart or hundreds at a time.
+
+Drawing a chart is CPU-bound matplotlib work that holds the GIL, so both the
+headless server and batch jobs hand it to a process pool. Each worker
+applies the dashboard style once and keeps one pre-styled ForecastChart
+figure, so a render only swaps in new data and calls savefig: no figure,
+axes or style setup per chart.
+
+    python -m irfan_23522613.weather_friend.rendering Perth London Tokyo --out charts/ --workers 4
+    python -m irfan_23522613.weather_friend.rendering --cities-file cities.txt --format svg --out charts/
+    python -m irfan_23522613.weather_friend.rendering --bench 200 --workers 4   # charts/s vs workers, offline
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+CHART_SERIES = ("temperature", "humidity")
+FORMATS = ("png", "svg")
+DEFAULT_DPI = 100
+
+_template = None   # this process's ForecastChart, created by _init_worker / on first render
+
+
+def _init_worker():
+    global _template
+    from irfan_23522613.weather_friend.visualisation import ForecastChart, apply_dashboard_style
+    apply_dashboard_style()
+    _template = ForecastChart()
+
+
+def render_chart(forecast, series: str = "temperature", target=None, fmt: str = "png", dpi: int = DEFAULT_DPI):
+    """
+    Draw the dashboard's temperature or humidity chart for `forecast` on this
+    process's reusable figure. Writes to `target` (a path or file object) and
+    returns it, or returns the encoded bytes when `target` is None.
+    """
+    if _template is None:
+        _init_worker()
+    _template.update({"forecast": forecast}, series.title())
+    out = io.BytesIO() if target is None else target
+    _template.fig.savefig(out, format=fmt, dpi=dpi, facecolor=_template.fig.get_facecolor())
+    return out.getvalue() if target is None else target
+
+
+def render_png(forecast, series: str = "temperature", dpi: int = DEFAULT_DPI) -> bytes:
+    """PNG bytes of the temperature or humidity chart for `forecast`."""
+    return render_chart(forecast, series, dpi=dpi)
+
+
+def _render_job(job):
+    name, forecast, series, path, fmt, dpi = job
+    return name, series, render_chart(forecast, series, path, fmt, dpi)
+
+
+def chart_filename(name: str, series: str, fmt: str = "png") -> str:
+    """'Rio de Janeiro', 'humidity' -> 'rio-de-janeiro_humidity.png'."""
+    slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "chart"
+    return f"{slug}_{series}.{fmt}"
+
+
+def render_many(forecasts, series=CHART_SERIES, out_dir=None, fmt="png", dpi=DEFAULT_DPI, pool=None,
+                chunksize=4):
+    """
+    Render every (name, forecast) in `forecasts` for each of `series` on the
+    pool. Yields (name, series, result) in order, where result is the written
+    file path under `out_dir`, or the image bytes when `out_dir` is None
+    (workers then send the bytes back instead of writing files).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+    jobs = (
+        (name, forecast, s, os.path.join(out_dir, chart_filename(name, s, fmt)) if out_dir else None, fmt, dpi)
+        for name, forecast in forecasts
+        for s in series
+    )
+    yield from (pool or get_render_pool()).map(_render_job, jobs, chunksize=chunksize)
+
+
+def new_render_pool(workers: int = None) -> ProcessPoolExecutor:
+    """A process pool whose workers are set up for render_chart."""
+    # spawn: workers don't inherit the parent's threads and sockets (and it's what Windows does)
+    return ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count() or 1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool(workers: int = None) -> ProcessPoolExecutor:
+    """The shared rendering pool, started on first use with `workers` processes (default: CPU count)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = new_render_pool(workers)
+    return _pool
+
+
+def shutdown_render_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def _fake_forecasts(n):
+    """`n` synthetic 5-day forecasts, for --bench (no network needed)."""
+    from datetime import datetime, timezone
+    import numpy as np
+    from irfan_23522613.weather_friend.forecast import Forecast
+
+    start = int(datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0).timestamp())
+    rng = np.random.default_rng(1)
+    out = []
+    for i in range(n):
+        items = [{
+            "dt": start + 3 * 3600 * slot,
+            "main": {"temp": float(15 + 8 * np.sin(slot / 8 * 2 * np.pi) + rng.normal()),
+                     "humidity": float(rng.integers(30, 95))},
+            "wind": {"speed": float(rng.uniform(0, 10))},
+            "weather": [{"description": "scattered clouds"}],
+        } for slot in range(40)]
+        out.append((f"city {i}", Forecast.from_items(items)))
+    return out
+
+
+def _bench(count, max_workers, fmt, dpi):
+    """Charts/s for 1..max_workers workers (doubling), rendering `count` forecasts x both series to bytes."""
+    forecasts = _fake_forecasts(count)
+    counts = sorted({1, *[2 ** i for i in range(1, 8) if 2 ** i < max_workers], max_workers})
+    print(f"{count * len(CHART_SERIES)} {fmt} charts per run, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'charts/s':>9} {'s':>7}")
+    for workers in counts:
+        pool = new_render_pool(workers)
+        try:
+            list(pool.map(_render_job, [("warm", forecasts[0][1], "temperature", None, fmt, dpi)] * workers))
+            start = time.perf_counter()
+            n = sum(1 for _ in render_many(forecasts, fmt=fmt, dpi=dpi, pool=pool))
+            elapsed = time.perf_counter() - start
+        finally:
+            pool.shutdown()
+        print(f"{workers:>7} {n / elapsed:>9.1f} {elapsed:>7.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m irfan_23522613.weather_friend.rendering",
+        description="Render temperature/humidity charts for many cities.",
+    )
+    parser.add_argument("cities", nargs="*")
+    parser.add_argument("--cities-file", help="one city per line")
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--series", nargs="+", choices=CHART_SERIES, default=list(CHART_SERIES))
+    parser.add_argument("--format", choices=FORMATS, default="png")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    parser.add_argument("--out", default="charts", help="output directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--bench", type=int, metavar="N", help="benchmark N synthetic cities instead")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        _bench(args.bench, args.workers, args.format, args.dpi)
+        return 0
+
+    cities = list(args.cities)
+    if args.cities_file:
+        with open(args.cities_file, encoding="utf-8") as f:
+            cities += [line.strip() for line in f if line.strip()]
+    if not cities:
+        parser.error("give city names or --cities-file")
+
+    from irfan_23522613.weather_friend.weather_data import get_weather_data_many
+
+    forecasts, failed = [], 0
+    for city, data in get_weather_data_many(cities, days=args.days):
+        if "error" in data:
+            failed += 1
+            print(f"❌ {city}: {data['error']}", file=sys.stderr)
+        else:
+            forecasts.append((data["city"], data["forecast"]))
+
+    start = time.perf_counter()
+    with new_render_pool(args.workers) as pool:
+        written = sum(1 for _ in render_many(forecasts, args.series, args.out, args.format, args.dpi, pool=pool))
+    elapsed = time.perf_counter() - start
+    elapsed = max(elapsed, 1e-9)
+    print(f"✅ {written} charts in {elapsed:.1f} s ({written / elapsed:.1f} charts/s, {args.workers} workers) -> {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
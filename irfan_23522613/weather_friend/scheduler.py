@@ -0,0 +1,316 @@
+"""
+Quota-aware scheduling for OpenWeather requests.
+
+Every call goes through RequestScheduler.call() / call_async(), which:
+
+- takes a token from a per-minute token bucket before sending, so a burst
+  of lookups can't exceed the API key's quota;
+- serves INTERACTIVE requests (GUI clicks, chat) before BACKGROUND ones
+  (refreshes, batch jobs) whenever they're both waiting for a token;
+- retries 429 and 5xx responses and network errors with jittered
+  exponential backoff, honouring Retry-After;
+- raises a distinct WeatherAPIError subclass for each kind of failure.
+
+stats() reports queue depth, per-priority waits, retries and error counts.
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import httpx
+import requests
+
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+_POLL = 0.05   # longest a waiter sleeps before re-checking the queue (async waiters can't be notified)
+
+
+class WeatherAPIError(Exception):
+    """An OpenWeather request that failed; `status` is the HTTP status (None for network errors)."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class CityNotFound(WeatherAPIError):
+    pass
+
+
+class AuthError(WeatherAPIError):
+    pass
+
+
+class RateLimited(WeatherAPIError):
+    """Still 429 after every retry."""
+
+    def __init__(self, message, status=429, retry_after=None):
+        super().__init__(message, status)
+        self.retry_after = retry_after
+
+
+class ServerError(WeatherAPIError):
+    """Still 5xx after every retry."""
+
+
+class NetworkError(WeatherAPIError):
+    """Timeouts and connection failures, after every retry."""
+
+
+class QueueTimeout(WeatherAPIError):
+    """Waited longer than the caller's timeout for a quota token."""
+
+
+def error_for_status(status: int, retry_after=None):
+    """The WeatherAPIError for a failed HTTP status (None when `status` is a success)."""
+    if status < 400:
+        return None
+    if status == 429:
+        return RateLimited("OpenWeather rate limit reached", retry_after=retry_after)
+    if status >= 500:
+        return ServerError(f"OpenWeather server error ({status})", status)
+    if status == 404:
+        return CityNotFound("city not found", status)
+    if status in (401, 403):
+        return AuthError("OpenWeather rejected the API key", status)
+    return WeatherAPIError(f"OpenWeather returned {status}", status)
+
+
+_NETWORK_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout, httpx.TransportError)
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`. Not thread-safe on its own."""
+
+    def __init__(self, rate: float, burst: float, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.updated = clock()
+
+    def take(self) -> float:
+        """Take a token and return 0.0, or return the seconds until one is available."""
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RequestScheduler:
+    """
+    Token-bucket rate limiting, priority queueing and retry/backoff for one API.
+    `requests_per_minute` of 0/None disables the quota (the queue then never waits).
+    """
+
+    def __init__(self, requests_per_minute=60, burst=None, max_retries=3, base_delay=0.5, max_delay=20.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        self._waiting = []              # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._waits = {p: deque(maxlen=500) for p in PRIORITY_NAMES}
+        self._counts = {"requests": 0, "retries": 0, "max_queue_depth": 0}
+        self._errors = {}
+        self.set_rate(requests_per_minute, burst)
+
+    def set_rate(self, requests_per_minute, burst=None):
+        """Change the quota; `burst` defaults to a sixth of a minute's worth (at least 1)."""
+        with self._cond:
+            if requests_per_minute:
+                burst = burst or max(1, requests_per_minute // 6)
+                self._bucket = TokenBucket(requests_per_minute / 60, burst)
+            else:
+                self._bucket = None
+            self.requests_per_minute = requests_per_minute
+            self._cond.notify_all()
+
+    # --- quota tokens ---
+
+    def _enqueue(self, priority):
+        ticket = (priority, next(self._seq))
+        heapq.heappush(self._waiting, ticket)
+        self._counts["max_queue_depth"] = max(self._counts["max_queue_depth"], len(self._waiting))
+        return ticket
+
+    def _try_grant(self, ticket):
+        """Under the lock: 0.0 when `ticket` got a token, else seconds to wait before retrying."""
+        if self._waiting[0] != ticket:
+            return _POLL
+        wait = self._bucket.take() if self._bucket is not None else 0.0
+        if wait == 0.0:
+            heapq.heappop(self._waiting)
+            self._cond.notify_all()   # the next ticket is now at the head
+        return wait
+
+    def _leave(self, ticket):
+        """Under the lock: drop a ticket that gave up waiting."""
+        try:
+            self._waiting.remove(ticket)
+        except ValueError:
+            return
+        heapq.heapify(self._waiting)
+        self._cond.notify_all()
+
+    def _record_wait(self, priority, started):
+        self._waits[priority].append(time.perf_counter() - started)
+
+    def acquire(self, priority=INTERACTIVE, timeout=None):
+        """Block until this request may be sent (QueueTimeout after `timeout` seconds)."""
+        started = time.perf_counter()
+        deadline = None if timeout is None else started + timeout
+        with self._cond:
+            ticket = self._enqueue(priority)
+            while True:
+                wait = self._try_grant(ticket)
+                if wait == 0.0:
+                    self._record_wait(priority, started)
+                    return
+                if deadline is not None:
+                    left = deadline - time.perf_counter()
+                    if left <= 0:
+                        self._leave(ticket)
+                        self._count_error("QueueTimeout")
+                        raise QueueTimeout(f"waited {timeout:.1f}s for the OpenWeather quota")
+                    wait = min(wait, left)
+                self._cond.wait(min(wait, _POLL))
+
+    async def acquire_async(self, priority=INTERACTIVE, timeout=None):
+        """acquire() for coroutines; cancelling the caller leaves the queue cleanly."""
+        started = time.perf_counter()
+        deadline = None if timeout is None else started + timeout
+        with self._cond:
+            ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_grant(ticket)
+                if wait == 0.0:
+                    self._record_wait(priority, started)
+                    return
+                if deadline is not None and time.perf_counter() >= deadline:
+                    self._count_error("QueueTimeout")
+                    raise QueueTimeout(f"waited {timeout:.1f}s for the OpenWeather quota")
+                await asyncio.sleep(min(wait, _POLL))
+        except BaseException:
+            with self._cond:
+                self._leave(ticket)
+            raise
+
+    # --- sending and retrying ---
+
+    def _backoff(self, attempt, retry_after=None):
+        """Seconds before retry `attempt` (0-based): jittered exponential, at least Retry-After."""
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+        if retry_after:
+            delay = max(delay, min(self.max_delay, retry_after))
+        return delay
+
+    @staticmethod
+    def _retry_after(response):
+        try:
+            return float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return None
+
+    def _count_error(self, name):
+        with self._cond:
+            self._errors[name] = self._errors.get(name, 0) + 1
+
+    def _classify(self, response):
+        """None for a usable response, else (retryable, error) for a failed one."""
+        error = error_for_status(response.status_code, self._retry_after(response))
+        if error is None:
+            return None
+        return isinstance(error, (RateLimited, ServerError)), error
+
+    def _outcome(self, attempt, response=None, exc=None):
+        """(delay before the next attempt) or raise the final error."""
+        if exc is not None:
+            retryable, error = True, NetworkError(f"network error: {exc}")
+        else:
+            retryable, error = self._classify(response)
+        if not retryable or attempt >= self.max_retries:
+            self._count_error(type(error).__name__)
+            raise error from exc
+        with self._cond:
+            self._counts["retries"] += 1
+        return self._backoff(attempt, getattr(error, "retry_after", None))
+
+    def call(self, send, priority=INTERACTIVE, timeout=None):
+        """
+        Run `send()` (returns a requests/httpx response) within the quota and
+        return the first successful response, retrying 429/5xx/network errors.
+        `timeout` bounds the wait for each quota token.
+        """
+        with self._cond:
+            self._counts["requests"] += 1
+        for attempt in range(self.max_retries + 1):
+            self.acquire(priority, timeout)
+            try:
+                response = send()
+            except _NETWORK_ERRORS as e:
+                time.sleep(self._outcome(attempt, exc=e))
+                continue
+            if self._classify(response) is None:
+                return response
+            time.sleep(self._outcome(attempt, response))
+
+    async def call_async(self, send, priority=INTERACTIVE, timeout=None):
+        """call() for coroutines: `send()` returns an awaitable response."""
+        with self._cond:
+            self._counts["requests"] += 1
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_async(priority, timeout)
+            try:
+                response = await send()
+            except _NETWORK_ERRORS as e:
+                await asyncio.sleep(self._outcome(attempt, exc=e))
+                continue
+            if self._classify(response) is None:
+                return response
+            await asyncio.sleep(self._outcome(attempt, response))
+
+    def stats(self):
+        """Queue depth, per-priority waits (ms), retries and final errors by type."""
+        with self._cond:
+            out = dict(self._counts)
+            out["queue_depth"] = len(self._waiting)
+            out["requests_per_minute"] = self.requests_per_minute
+            out["errors"] = dict(self._errors)
+            waits = {p: list(w) for p, w in self._waits.items()}
+        for priority, samples in waits.items():
+            name = PRIORITY_NAMES[priority]
+            samples.sort()
+            out[f"{name}_sent"] = len(samples)
+            out[f"{name}_wait_ms_mean"] = 1000 * sum(samples) / len(samples) if samples else 0.0
+            out[f"{name}_wait_ms_p95"] = 1000 * samples[int(0.95 * (len(samples) - 1))] if samples else 0.0
+        return out
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> RequestScheduler:
+    """
+    The scheduler shared by every OpenWeather call. Its quota comes from
+    OPENWEATHER_REQUESTS_PER_MINUTE (default 60, the free plan; 0 = no limit).
+    """
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RequestScheduler(int(os.getenv("OPENWEATHER_REQUESTS_PER_MINUTE", "60")))
+    return _scheduler
@@ -0,0 +1,272 @@
+"""
+Headless HTTP API: forecasts, chart PNGs and chat without the Tk dashboard.
+
+    python -m irfan_23522613.weather_friend.server --port 8080 --render-workers 4
+
+    GET    /forecast?city=Perth&days=3               forecast JSON (get_weather_data)
+    GET    /chart.png?city=Perth&days=3&series=humidity   temperature (default) or humidity
+    POST   /chat   {"message": "...", "session": "id"}   -> {"reply": "...", "session": "id"}
+    DELETE /chat?session=id                           forget a chat session
+    GET    /metrics                                   Prometheus text (see metrics.py)
+    GET    /health                                    liveness plus OpenWeather quota/queue stats
+
+Requests run on threads sharing the forecast cache; chart drawing goes to a
+process pool (rendering.py) and finished PNGs are cached until the forecast
+they were drawn from expires. Each chat session id gets its own memory;
+sessions idle for SESSION_IDLE seconds are dropped. Omit "session" to start
+a new one.
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from irfan_23522613.weather_friend import chatbot, metrics, weather_data
+from irfan_23522613.weather_friend.cache import SingleFlight, TTLCache
+from irfan_23522613.weather_friend.rendering import CHART_SERIES, get_render_pool, render_png, shutdown_render_pool
+from irfan_23522613.weather_friend.scheduler import get_scheduler
+
+MAX_DAYS = 5
+MAX_BODY = 64 * 1024
+SESSION_IDLE = 30 * 60
+RENDER_TIMEOUT = 30
+CHART_FALLBACK_TTL = 5 * 60   # when the forecast's own expiry isn't known
+ROUTES = ("/forecast", "/chart.png", "/chat", "/metrics", "/health")
+
+# Rendered PNGs, keyed on (normalised city, days, series); concurrent requests
+# for the same chart share one render
+chart_cache = TTLCache(maxsize=256)
+chart_flight = SingleFlight()
+
+_session_seen = {}   # session id -> last time used
+_session_lock = threading.Lock()
+_last_sweep = 0.0
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# get_weather_data's "error_type" (a scheduler.WeatherAPIError subclass) -> HTTP status
+ERROR_STATUS = {"CityNotFound": 404, "RateLimited": 503, "QueueTimeout": 503}
+
+
+def _weather_or_raise(city, days):
+    data = weather_data.get_weather_data(city, days)
+    if "error" in data:
+        raise ApiError(ERROR_STATUS.get(data.get("error_type"), 502), data["error"])
+    return data
+
+
+def forecast_json(city, days):
+    data = _weather_or_raise(city, days)
+    return {
+        "city": data["city"],
+        "timezone": data["timezone"],
+        "current": data["current"],
+        "forecast": data["forecast"].to_records(),
+    }
+
+
+def chart_png(city, days, series):
+    data = _weather_or_raise(city, days)
+    key = (weather_data.normalise_city(city), days, series)
+    png = chart_cache.get(key)
+    if png is not None:
+        metrics.incr("server.chart_cache_hit")
+        return png
+
+    def render():
+        try:
+            png = get_render_pool().submit(render_png, data["forecast"], series).result(timeout=RENDER_TIMEOUT)
+        except BrokenProcessPool:
+            shutdown_render_pool()   # a worker died; the next request starts a fresh pool
+            raise ApiError(503, "chart renderer restarting, try again")
+        expires_at = weather_data.forecast_cache.expires_at(key[0]) or time.time() + CHART_FALLBACK_TTL
+        chart_cache.set(key, png, expires_at)
+        return png
+
+    with metrics.span("server.render"):
+        return chart_flight.do(key, render)
+
+
+def _touch_session(session_id):
+    """Mark `session_id` as used and drop sessions idle for longer than SESSION_IDLE."""
+    global _last_sweep
+    now = time.time()
+    with _session_lock:
+        _session_seen[session_id] = now
+        if now - _last_sweep < 60:
+            return
+        _last_sweep = now
+        idle = [sid for sid, seen in _session_seen.items() if now - seen > SESSION_IDLE]
+        for sid in idle:
+            del _session_seen[sid]
+    for sid in idle:
+        chatbot.end_session(sid)
+
+
+def chat(body):
+    message = str(body.get("message") or "").strip()
+    if not message:
+        raise ApiError(400, "'message' is required")
+    session_id = str(body.get("session") or uuid.uuid4().hex)
+    _touch_session(session_id)
+    reply = chatbot.talk_to_weather_friend(message, session=session_id)
+    return {"reply": reply, "session": session_id}
+
+
+def end_chat(session_id):
+    with _session_lock:
+        _session_seen.pop(session_id, None)
+    chatbot.end_session(session_id)
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server_version = "WeatherFriend/1.0"
+
+    def do_GET(self):
+        self._dispatch(self._get)
+
+    def do_POST(self):
+        self._dispatch(self._post)
+
+    def do_DELETE(self):
+        self._dispatch(self._delete)
+
+    def _dispatch(self, route):
+        self._body_read = False
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        name = url.path if url.path in ROUTES else "other"   # keep metric names bounded
+        try:
+            with metrics.span(f"server.{self.command.lower()} {name}"):
+                route(url.path, query)
+        except ApiError as e:
+            self._send_json(e.status, {"error": str(e)})
+        except Exception as e:
+            self._send_json(500, {"error": f"⚠️ {e}"})
+
+    def _get(self, path, query):
+        if path == "/forecast":
+            city, days = self._city_days(query)
+            return self._send_json(200, forecast_json(city, days))
+        if path == "/chart.png":
+            city, days = self._city_days(query)
+            series = query.get("series", "temperature").lower()
+            if series not in CHART_SERIES:
+                raise ApiError(400, f"series must be one of {', '.join(CHART_SERIES)}")
+            return self._send(200, chart_png(city, days, series), "image/png")
+        if path == "/metrics":
+            return self._send(200, metrics.to_prometheus().encode(), "text/plain; version=0.0.4")
+        if path == "/health":
+            return self._send_json(200, {"ok": True, "scheduler": get_scheduler().stats()})
+        raise ApiError(404, "not found")
+
+    def _post(self, path, query):
+        if path != "/chat":
+            raise ApiError(404, "not found")
+        try:
+            body = json.loads(self._read_body() or b"{}")
+        except ValueError:
+            raise ApiError(400, "body must be JSON")
+        if not isinstance(body, dict):
+            raise ApiError(400, "body must be a JSON object")
+        self._send_json(200, chat(body))
+
+    def _read_body(self):
+        """The request body, once Content-Length has been checked."""
+        raw = self.headers.get("Content-Length")
+        if raw is None:
+            raise ApiError(411, "Content-Length is required")
+        try:
+            length = int(raw)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise ApiError(400, "invalid Content-Length")
+        if length > MAX_BODY:
+            raise ApiError(413, "request body too large")
+        self._body_read = True
+        return self.rfile.read(length)
+
+    def _body_unread(self):
+        """True when the request sent a body this handler never read (it would corrupt the next request)."""
+        if self._body_read:
+            return False
+        return self.headers.get("Content-Length", "0").strip() != "0" or "Transfer-Encoding" in self.headers
+
+    def _delete(self, path, query):
+        if path != "/chat" or not query.get("session"):
+            raise ApiError(404, "not found")
+        end_chat(query["session"])
+        self._send_json(200, {"ok": True})
+
+    @staticmethod
+    def _city_days(query):
+        city = query.get("city", "").strip()
+        if not city:
+            raise ApiError(400, "'city' is required")
+        try:
+            days = min(MAX_DAYS, max(1, int(query.get("days", 1))))
+        except ValueError:
+            raise ApiError(400, "'days' must be a number")
+        return city, days
+
+    def _send_json(self, status, body):
+        self._send(status, json.dumps(body).encode(), "application/json")
+
+    def _send(self, status, data, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if self._body_unread():
+            # the leftover body is still on the socket: answer, then drop the connection
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_server(host="127.0.0.1", port=8080, render_workers=None):
+    """A ready ThreadingHTTPServer (call serve_forever()); starts the render pool."""
+    get_render_pool(render_workers)
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    server.request_queue_size = 256
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--render-workers", type=int, help="chart rendering processes (default: CPU count)")
+    parser.add_argument("--metrics", action="store_true", help="record timings for /metrics")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        metrics.enable()
+    server = make_server(args.host, args.port, args.render_workers)
+    print(f"Weather Friend API listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        shutdown_render_pool()
+
+
+if __name__ == "__main__":
+    main()
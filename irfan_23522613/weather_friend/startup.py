@@ -0,0 +1,95 @@
+"""
+Startup-time report and budget check for the WeatherFriend.py dashboard.
+
+    python WeatherFriend.py --startup-report
+    python WeatherFriend.py --startup-report --budget-ms 1500 --runs 3
+
+The dashboard is launched in a child process with `-X importtime` and
+`--exit-after-paint`; it prints how long the first window took and which
+heavy modules were already loaded, then closes itself. The report lists
+the slowest imports; with --budget-ms the exit status is 1 when the median
+time-to-first-window is over budget or a deferred module was imported early.
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+# Modules the dashboard must not import before its window paints
+DEFERRED_MODULES = ("matplotlib", "pandas", "ollama", "rich", "dotenv")
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def first_paint_lines(started: float, modules) -> str:
+    """What the child prints once its window is up (see WeatherApp)."""
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    loaded = sorted(m for m in DEFERRED_MODULES if m in modules)
+    return f"first-window-ms={elapsed_ms:.1f}\nearly-imports={','.join(loaded)}"
+
+
+def parse_importtime(stderr: str):
+    """[(module, self_us, cumulative_us, depth)] from `-X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def measure(script: str, timeout: float = 60):
+    """Launch the dashboard once; returns wall time, first-window time, early imports and import rows."""
+    cmd = [sys.executable, "-X", "importtime", script, "--exit-after-paint"]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    fields = dict(
+        line.split("=", 1) for line in proc.stdout.splitlines() if line.startswith(("first-window-ms=", "early-imports="))
+    )
+    if "first-window-ms" not in fields:
+        errors = "\n".join(l for l in proc.stderr.splitlines() if not l.startswith("import time:"))
+        raise RuntimeError(f"Dashboard did not report a first paint:\n{proc.stdout}{errors[-2000:]}")
+    return {
+        "wall_ms": wall_ms,
+        "first_window_ms": float(fields["first-window-ms"]),
+        "early_imports": [m for m in fields.get("early-imports", "").split(",") if m],
+        "imports": parse_importtime(proc.stderr),
+    }
+
+
+def main(script: str, argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="WeatherFriend.py --startup-report")
+    parser.add_argument("--startup-report", action="store_true")
+    parser.add_argument("--budget-ms", type=float, help="fail if median time-to-first-window is above this")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to list")
+    args = parser.parse_args(argv)
+
+    runs = [measure(script) for _ in range(args.runs)]
+    last = runs[-1]
+
+    print(f"{'cumulative':>12} {'self':>9}  module")
+    top_level = [row for row in last["imports"] if row[3] == 0]
+    for module, self_us, cumulative_us, _ in sorted(top_level, key=lambda r: -r[2])[: args.top]:
+        print(f"{cumulative_us / 1000:>9.1f} ms {self_us / 1000:>6.1f} ms  {module}")
+
+    first_window = statistics.median(r["first_window_ms"] for r in runs)
+    wall = statistics.median(r["wall_ms"] for r in runs)
+    print(f"\ntime to first window: {first_window:.0f} ms (process launch to paint: {wall:.0f} ms, median of {len(runs)})")
+
+    failed = False
+    if last["early_imports"]:
+        print(f"❌ imported before first paint: {', '.join(last['early_imports'])}")
+        failed = True
+    if args.budget_ms is not None:
+        if first_window > args.budget_ms:
+            print(f"❌ over budget ({args.budget_ms:.0f} ms)")
+            failed = True
+        else:
+            print(f"✅ within budget ({args.budget_ms:.0f} ms)")
+    return 1 if failed else 0
@@ -0,0 +1,96 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class ForecastStore:
+    """
+    SQLite-backed store of the last forecast payload per city.
+
+    Each thread gets its own connection; WAL mode lets GUI worker threads
+    read while another thread writes. The table is capped at `max_entries`
+    (least recently fetched rows go first) and `compact()` hands freed
+    pages back to the filesystem.
+    """
+
+    def __init__(self, path: str, max_entries: int = 500, compact_every: int = 100):
+        self.path = path
+        self.max_entries = max_entries
+        self.compact_every = compact_every
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._writes = 0
+
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+
+        conn = self._conn()
+        # auto_vacuum has to be chosen before the first table is created
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS forecasts ("
+            " key TEXT PRIMARY KEY,"
+            " payload TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS forecasts_fetched ON forecasts(fetched_at)")
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str):
+        """Return (payload, expires_at) for `key`, or None. Stale rows are returned too."""
+        row = self._conn().execute(
+            "SELECT payload, expires_at FROM forecasts WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, key: str, payload: dict, expires_at: float):
+        """Insert or replace the payload for `key`, trimming the table when over the cap."""
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO forecasts (key, payload, fetched_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(payload, separators=(",", ":")), time.time(), expires_at),
+            )
+            conn.commit()
+            self._writes += 1
+            if self._writes % self.compact_every == 0:
+                self._compact(conn)
+
+    def compact(self):
+        """Drop rows beyond `max_entries` and release free pages."""
+        with self._write_lock:
+            self._compact(self._conn())
+
+    def _compact(self, conn):
+        conn.execute(
+            "DELETE FROM forecasts WHERE key NOT IN "
+            "(SELECT key FROM forecasts ORDER BY fetched_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+        conn.commit()
+        conn.execute("PRAGMA incremental_vacuum")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.commit()
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM forecasts").fetchone()[0]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
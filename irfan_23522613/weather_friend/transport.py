@@ -0,0 +1,206 @@
+"""
+Shared HTTP transport: one pooled keep-alive session for every OpenWeather call.
+
+Connections are reused across the dashboard's worker threads, so only the first
+request to a host pays for DNS, TCP and TLS. Each response carries a `timings`
+dict (seconds) with `dns`, `connect`, `tls`, `ttfb` and `total`; the handshake
+fields are 0.0 when a pooled connection was reused.
+
+Coroutines use get_async_client(), an httpx client pooled per event loop.
+"""
+import asyncio
+import socket
+import threading
+import time
+import weakref
+from collections import deque
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = (3.05, 10)   # (connect, read) seconds
+DEFAULT_POOL_CONNECTIONS = 4   # distinct hosts kept warm
+DEFAULT_POOL_MAXSIZE = 16      # sockets per host, enough for concurrent GUI threads
+
+_current = threading.local()
+
+
+def _record(name, seconds):
+    timings = getattr(_current, "timings", None)
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+class _TimedConnectionMixin:
+    """Splits connection setup into DNS lookup and TCP connect."""
+
+    def _new_conn(self):
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)
+        except OSError:
+            # let urllib3 raise its usual NameResolutionError
+            return super()._new_conn()
+        resolved = time.perf_counter()
+        _record("dns", resolved - start)
+
+        error = None
+        try:
+            # like urllib3's create_connection: a refused or unreachable address
+            # (e.g. IPv6 first on a v4-only network) moves on to the next one
+            for *_, sockaddr in addresses:
+                self._dns_host = sockaddr[0]
+                try:
+                    sock = super()._new_conn()
+                    _record("connect", time.perf_counter() - resolved)
+                    return sock
+                except (ConnectTimeoutError, NewConnectionError) as e:
+                    error = e
+        finally:
+            self._dns_host = host
+        raise error or NewConnectionError(self, f"Failed to establish a new connection: no addresses for {host}")
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        timings = getattr(_current, "timings", None) or {}
+        handshake = time.perf_counter() - start
+        _record("tls", max(0.0, handshake - timings.get("dns", 0.0) - timings.get("connect", 0.0)))
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools time new connections and time-to-first-byte."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        # requests hands back the response once headers are parsed
+        _record("ttfb", time.perf_counter() - start)
+        return response
+
+
+class Transport:
+    """Pooled keep-alive HTTP client with per-request timings (and optional retries)."""
+
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 timeout=DEFAULT_TIMEOUT, retries=0, backoff_factor=0.3,
+                 status_forcelist=()):
+        # Retrying 429/5xx and network errors is the scheduler's job (scheduler.py); retrying
+        # here as well would multiply the attempts, so the default is one try per call
+        self.timeout = timeout
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=status_forcelist,
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        adapter = _TimedAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.recent = deque(maxlen=256)
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        """GET `url`; the returned response has a `timings` dict attached."""
+        timings = {"dns": 0.0, "connect": 0.0, "tls": 0.0, "ttfb": 0.0}
+        _current.timings = timings
+        start = time.perf_counter()
+        try:
+            response = self.session.get(
+                url, params=params, headers=headers, timeout=timeout or self.timeout
+            )
+            response.content  # read the body so `total` covers the download
+        finally:
+            _current.timings = None
+            timings["total"] = time.perf_counter() - start
+            self.recent.append(timings)
+        response.timings = timings
+        return response
+
+    def summary(self):
+        """Mean of each timing (ms) over recent requests."""
+        samples = list(self.recent)
+        if not samples:
+            return {"requests": 0}
+        out = {"requests": len(samples)}
+        for name in ("dns", "connect", "tls", "ttfb", "total"):
+            out[f"{name}_ms"] = 1000 * sum(s.get(name, 0.0) for s in samples) / len(samples)
+        out["new_connections"] = sum(1 for s in samples if s.get("connect"))
+        return out
+
+    def close(self):
+        self.session.close()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """The process-wide transport, created on first use."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = Transport()
+    return _transport
+
+
+def configure(**options) -> Transport:
+    """Replace the shared transport, e.g. configure(pool_maxsize=32, timeout=(2, 5))."""
+    global _transport
+    with _transport_lock:
+        old, _transport = _transport, Transport(**options)
+    if old is not None:
+        old.close()
+    return _transport
+
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Pooled async client for the running event loop (created on first use)."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(DEFAULT_TIMEOUT[1], connect=DEFAULT_TIMEOUT[0]),
+            limits=httpx.Limits(
+                max_connections=DEFAULT_POOL_MAXSIZE,
+                max_keepalive_connections=DEFAULT_POOL_MAXSIZE,
+            ),
+            transport=httpx.AsyncHTTPTransport(retries=0),   # the scheduler retries
+        )
+        _async_clients[loop] = client
+    return client
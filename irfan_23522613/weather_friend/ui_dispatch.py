@@ -0,0 +1,192 @@
+"""
+Main-thread UI updates for Tk, posted from any thread.
+
+Tk widgets may only be touched from the thread running mainloop(). Worker
+threads and the background asyncio loop post their changes here instead;
+one after() pump on the main thread applies them every FRAME_MS, spending
+at most BUDGET_MS per frame (the rest waits for the next frame).
+
+Updates to the same widget are merged while they wait: three
+configure(label, text=...) calls in one frame become one configure with
+the last text, and post(..., key=k) replaces whatever is queued under k.
+
+    ui = install(root)
+    ui.configure(label, text="Loading…")              # from any thread
+    bubble = await ui.call(page.add_message, "Bot", "…")   # from a coroutine, returns the result
+    timer = ui.every(400, tick)                        # main thread: repeating, cancel() to stop
+"""
+import asyncio
+import itertools
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from irfan_23522613.weather_friend import metrics
+
+FRAME_MS = 16    # pump period, about 60 frames a second
+BUDGET_MS = 8    # most time one frame spends applying updates
+
+
+class Timer:
+    """A repeating after() callback on the main thread; cancel() stops it."""
+
+    def __init__(self, root, interval_ms, fn):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.fn = fn
+        self.cancelled = False
+        self._after = root.after(interval_ms, self._tick)
+
+    def _tick(self):
+        if self.cancelled:
+            return
+        try:
+            self.fn()
+        except Exception:
+            traceback.print_exc()
+        if not self.cancelled:
+            self._after = self.root.after(self.interval_ms, self._tick)
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class UiDispatcher:
+    """Queue of UI mutations applied in bounded batches by a main-thread after() pump."""
+
+    def __init__(self, root, frame_ms: int = FRAME_MS, budget_ms: float = BUDGET_MS):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.budget = budget_ms / 1000
+        self._main = threading.get_ident()
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()   # key -> [fn, args, kwargs]; first-posted first
+        self._seq = itertools.count()
+        self._running = False
+        self._counts = {"posted": 0, "coalesced": 0, "applied": 0, "frames": 0, "deferred_frames": 0,
+                        "max_batch": 0, "max_frame_ms": 0.0}
+
+    def on_main_thread(self) -> bool:
+        return threading.get_ident() == self._main
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self.root.after(self.frame_ms, self._pump)
+        return self
+
+    def stop(self):
+        self._running = False
+
+    # --- posting (any thread) ---
+
+    def post(self, fn, *args, key=None, **kwargs):
+        """Run fn(*args, **kwargs) on the main thread; a pending post under the same `key` is replaced."""
+        if key is None:
+            key = ("once", next(self._seq))
+        with self._lock:
+            self._counts["posted"] += 1
+            if key in self._pending:
+                self._counts["coalesced"] += 1
+            self._pending[key] = [fn, args, kwargs]
+
+    def configure(self, widget, **options):
+        """widget.configure(**options) on the main thread, merged with any configure still queued for it."""
+        key = (id(widget), "configure")
+        with self._lock:
+            self._counts["posted"] += 1
+            queued = self._pending.get(key)
+            if queued is not None:
+                self._counts["coalesced"] += 1
+                queued[2].update(options)
+            else:
+                self._pending[key] = [widget.configure, (), dict(options)]
+
+    def run(self, fn, *args, **kwargs) -> Future:
+        """Run fn on the main thread and return a Future for its result."""
+        future = Future()
+
+        def apply():
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+
+        self.post(apply)
+        return future
+
+    async def call(self, fn, *args, **kwargs):
+        """Await fn(*args, **kwargs) run on the main thread (for coroutines on the background loop)."""
+        return await asyncio.wrap_future(self.run(fn, *args, **kwargs))
+
+    def every(self, interval_ms: int, fn) -> Timer:
+        """Call fn on the main thread every `interval_ms` until the Timer is cancelled. Main thread only."""
+        return Timer(self.root, interval_ms, fn)
+
+    # --- the pump (main thread) ---
+
+    def _next(self):
+        with self._lock:
+            if not self._pending:
+                return None
+            return self._pending.popitem(last=False)[1]
+
+    def flush(self, budget: float = None):
+        """Apply queued updates for up to `budget` seconds (all of them when None); returns how many ran."""
+        started = time.perf_counter()
+        applied = 0
+        while budget is None or time.perf_counter() - started < budget:
+            item = self._next()
+            if item is None:
+                break
+            fn, args, kwargs = item
+            try:
+                fn(*args, **kwargs)
+            except Exception:
+                traceback.print_exc()
+            applied += 1
+        if applied:
+            elapsed = time.perf_counter() - started
+            metrics.observe("ui.frame", elapsed)
+            with self._lock:
+                c = self._counts
+                c["applied"] += applied
+                c["frames"] += 1
+                c["deferred_frames"] += bool(self._pending)
+                c["max_batch"] = max(c["max_batch"], applied)
+                c["max_frame_ms"] = max(c["max_frame_ms"], elapsed * 1000)
+        return applied
+
+    def _pump(self):
+        if not self._running:
+            return
+        try:
+            self.flush(self.budget)
+        finally:
+            self.root.after(self.frame_ms, self._pump)
+
+    def stats(self):
+        """Posted/merged/applied update counts, frames that hit the budget and the worst frame."""
+        with self._lock:
+            out = dict(self._counts)
+            out["backlog"] = len(self._pending)
+        return out
+
+
+_dispatcher = None
+
+
+def install(root, **kwargs) -> UiDispatcher:
+    """Create and start the app's dispatcher; call once on the main thread after creating `root`."""
+    global _dispatcher
+    _dispatcher = UiDispatcher(root, **kwargs).start()
+    return _dispatcher
+
+
+def get_dispatcher() -> UiDispatcher:
+    if _dispatcher is None:
+        raise RuntimeError("ui_dispatch.install(root) hasn't been called")
+    return _dispatcher
@@ -13,18 +13,40 @@ def success_message(msg):
     console.print(f"[green]✅ {msg}[/green]")
 
 import re
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from irfan_23522613.weather_friend import analytics, metrics
+from irfan_23522613.weather_friend.gazetteer import get_gazetteer
 
+CITY_PATTERN = re.compile(r"\b(?:in|for|at)\s+([a-zA-Z\s]+?)(?:\s+(?:today|tomorrow|next|now))?$")
+
+# "what is in the news" shouldn't become a lookup for "the news"
+NOT_A_CITY = {
+    "the", "a", "an", "my", "your", "our", "their", "his", "her", "its", "this", "that",
+    "these", "those", "it", "me", "you", "us", "them", "all", "any", "some", "home", "work",
+}
+
+
+@metrics.timed("chat.parse")
 def parse_weather_question(question: str):
-    """Extracts city and forecast time from natural language queries."""
+    """
+    Extracts city and forecast time from natural language queries.
+    Known places come from the offline gazetteer ("place" holds its coordinates);
+    otherwise the text after "in/for/at" is used unless it's clearly not a city.
+    """
     question = question.lower()
     city = None
     days = 1
 
-    # match e.g. "in perth", "for tokyo", "at london"
-    city_match = re.search(r"(?:in|for|at)\s+([a-zA-Z\s]+?)(?:\s+(?:today|tomorrow|next|now))?$", question)
-    if city_match:
-        city = city_match.group(1).strip()
+    place = get_gazetteer().find(question)
+    if place is not None:
+        city = place.name
+    else:
+        # match e.g. "in perth", "for tokyo", "at london"
+        city_match = CITY_PATTERN.search(question)
+        if city_match:
+            candidate = city_match.group(1).strip()
+            if candidate and candidate.split()[0] not in NOT_A_CITY:
+                city = candidate
 
     # detect time frame
     if "tomorrow" in question:
@@ -38,11 +60,28 @@ def parse_weather_question(question: str):
     else:
         days = 1
 
-    return {"location": city, "days": days}
+    return {"location": city, "days": days, "place": place}
+
+
+def _day_ranges(summary, days):
+    """'Sat 12–19°C, Sun 14–22°C (60% chance of rain)' for the first `days` local days."""
+    parts = []
+    for day in summary["days"][:days]:
+        if day["temp_min"] is None:
+            continue
+        label = datetime.strptime(day["date"], "%Y-%m-%d").strftime("%a")
+        low, high = round(day["temp_min"]), round(day["temp_max"])
+        part = f"{label} {low}°C" if low == high else f"{label} {low}–{high}°C"
+        if day["pop_max"] is not None and day["pop_max"] >= 0.3:
+            part += f" ({day['pop_max']:.0%} chance of rain)"
+        parts.append(part)
+    return ", ".join(parts)
 
 
 def generate_weather_response(parsed, data):
-    """Formats a friendly short response from weather data."""
+    """Formats a friendly short response from weather data: now, then each asked-for day's range and rain."""
+    if data and "error" in data:
+        return data["error"]
     if not data or "current" not in data:
         return "⚠️ Sorry, I couldn't fetch the weather for that location."
 
@@ -53,8 +92,24 @@ def generate_weather_response(parsed, data):
     humidity = current.get("humidity", "—")
     wind = current.get("wind_speed", "—")
 
+    reply = f"🌤 {city}: {desc}, {temp}°C — humidity {humidity}% and wind {wind} m/s."
+    if not data.get("forecast"):
+        return reply
+
+    summary = analytics.summarise(data)
+    # from the same slot as `temp` (summary["now"] is the forecast's first slot,
+    # which for a stored forecast can be hours in the past)
+    feels = current.get("feels_like")
+    if feels is not None and isinstance(temp, (int, float)) and abs(feels - temp) >= 1:
+        reply += f" Feels like {round(feels)}°C."
+    ranges = _day_ranges(summary, max(1, parsed.get("days") or 1))
+    if ranges:
+        reply += f" {ranges}."
+    if summary["rain_windows"]:
+        wet = summary["rain_windows"][0]
+        start = datetime.fromtimestamp(wet["start"] + data.get("timezone", 0), timezone.utc)
+        reply += f" 🌧 Rain likely from {start.strftime('%a %H:%M')}."
+
     # Add quick witty tone
-    return (
-        f"🌤 {city}: {desc}, {temp}°C — humidity {humidity}% and wind {wind} m/s. "
-        f"Looks {'great' if temp > 20 else 'chilly'} out there!"
-    )
+    warm = isinstance(temp, (int, float)) and temp > 20
+    return reply + f" Looks {'great' if warm else 'chilly'} out there!"
@@ -1,26 +1,60 @@
+import time
 import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
-import pandas as pd
+import numpy as np
+from matplotlib.dates import AutoDateLocator, ConciseDateFormatter, date2num
+from matplotlib.figure import Figure
+from irfan_23522613.weather_friend import metrics
+from irfan_23522613.weather_friend.forecast import Forecast
 
+
+DASHBOARD_RC = {
+    "axes.facecolor": "#1b1f27",
+    "figure.facecolor": "#0d1016",
+    "axes.labelcolor": "white",
+    "xtick.color": "white",
+    "ytick.color": "white",
+    "text.color": "white",
+}
+
+
+def apply_dashboard_style():
+    """The dark matplotlib style the dashboard's charts are drawn with."""
+    plt.style.use("seaborn-v0_8-darkgrid")
+    plt.rcParams.update(DASHBOARD_RC)
+
+
+def _as_forecast(data, empty_message):
+    """
+    Accept a Forecast, a dict holding one, or a dict with the old list of slot
+    dicts, and return the columnar Forecast to plot.
+    """
+    if isinstance(data, Forecast):
+        forecast = data
+    else:
+        if not data or "forecast" not in data or not len(data["forecast"]):
+            raise ValueError(empty_message)
+        forecast = data["forecast"]
+
+    if not isinstance(forecast, Forecast):
+        first = forecast[0]
+        if "time" not in first and "dt_txt" not in first:
+            raise KeyError("No valid time column found in forecast data.")
+        forecast = Forecast.from_records(forecast)
+
+    if not len(forecast):
+        raise ValueError(empty_message)
+    return forecast
+
+
+@metrics.timed("chart.temperature")
 def create_temperature_visualisation(data):
     """Create temperature line chart from forecast data."""
-    if not data or "forecast" not in data or not data["forecast"]:
-        raise ValueError("No forecast data to visualize.")
-    
-    df = pd.DataFrame(data["forecast"])
-    
-    if "time" not in df.columns:
-        if "dt_txt" in df.columns:
-            df.rename(columns={"dt_txt": "time"}, inplace=True)
-        else:
-            raise KeyError("No valid time column found in forecast data.")
-    
-    
-    df["time"] = pd.to_datetime(df["time"])
+    forecast = _as_forecast(data, "No forecast data to visualize.")
 
     fig, ax = plt.subplots(figsize=(8, 4), facecolor="#0d1016")
-    ax.plot(df["time"], df["temp"], color="red", linewidth=2.2)
+    ax.plot(forecast.time, forecast.temp, color="red", linewidth=2.2)
     ax.set_title("Temperature Trend", color="white", fontsize=12, pad=10)
     ax.set_xlabel("Time", color="gray")
     ax.set_ylabel("°C", color="gray")
@@ -30,25 +64,13 @@ def create_temperature_visualisation(data):
 
 
 
+@metrics.timed("chart.humidity")
 def create_precipitation_visualisation(weather_data):
     """Create humidity bar chart from forecast data."""
-    if not weather_data or "forecast" not in weather_data or not weather_data["forecast"]:
-        raise ValueError("No forecast data available for plotting humidity.")
-    
-    df = pd.DataFrame(weather_data["forecast"])
-    
-    # Ensure correct columns exist
-    if "time" not in df.columns:
-        # Fallback in case API returned dt_txt
-        if "dt_txt" in df.columns:
-            df.rename(columns={"dt_txt": "time"}, inplace=True)
-        else:
-            raise KeyError("No valid time column found in forecast data.")
-    
-    df["time"] = pd.to_datetime(df["time"])
+    forecast = _as_forecast(weather_data, "No forecast data available for plotting humidity.")
 
     fig, ax = plt.subplots(figsize=(8, 4), facecolor="#0d1016")
-    ax.bar(df["time"], df["humidity"], color="#3b82f6", alpha=0.8, label="Humidity (%)")
+    ax.bar(forecast.time, forecast.humidity, color="#3b82f6", alpha=0.8, label="Humidity (%)")
     ax.set_title("Humidity Over Time", color="white", fontsize=12, pad=10)
     ax.set_xlabel("Time", color="gray")
     ax.set_ylabel("Humidity (%)", color="gray")
@@ -57,3 +79,130 @@ def create_precipitation_visualisation(weather_data):
     fig.tight_layout()
     return fig
 
+
+@metrics.timed("chart.history")
+def create_history_visualisation(history, city: str = ""):
+    """Multi-week temperature chart (daily range band plus the 3-hour line) from ForecastArchive.history()."""
+    forecast = _as_forecast(history, "No archived weather to visualize.")
+
+    days = forecast.time.astype("datetime64[D]")
+    starts = np.flatnonzero(np.append(True, days[1:] != days[:-1]))
+    noon = date2num(days[starts]) + 0.5
+    low = np.fmin.reduceat(forecast.temp, starts)
+    high = np.fmax.reduceat(forecast.temp, starts)
+
+    fig, ax = plt.subplots(figsize=(10, 4), facecolor="#0d1016")
+    ax.fill_between(noon, low, high, color="red", alpha=0.18, linewidth=0, label="Daily range")
+    ax.plot(forecast.time, forecast.temp, color="red", linewidth=1.2, label="Temperature")
+    locator = AutoDateLocator()
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+    title = f"{city} — last {len(starts)} days" if city else f"Last {len(starts)} days"
+    ax.set_title(title, color="white", fontsize=12, pad=10)
+    ax.set_ylabel("°C", color="gray")
+    ax.tick_params(colors="white", labelsize=8)
+    ax.legend(facecolor="#1e1e1e", labelcolor="white", loc="upper left")
+    fig.tight_layout()
+    return fig
+
+
+SLOT_WIDTH_DAYS = 3 / 24 * 0.8   # bar width: 80% of a 3-hour slot
+
+SERIES_STYLE = {
+    "Temperature": {"title": "Temperature Trend", "ylabel": "°C"},
+    "Humidity": {"title": "Humidity Over Time", "ylabel": "Humidity (%)"},
+}
+DEFAULT_YLIM = {"Temperature": (0.0, 30.0), "Humidity": (0.0, 100.0)}   # when a series has no readings
+
+
+class ForecastChart:
+    """
+    A single long-lived figure for the forecast page.
+
+    update() swaps between the temperature line and humidity bars by changing
+    artist data and visibility in place, so a toggle never creates a new
+    figure or canvas. The figure isn't registered with pyplot, so nothing
+    accumulates in plt.get_fignums() over a long session.
+    """
+
+    def __init__(self, figsize=(8, 4)):
+        self.fig = Figure(figsize=figsize, facecolor="#0d1016")
+        self.ax = self.fig.add_subplot()
+        self.line, = self.ax.plot([], [], color="red", linewidth=2.2)
+        self.bars = None
+        self.legend = None
+        self.series = None
+        self._forecast = None
+        self.last_update_ms = 0.0
+        self.ax.set_xlabel("Time", color="gray")
+        self.ax.tick_params(colors="white", labelsize=8)
+
+    @metrics.timed("chart.update")
+    def update(self, data, series: str = "Temperature") -> bool:
+        """Show `series` for `data`; returns False when nothing changed (no redraw needed)."""
+        start = time.perf_counter()
+        forecast = _as_forecast(data, "No forecast data to visualize.")
+        data_changed = not self._same_forecast(forecast)
+        if not data_changed and series == self.series:
+            return False
+
+        if data_changed:
+            self._forecast = forecast
+            x = date2num(forecast.time)
+            self.line.set_data(x, forecast.temp)
+            self._set_bars(x, forecast.humidity)
+            self.ax.set_xlim(x[0] - SLOT_WIDTH_DAYS, x[-1] + SLOT_WIDTH_DAYS)
+            self.ax.xaxis_date()
+
+        if series != self.series or data_changed:
+            self._show(series)
+        self.series = series
+        self.last_update_ms = (time.perf_counter() - start) * 1000
+        return True
+
+    def _same_forecast(self, forecast):
+        """True when `forecast` is the plotted forecast or a same-length view of it."""
+        old = self._forecast
+        if old is None or old is forecast:
+            return old is forecast
+        return len(old) == len(forecast) and np.shares_memory(old.temp, forecast.temp)
+
+    def _set_bars(self, x, heights):
+        if self.bars is not None and len(self.bars) == len(x):
+            for rect, left, height in zip(self.bars, x - SLOT_WIDTH_DAYS / 2, heights):
+                rect.set_x(left)
+                rect.set_height(height)
+            return
+        if self.bars is not None:
+            self.bars.remove()
+        self.bars = self.ax.bar(
+            x, heights, width=SLOT_WIDTH_DAYS, color="#3b82f6", alpha=0.8, label="Humidity (%)"
+        )
+
+    def _show(self, series):
+        humidity = series == "Humidity"
+        self.line.set_visible(not humidity)
+        for rect in self.bars:
+            rect.set_visible(humidity)
+
+        style = SERIES_STYLE[series]
+        self.ax.set_title(style["title"], color="white", fontsize=12, pad=10)
+        self.ax.set_ylabel(style["ylabel"], color="gray")
+
+        values = self._forecast.humidity if humidity else self._forecast.temp
+        finite = values[np.isfinite(values)]
+        if not len(finite):
+            # every reading missing (Forecast stores them as NaN): keep the axes drawable
+            self.ax.set_ylim(*DEFAULT_YLIM[series])
+        else:
+            low, high = float(finite.min()), float(finite.max())
+            if humidity:
+                low = 0.0
+            pad = max((high - low) * 0.08, 0.5)
+            self.ax.set_ylim(low if humidity else low - pad, high + pad)
+
+        if humidity and self.legend is None:
+            self.legend = self.ax.legend(facecolor="#1e1e1e", labelcolor="white")
+        if self.legend is not None:
+            self.legend.set_visible(humidity)
+        self.fig.tight_layout()
@@ -1,61 +1,399 @@
+import asyncio
+import math
 import os
-import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
 from dotenv import load_dotenv
+from irfan_23522613.weather_friend import analytics, metrics
+from irfan_23522613.weather_friend.archive import ForecastArchive, default_path as default_archive_path
+from irfan_23522613.weather_friend.cache import SingleFlight, TTLCache
+from irfan_23522613.weather_friend.forecast import Forecast
+from irfan_23522613.weather_friend.gazetteer import get_gazetteer
+from irfan_23522613.weather_friend.scheduler import (
+    BACKGROUND,
+    INTERACTIVE,
+    AuthError,
+    CityNotFound,
+    NetworkError,
+    QueueTimeout,
+    RateLimited,
+    ServerError,
+    WeatherAPIError,
+    error_for_status,
+    get_scheduler,
+)
+from irfan_23522613.weather_friend.store import ForecastStore
+from irfan_23522613.weather_friend.transport import get_async_client, get_transport
 
 load_dotenv()
 API_KEY = os.getenv("OPENWEATHER_API_KEY")
 
-BASE_URL_FORECAST = "https://api.openweathermap.org/data/2.5/forecast"
+# Override to point at a local stand-in (see benchmarks/stub_server.py)
+BASE_URL_FORECAST = os.getenv("WEATHER_FRIEND_FORECAST_URL", "https://api.openweathermap.org/data/2.5/forecast")
+
+SLOTS_PER_DAY = 8              # 3-hour slots
+UPDATE_INTERVAL = 3 * 60 * 60  # OpenWeather refreshes the 3-hour forecast on these boundaries
+NOT_FOUND_TTL = 5 * 60         # remember "city not found" briefly so typos don't burn quota
+INTERACTIVE_QUEUE_TIMEOUT = 20 # a click gives up after waiting this long for quota
+
+# One full 5-day forecast per normalised city; any `days` value is sliced from it.
+forecast_cache = TTLCache(maxsize=128)
 
+# Concurrent misses for the same city share one request (see single_flight.stats())
+single_flight = SingleFlight()
 
-def get_weather_data(city: str, days: int = 1):
+# Optional on-disk copy of the last payload per city (see enable_store)
+forecast_store = None
+# Optional append-only history of every fetched forecast (see enable_archive);
+# appends go through one writer thread, in fetch order
+forecast_archive = None
+_archive_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="forecast-archive")
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+# Stale stored forecasts are re-fetched here, a couple at a time
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="forecast-refresh")
+
+
+def normalise_city(city: str) -> str:
     """
-    Fetch 5-day / 3-hour forecast from OpenWeather.
-    Returns structured data with wind, humidity, and temp.
+    Cache key for a city: the gazetteer's canonical name when the city is known
+    (so "NYC" and "new york" share an entry), else lower-case with collapsed whitespace.
+    """
+    place = get_gazetteer().lookup(city or "")
+    name = place.name if place else (city or "")
+    return " ".join(name.lower().split())
+
+
+def next_update_boundary(now: float = None) -> float:
+    """Epoch time of the next 3-hour OpenWeather update after `now`."""
+    now = time.time() if now is None else now
+    return (now // UPDATE_INTERVAL + 1) * UPDATE_INTERVAL
+
+
+def enable_store(path: str = None, max_entries: int = 500):
+    """
+    Keep the last forecast per city on disk so a restarted app can answer at once.
+    Defaults to $WEATHER_FRIEND_STORE, then ~/.weather_friend/forecasts.sqlite.
+    """
+    global forecast_store
+    path = path or os.getenv("WEATHER_FRIEND_STORE") or os.path.join(
+        os.path.expanduser("~"), ".weather_friend", "forecasts.sqlite"
+    )
+    forecast_store = ForecastStore(path, max_entries=max_entries)
+    return forecast_store
+
+
+def enable_archive(path: str = None, **retention):
+    """
+    Append every fetched forecast to a ForecastArchive for trend charts and drift.
+    Defaults to $WEATHER_FRIEND_ARCHIVE, then ~/.weather_friend/archive.
+    """
+    global forecast_archive
+    forecast_archive = ForecastArchive(path or default_archive_path(), **retention)
+    return forecast_archive
+
+
+def _parse_forecast(data: dict, city: str) -> dict:
+    """Decode a raw OpenWeather forecast response into a columnar Forecast."""
+    info = data.get("city") or {}
+    return {
+        "city": info.get("name", city),
+        "timezone": info.get("timezone", 0),  # seconds east of UTC
+        "forecast": Forecast.from_items(data.get("list", [])),
+    }
+
+
+ERROR_MESSAGES = {
+    RateLimited: "⏳ OpenWeather's rate limit was reached. Please try again in a minute.",
+    QueueTimeout: "⏳ Too many lookups are queued. Please try again shortly.",
+    AuthError: "🔑 OpenWeather rejected the API key. Check OPENWEATHER_API_KEY.",
+    ServerError: "☁️ OpenWeather is having trouble right now. Please try again shortly.",
+    NetworkError: "📡 Couldn't reach OpenWeather. Check your connection.",
+}
+
+
+def _error_payload(city: str, error: WeatherAPIError):
+    """
+    (payload, expires_at) for a failed request. Only "not found" is remembered;
+    "error_type" names the WeatherAPIError subclass for callers that care.
     """
+    if isinstance(error, CityNotFound):
+        payload = {"error": f"Couldn't find '{city}'. Please check spelling.", "error_type": "CityNotFound"}
+        return payload, time.time() + NOT_FOUND_TTL
+    message = ERROR_MESSAGES.get(type(error), f"⚠️ Weather data fetch error: {error}")
+    return {"error": message, "error_type": type(error).__name__}, None
+
+
+def _interpret_response(city: str, status_code: int, read_json):
+    """Map an HTTP status and body to (payload, expires_at); expires_at None means don't cache."""
+    error = error_for_status(status_code)
+    if error is not None:
+        return _error_payload(city, error)
+
+    with metrics.span("weather.decode"):
+        payload = _parse_forecast(read_json(), city)
+    place = get_gazetteer().lookup(city)
+    if place is not None:
+        # coordinate lookups report the nearest station; show the name the user knows
+        payload["city"] = place.name
+    return payload, next_update_boundary()
+
+
+def _forecast_params(city: str) -> dict:
+    """Query by city ID or coordinates for gazetteer places, by name otherwise."""
+    params = {"appid": API_KEY, "units": "metric"}
+    place = get_gazetteer().lookup(city)
+    params.update(place.query_params() if place else {"q": city})
+    return params
+
+
+def _queue_timeout(priority):
+    return INTERACTIVE_QUEUE_TIMEOUT if priority == INTERACTIVE else None
+
+
+def _fetch_forecast(city: str, priority=INTERACTIVE):
+    """
+    Download the full forecast for `city` through the quota scheduler.
+    Returns (payload, expires_at); expires_at is None when the result shouldn't be cached.
+    """
+    params = _forecast_params(city)
+    try:
+        with metrics.span("weather.fetch"):
+            r = get_scheduler().call(
+                lambda: get_transport().get(BASE_URL_FORECAST, params=params), priority, _queue_timeout(priority)
+            )
+    except WeatherAPIError as e:
+        return _error_payload(city, e)
+    return _interpret_response(city, r.status_code, r.json)
+
+
+async def _fetch_forecast_async(city: str, priority=INTERACTIVE):
+    """Async twin of _fetch_forecast; cancelling it aborts the HTTP request or the wait for quota."""
+    client = get_async_client()
+    params = _forecast_params(city)
+    try:
+        with metrics.span("weather.fetch"):
+            r = await get_scheduler().call_async(
+                lambda: client.get(BASE_URL_FORECAST, params=params), priority, _queue_timeout(priority)
+            )
+    except WeatherAPIError as e:
+        return _error_payload(city, e)
+    return _interpret_response(city, r.status_code, r.json)
+
+
+def _remember(key: str, payload: dict, expires_at):
+    """Keep a fetched payload in memory and, for real forecasts, on disk."""
+    if expires_at is not None:
+        forecast_cache.set(key, payload, expires_at)
+        _persist(key, payload, expires_at)
+
+
+async def _remember_async(key: str, payload: dict, expires_at):
+    """_remember for coroutines: the store write runs in a worker thread, off the event loop."""
+    if expires_at is not None:
+        forecast_cache.set(key, payload, expires_at)
+        if "error" not in payload and forecast_store is not None:
+            await asyncio.to_thread(_persist, key, payload, expires_at)
+        else:
+            _persist(key, payload, expires_at)   # at most queues an archive append
+
+
+def _persist(key: str, payload: dict, expires_at):
+    """Write a real forecast to the on-disk store (blocking) and queue its archive append."""
+    if forecast_store is not None and "error" not in payload:
+        stored = {
+            "city": payload["city"],
+            "timezone": payload["timezone"],
+            "forecast": payload["forecast"].to_records(),
+        }
+        forecast_store.put(key, stored, expires_at)
+    if forecast_archive is not None and "error" not in payload:
+        # the issue a fetch belongs to is the update it arrived after
+        _archive_writer.submit(_archive, forecast_archive, key, payload["forecast"], expires_at - UPDATE_INTERVAL)
+
+
+def _archive(archive, key, forecast, issued):
+    """Runs on the archive's writer thread, so appends never block a fetch or the event loop."""
     try:
-        params = {"q": city, "appid": API_KEY, "units": "metric"}
-        r = requests.get(BASE_URL_FORECAST, params=params, timeout=10)
-
-        if r.status_code != 200:
-            return {"error": f"Couldn't find '{city}'. Please check spelling."}
-
-        data = r.json()
-        forecast = []
-
-        for item in data.get("list", []):
-            main = item.get("main", {})
-            weather = (item.get("weather") or [{}])[0]
-            wind = item.get("wind", {})
-            forecast.append({
-                "time": item.get("dt_txt"),
-                "temp": main.get("temp"),
-                "humidity": main.get("humidity"),
-                "wind_speed": wind.get("speed", "—"),
-                "description": weather.get("description", "Unknown"),
-            })
-
-        # ✅ Limit to chosen number of days (8 slots ≈ 1 day)
-        limit = min(days * 8, len(forecast))
-        forecast = forecast[:limit]
-
-        # ✅ Extract a single "current" snapshot
-        current = {}
-        if forecast:
-            first = forecast[0]
-            current = {
-                "temp": first.get("temp"),
-                "humidity": first.get("humidity"),
-                "wind_speed": first.get("wind_speed"),
-                "description": first.get("description").title(),
-            }
-
-        city_name = (data.get("city") or {}).get("name", city)
-        return {
-            "city": city_name,
-            "current": current,
-            "forecast": forecast,
+        archive.append(key, forecast, issued)
+    except OSError as e:
+        print(f"[Archive error] {e}")
+
+
+def _load_or_fetch(city: str, key: str, priority=INTERACTIVE):
+    """Fetch from the network and remember the result in memory and on disk."""
+    payload, expires_at = _fetch_forecast(city, priority)
+    _remember(key, payload, expires_at)
+    return payload
+
+
+async def _load_or_fetch_async(city: str, key: str, priority=INTERACTIVE):
+    payload, expires_at = await _fetch_forecast_async(city, priority)
+    await _remember_async(key, payload, expires_at)
+    return payload
+
+
+def _refresh_in_background(city: str, key: str):
+    """Re-fetch a stale stored forecast without blocking the caller."""
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def work():
+        try:
+            single_flight.do(key, lambda: _load_or_fetch(city, key, BACKGROUND))
+        except Exception as e:
+            print(f"[Forecast refresh error] {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    _refresh_executor.submit(work)
+
+
+def _from_store(city: str, key: str):
+    """Serve a stored payload; stale ones are returned as-is while a refresh runs."""
+    hit = forecast_store.get(key)
+    if hit is None:
+        return None
+    stored, expires_at = hit
+    payload = {
+        "city": stored["city"],
+        "timezone": stored.get("timezone", 0),
+        "forecast": Forecast.from_records(stored["forecast"]),
+    }
+    if expires_at > time.time():
+        forecast_cache.set(key, payload, expires_at)
+    else:
+        _refresh_in_background(city, key)
+    return payload
+
+
+def _lookup(city: str, key: str):
+    """Payload from memory or the on-disk store, or None when a fetch is needed."""
+    payload = forecast_cache.get(key)
+    if payload is None and forecast_store is not None:
+        payload = _from_store(city, key)
+    metrics.incr("weather.cache_miss" if payload is None else "weather.cache_hit")
+    return payload
+
+
+async def _lookup_async(city: str, key: str):
+    """_lookup for coroutines: a memory miss reads the SQLite store in a worker thread."""
+    payload = forecast_cache.get(key)
+    if payload is None and forecast_store is not None:
+        payload = await asyncio.to_thread(_from_store, city, key)
+    metrics.incr("weather.cache_miss" if payload is None else "weather.cache_hit")
+    return payload
+
+
+def _rounded(value):
+    value = float(value)
+    return None if math.isnan(value) else round(value, 1)
+
+
+def _slice_forecast(payload: dict, days: int) -> dict:
+    """Build the public {"city", "timezone", "current", "forecast"} shape for the first `days` days."""
+    # ✅ Limit to chosen number of days (8 slots ≈ 1 day); a view, not a copy
+    forecast = payload["forecast"].head(days * SLOTS_PER_DAY)
+
+    # ✅ Extract a single "current" snapshot: the slot closest to now (a stored
+    # forecast served while refreshing can start hours in the past)
+    current = {}
+    if forecast:
+        now = np.datetime64(int(time.time()), "s")
+        i = min(int(np.searchsorted(forecast.time, now - np.timedelta64(UPDATE_INTERVAL // 2, "s"))), len(forecast) - 1)
+        slot = forecast[i]
+        current = {
+            "temp": slot.get("temp"),
+            "humidity": slot.get("humidity"),
+            "wind_speed": slot.get("wind_speed"),
+            "description": slot.get("description").title(),
+            "feels_like": _rounded(analytics.feels_like(forecast.temp[i], forecast.humidity[i], forecast.wind_speed[i])),
+            "dew_point": _rounded(analytics.dew_point(forecast.temp[i], forecast.humidity[i])),
         }
 
+    return {
+        "city": payload["city"],
+        "timezone": payload["timezone"],
+        "current": current,
+        "forecast": forecast,
+    }
+
+
+@metrics.timed("weather.get", failed=metrics.is_error_dict)
+def get_weather_data(city: str, days: int = 1, priority=INTERACTIVE):
+    """
+    Fetch 5-day / 3-hour forecast from OpenWeather.
+    Returns structured data with wind, humidity, and temp; "forecast" is a
+    columnar Forecast that still indexes like the old list of slot dicts.
+    Results are cached per city until the next 3-hour update; with the
+    on-disk store enabled, stale forecasts are served while a refresh runs.
+    Network requests go through the quota scheduler at `priority`
+    (scheduler.INTERACTIVE or BACKGROUND).
+    """
+    try:
+        key = normalise_city(city)
+        payload = _lookup(city, key)
+        if payload is None:
+            payload = single_flight.do(key, lambda: _load_or_fetch(city, key, priority))
+
+        if "error" in payload:
+            return dict(payload)
+        return _slice_forecast(payload, days)
+
+    except Exception as e:
+        return {"error": f"⚠️ Weather data fetch error: {e}"}
+
+
+@metrics.timed("weather.get", failed=metrics.is_error_dict)
+async def get_weather_data_async(city: str, days: int = 1, priority=INTERACTIVE):
+    """
+    Asyncio version of get_weather_data, sharing its cache and store.
+    Cancelling the awaiting task stops the download; nothing is cached then.
+    """
+    try:
+        key = normalise_city(city)
+        payload = await _lookup_async(city, key)
+        if payload is None:
+            payload = await single_flight.do_async(key, lambda: _load_or_fetch_async(city, key, priority))
+
+        if "error" in payload:
+            return dict(payload)
+        return _slice_forecast(payload, days)
+
     except Exception as e:
         return {"error": f"⚠️ Weather data fetch error: {e}"}
+
+
+def refresh_forecast(city: str, priority=BACKGROUND):
+    """
+    Download `city` again even if it's cached (prefetch.py keeps tracked cities
+    fresh with this). Returns the full payload or {"error": ...}.
+    """
+    try:
+        key = normalise_city(city)
+        return single_flight.do(key, lambda: _load_or_fetch(city, key, priority))
+    except Exception as e:
+        return {"error": f"⚠️ Weather data fetch error: {e}"}
+
+
+def get_weather_data_many(cities, days: int = 1, max_workers: int = 8, priority=BACKGROUND):
+    """
+    Fetch forecasts for many cities with at most `max_workers` requests in flight.
+    Yields (city, data) pairs as each one finishes; `data` is exactly what
+    get_weather_data returns, so a bad city only yields its own {"error": ...}.
+    Keep max_workers at or below the transport's pool_maxsize to reuse connections.
+    Batch lookups run at BACKGROUND priority, so they yield to the dashboard.
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="forecast")
+    try:
+        futures = {executor.submit(get_weather_data, city, days, priority): city for city in cities}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
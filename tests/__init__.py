@@ -0,0 +1,5 @@
+"""
+Unit tests for the deterministic parts of Weather Friend (no network, no display).
+
+    python -m pytest -q tests
+"""
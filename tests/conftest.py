@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from irfan_23522613.weather_friend.forecast import Forecast
+
+SLOT = 3 * 3600
+
+
+def _make_forecast(start, temp, humidity=None, wind_speed=None, pop=None):
+    """A Forecast of 3-hour slots from epoch second `start`; unspecified columns are constant."""
+    n = len(temp)
+
+    def column(values, default):
+        return np.asarray(values if values is not None else [default] * n, dtype=np.float32)
+
+    return Forecast(
+        (start + SLOT * np.arange(n)).astype("int64").astype("datetime64[s]"),
+        column(temp, 0),
+        column(humidity, 50),
+        column(wind_speed, 2),
+        np.full(n, "clear sky", dtype=object),
+        column(pop, 0),
+    )
+
+
+@pytest.fixture
+def make_forecast():
+    return _make_forecast
@@ -0,0 +1,84 @@
+import math
+
+import numpy as np
+import pytest
+
+from irfan_23522613.weather_friend import analytics
+from irfan_23522613.weather_friend.analytics import ForecastBatch, daily, rain_windows
+
+MIDNIGHT = 1_700_006_400   # 2023-11-15 00:00 UTC
+SLOT = 3 * 3600
+
+
+def test_daily_groups_slots_by_each_citys_local_day(make_forecast):
+    temps = list(range(16))   # two UTC days of slots
+    batch = ForecastBatch.from_forecasts([
+        ("utc", make_forecast(MIDNIGHT, temps), 0),
+        ("utc+3", make_forecast(MIDNIGHT, temps), 3 * 3600),
+    ])
+    days = daily(batch, days=3)
+
+    assert days["slots"].tolist() == [[8, 8, 0], [7, 8, 1]]
+    assert days["temp_min"][0, :2].tolist() == [0, 8]
+    assert days["temp_max"][0, :2].tolist() == [7, 15]
+    assert days["temp_mean"][0, 0] == pytest.approx(3.5)
+    # UTC+3: local midnight falls after the 7th slot
+    assert days["temp_min"][1].tolist() == [0, 7, 15]
+    assert days["temp_max"][1].tolist() == [6, 14, 15]
+    assert days["date"][1, 0] == np.datetime64("2023-11-15")
+    assert math.isnan(days["temp_min"][0, 2])   # a day with no slots
+
+
+def test_daily_ignores_missing_readings(make_forecast):
+    temps = [5, float("nan"), -3, 9, 1, 2, 3, 4]
+    pops = [0.1, 0.9, float("nan"), 0, 0, 0, 0, 0]
+    batch = ForecastBatch.from_forecasts([("c", make_forecast(MIDNIGHT, temps, pop=pops), 0)])
+    days = daily(batch, days=1)
+    assert days["temp_min"][0, 0] == -3
+    assert days["temp_max"][0, 0] == 9
+    assert days["temp_mean"][0, 0] == pytest.approx(21 / 7)
+    assert days["pop_max"][0, 0] == pytest.approx(0.9)
+
+
+def test_daily_pads_shorter_forecasts(make_forecast):
+    batch = ForecastBatch.from_forecasts([
+        ("long", make_forecast(MIDNIGHT, [1] * 16), 0),
+        ("short", make_forecast(MIDNIGHT, [2] * 4), 0),
+    ])
+    days = daily(batch, days=2)
+    assert days["slots"].tolist() == [[8, 8], [4, 0]]
+    assert days["temp_max"][1, 0] == 2
+
+
+def test_rain_windows_finds_each_run_of_likely_rain(make_forecast):
+    pops = [0, 0.6, 0.7, 0, 0.2, 0.9, 0.9, 0.95]
+    batch = ForecastBatch.from_forecasts([
+        ("wet", make_forecast(MIDNIGHT, [10] * 8, pop=pops), 0),
+        ("dry", make_forecast(MIDNIGHT, [10] * 8, pop=[0.1] * 8), 0),
+    ])
+    windows = rain_windows(batch)
+
+    assert windows[0] == [
+        {"start": MIDNIGHT + SLOT, "end": MIDNIGHT + 3 * SLOT, "pop_max": 0.7},
+        {"start": MIDNIGHT + 5 * SLOT, "end": MIDNIGHT + 8 * SLOT, "pop_max": 0.95},
+    ]
+    assert windows[1] == []
+
+
+def test_rain_window_stops_at_the_end_of_a_shorter_forecast(make_forecast):
+    batch = ForecastBatch.from_forecasts([
+        ("long", make_forecast(MIDNIGHT, [10] * 8), 0),
+        ("short", make_forecast(MIDNIGHT, [10] * 3, pop=[0, 0.8, 0.6]), 0),
+    ])
+    assert rain_windows(batch)[1] == [{"start": MIDNIGHT + SLOT, "end": MIDNIGHT + 3 * SLOT, "pop_max": 0.8}]
+
+
+def test_rain_windows_threshold_is_inclusive(make_forecast):
+    batch = ForecastBatch.from_forecasts([("c", make_forecast(MIDNIGHT, [10] * 2, pop=[0.5, 0.49]), 0)])
+    assert rain_windows(batch)[0] == [{"start": MIDNIGHT, "end": MIDNIGHT + SLOT, "pop_max": 0.5}]
+
+
+def test_feels_like_picks_heat_index_or_wind_chill():
+    assert analytics.feels_like(20, 50, 2) == pytest.approx(20)
+    assert analytics.feels_like(35, 60, 2) > 35          # humid heat feels hotter
+    assert analytics.feels_like(0, 50, 10) < 0            # cold wind feels colder
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from irfan_23522613.weather_friend.archive import DAY, ForecastArchive
+
+SLOT = 3 * 3600
+NOW = 1_760_000_400 // DAY * DAY   # a UTC midnight in October 2025
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return ForecastArchive(str(tmp_path / "archive"), keep_full_days=30, keep_days=365)
+
+
+@pytest.fixture
+def issue(make_forecast):
+    def build(issued, slots=8):
+        # temperature encodes the issue, so tests can tell which issue a row came from
+        return make_forecast(issued + SLOT, [issued / SLOT % 1000] * slots)
+    return build
+
+
+def _fill(archive, issue, start, end):
+    for issued in range(start, end + 1, SLOT):
+        archive.append("perth", issue(issued), issued)
+
+
+def test_append_skips_repeated_and_older_issues(archive, issue):
+    assert archive.append("perth", issue(NOW), NOW) == 8
+    assert archive.append("perth", issue(NOW), NOW) == 0
+    assert archive.append("perth", issue(NOW - SLOT), NOW - SLOT) == 0
+    assert archive.append("perth", issue(NOW + SLOT), NOW + SLOT) == 8
+    assert archive.stats()["rows"] == 16
+
+
+def test_history_keeps_the_latest_issue_for_each_slot(archive, issue):
+    _fill(archive, issue, NOW - DAY, NOW)
+    history = archive.history("perth", NOW - DAY, NOW + DAY)
+    times = history.time.astype(np.int64)
+    assert np.all(np.diff(times) == SLOT)
+    # each slot comes from the issue made just before it, or the last issue beyond that
+    assert history.temp.tolist() == [min(t - SLOT, NOW) / SLOT % 1000 for t in times.tolist()]
+
+
+def test_compact_thins_old_issues_to_one_per_day(archive, issue):
+    _fill(archive, issue, NOW - 40 * DAY, NOW)
+    before = archive.stats()["rows"]
+
+    result = archive.compact(now=NOW)
+
+    old = archive.query("perth", 0, NOW - 30 * DAY, by="issued")
+    old_issues = np.unique(old["issued"]).astype(np.int64)
+    assert len(old_issues) == len(np.unique(old_issues // DAY))      # one per UTC day
+    assert np.all(old_issues % DAY == 0)                              # the day's first issue
+    recent = archive.query("perth", NOW - 30 * DAY, NOW + 1, by="issued")
+    assert len(np.unique(recent["issued"])) == 30 * 8 + 1            # untouched
+    assert result == {"months_deleted": 0, "rows_dropped": before - archive.stats()["rows"]}
+    assert result["rows_dropped"] > 0
+
+
+def test_compact_is_idempotent(archive, issue):
+    _fill(archive, issue, NOW - 40 * DAY, NOW)
+    archive.compact(now=NOW)
+    rows = archive.stats()["rows"]
+    assert archive.compact(now=NOW) == {"months_deleted": 0, "rows_dropped": 0}
+    assert archive.stats()["rows"] == rows
+
+
+def test_compact_deletes_months_past_retention(archive, issue):
+    _fill(archive, issue, NOW - 100 * DAY, NOW - 99 * DAY)
+    _fill(archive, issue, NOW - DAY, NOW)
+    archive.keep_days = 60
+    result = archive.compact(now=NOW)
+    assert result["months_deleted"] == 1
+    assert len(archive.months("perth")) == 1
+    assert len(archive.query("perth", 0, NOW - 90 * DAY, by="issued")["issued"]) == 0
+
+
+def test_rows_survive_a_torn_append(archive, issue):
+    _fill(archive, issue, NOW, NOW + SLOT)
+    month = archive._month("perth", archive.months("perth")[0])
+    with open(month._file("temp"), "r+b") as f:
+        f.truncate(15 * 4 + 2)   # a crash midway through the last row's temp
+    assert len(month) == 15
+    archive.append("perth", issue(NOW + 2 * SLOT), NOW + 2 * SLOT)
+    rows = archive.query("perth", NOW, NOW + 3 * SLOT, by="issued")
+    assert len(rows["issued"]) == 23
+    assert rows["temp"][-8:].tolist() == [(NOW + 2 * SLOT) / SLOT % 1000] * 8
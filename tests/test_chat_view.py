@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+chat_view = pytest.importorskip("irfan_23522613.weather_friend.chat_view")
+TranscriptModel = chat_view.TranscriptModel
+
+
+def _reference_index(heights, y):
+    """Row containing y by a linear scan, clamped to the last row."""
+    top = 0
+    for i, h in enumerate(heights):
+        if y < top + h:
+            return i
+        top += h
+    return max(len(heights) - 1, 0)
+
+
+def test_empty_model():
+    model = TranscriptModel()
+    assert len(model) == 0
+    assert model.total == 0
+    assert model.index_at(0) == 0
+
+
+def test_offsets_match_a_plain_list_through_appends_and_resizes():
+    rng = random.Random(23)
+    model, heights = TranscriptModel(), []
+    for step in range(600):
+        if heights and rng.random() < 0.3:
+            i = rng.randrange(len(heights))
+            new = rng.randint(20, 300)
+            assert model.set_height(i, new) == new - heights[i]
+            heights[i] = new
+        else:
+            h = rng.randint(20, 300)
+            assert model.append(rng.choice((chat_view.USER, chat_view.BOT)), f"m{step}", h) == len(heights)
+            heights.append(h)
+
+        if step % 50 == 0:
+            assert model.total == sum(heights)
+            for i in rng.sample(range(len(heights)), min(10, len(heights))):
+                assert model.top(i) == sum(heights[:i])
+
+    assert model.total == sum(heights)
+    for y in [0, 1, heights[0] - 1, heights[0]] + [rng.randrange(sum(heights)) for _ in range(200)]:
+        assert model.index_at(y) == _reference_index(heights, y)
+
+
+def test_index_at_clamps_past_the_end():
+    model = TranscriptModel()
+    for h in (10, 20, 30):
+        model.append(chat_view.BOT, "x", h)
+    assert model.index_at(59) == 2
+    assert model.index_at(60) == 2
+    assert model.index_at(10_000) == 2
+
+
+def test_set_height_without_change_reports_zero():
+    model = TranscriptModel()
+    model.append(chat_view.USER, "hi", 40)
+    assert model.set_height(0, 40) == 0
+    assert model.total == 40
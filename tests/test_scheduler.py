@@ -0,0 +1,193 @@
+import socket
+import threading
+import time
+
+import pytest
+import requests
+
+from irfan_23522613.weather_friend import scheduler
+from irfan_23522613.weather_friend.scheduler import (
+    BACKGROUND,
+    INTERACTIVE,
+    AuthError,
+    CityNotFound,
+    NetworkError,
+    RateLimited,
+    RequestScheduler,
+    ServerError,
+    TokenBucket,
+    WeatherAPIError,
+)
+from irfan_23522613.weather_friend.transport import Transport
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    def __init__(self, status, retry_after=None):
+        self.status_code = status
+        self.headers = {} if retry_after is None else {"Retry-After": str(retry_after)}
+
+
+def sender(*outcomes):
+    """send() returning (or raising) each outcome in turn; .calls counts attempts."""
+    outcomes = list(outcomes)
+
+    def send():
+        send.calls += 1
+        outcome = outcomes.pop(0) if len(outcomes) > 1 else outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(*outcome) if isinstance(outcome, tuple) else FakeResponse(outcome)
+
+    send.calls = 0
+    return send
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff sleeps the scheduler asked for (none actually happen); jitter pinned to its maximum."""
+    slept = []
+    monkeypatch.setattr(scheduler.time, "sleep", slept.append)
+    monkeypatch.setattr(scheduler.random, "uniform", lambda low, high: high)
+    return slept
+
+
+@pytest.fixture
+def unlimited():
+    return RequestScheduler(requests_per_minute=0, max_retries=3, base_delay=0.5)
+
+
+# --- token bucket ---
+
+def test_token_bucket_spends_burst_then_refills_at_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, burst=2, clock=clock)
+    assert bucket.take() == 0.0
+    assert bucket.take() == 0.0
+    assert bucket.take() == pytest.approx(1.0)
+
+    clock.now = 0.5
+    assert bucket.take() == pytest.approx(0.5)
+    clock.now = 1.0
+    assert bucket.take() == 0.0
+
+
+def test_token_bucket_never_holds_more_than_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, burst=2, clock=clock)
+    bucket.take(), bucket.take()
+    clock.now = 100
+    assert [bucket.take() for _ in range(3)][:2] == [0.0, 0.0]
+    assert bucket.take() > 0
+
+
+# --- priorities ---
+
+def _wait_for_queue(s, depth):
+    deadline = time.monotonic() + 2
+    while len(s._waiting) < depth:
+        assert time.monotonic() < deadline, "request never queued"
+        time.sleep(0.005)
+
+
+def test_interactive_request_overtakes_queued_background_one():
+    s = RequestScheduler(requests_per_minute=60)
+    clock = FakeClock()
+    s._bucket = TokenBucket(rate=1, burst=1, clock=clock)
+    s._bucket.tokens = 0
+    order = []
+
+    def take(priority):
+        s.acquire(priority)
+        order.append(priority)
+
+    background = threading.Thread(target=take, args=(BACKGROUND,))
+    background.start()
+    _wait_for_queue(s, 1)
+    interactive = threading.Thread(target=take, args=(INTERACTIVE,))
+    interactive.start()
+    _wait_for_queue(s, 2)
+
+    clock.now = 1   # one token: it goes to the head of the queue
+    interactive.join(2)
+    assert order == [INTERACTIVE]
+    clock.now = 2
+    background.join(2)
+    assert order == [INTERACTIVE, BACKGROUND]
+
+
+# --- retries ---
+
+def test_server_errors_are_retried_until_success(unlimited, sleeps):
+    send = sender(500, 503, 200)
+    assert unlimited.call(send).status_code == 200
+    assert send.calls == 3
+    assert sleeps == [0.5, 1.0]   # exponential backoff
+    assert unlimited.stats()["retries"] == 2
+
+
+def test_retry_after_is_honoured(unlimited, sleeps):
+    send = sender((429, 7), 200)
+    assert unlimited.call(send).status_code == 200
+    assert sleeps == [7.0]
+
+
+def test_retry_after_is_capped_at_max_delay(sleeps):
+    s = RequestScheduler(requests_per_minute=0, max_delay=20.0)
+    s.call(sender((429, 3600), 200))
+    assert sleeps == [20.0]
+
+
+@pytest.mark.parametrize("status, error", [(500, ServerError), (429, RateLimited)])
+def test_gives_up_after_max_retries(unlimited, sleeps, status, error):
+    send = sender(status)
+    with pytest.raises(error):
+        unlimited.call(send)
+    assert send.calls == unlimited.max_retries + 1
+
+
+@pytest.mark.parametrize("status, error", [(404, CityNotFound), (401, AuthError), (403, AuthError), (400, WeatherAPIError)])
+def test_client_errors_are_not_retried(unlimited, sleeps, status, error):
+    send = sender(status)
+    with pytest.raises(error):
+        unlimited.call(send)
+    assert send.calls == 1
+    assert sleeps == []
+
+
+def test_network_errors_are_retried_then_reported(unlimited, sleeps):
+    send = sender(requests.exceptions.ConnectionError("refused"))
+    with pytest.raises(NetworkError):
+        unlimited.call(send)
+    assert send.calls == unlimited.max_retries + 1
+
+
+def test_refused_connection_is_attempted_once_per_scheduler_try(unlimited, sleeps, monkeypatch):
+    """The transport doesn't retry underneath the scheduler, so attempts don't multiply."""
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()   # nothing listens here now
+
+    connects = []
+    real_connect = socket.socket.connect
+
+    def counting_connect(sock, address):
+        connects.append(address)
+        return real_connect(sock, address)
+
+    monkeypatch.setattr(socket.socket, "connect", counting_connect)
+    transport = Transport()
+    try:
+        with pytest.raises(NetworkError):
+            unlimited.call(lambda: transport.get(f"http://127.0.0.1:{port}/forecast"))
+    finally:
+        transport.close()
+    assert len(connects) == unlimited.max_retries + 1